@@ -50,9 +50,6 @@ class CameraImage(ImageBase, DataClass):
         yuyv = self.getPixel(x, y)
         return YUVPixel((0, yuyv.u, yuyv.y(x), yuyv.v))
 
-    def getGrayscaled(self):
-        raise NotImplementedError("getGrayscale not implemented")
-
     @classmethod
     def read(cls, sutil: StreamUtil, end) -> "CameraImage":
         cameraImage = CameraImage()
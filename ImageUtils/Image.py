@@ -1,4 +1,7 @@
-from numpy import ndarray
+from numpy import ndarray, uint8
+from numpy.typing import NDArray
+
+from . import ImageKernels
 
 
 class Image:
@@ -10,3 +13,16 @@ class Image:
     def setResolution(self, width, height):
         self.width = width
         self.height = height
+
+    # Whole image conversions, see ImageKernels
+    def getGrayscaled(self) -> NDArray[uint8]:
+        return ImageKernels.grayscale(self.image)
+
+    def getYUVImage(self) -> NDArray[uint8]:
+        return ImageKernels.yuvImage(self.image)
+
+    def getHSIImage(self) -> NDArray[uint8]:
+        return ImageKernels.hsiImage(self.image)
+
+    def classifyColors(self, colorTable: NDArray[uint8]) -> NDArray[uint8]:
+        return ImageKernels.classifyColors(self.image, colorTable)
@@ -0,0 +1,67 @@
+from abc import abstractmethod
+from io import BytesIO
+from typing import Dict, Optional
+
+import numpy as np
+from PIL import PngImagePlugin
+from PIL.Image import fromarray
+
+
+class ImageEncoder:
+    """
+    Encode an RGB image (height, width, 3) into the bytes of an image file
+    Encoders are pickled to the export workers, so keep them small
+    """
+
+    suffix: str
+    embedsMetaData: bool = False
+    """Whether the metadata is written into the image file, otherwise the exporter writes a json sidecar"""
+
+    @abstractmethod
+    def encode(self, rgbImage: np.ndarray, metaData: Optional[Dict[str, str]] = None) -> bytes:
+        pass
+
+
+class PNGEncoder(ImageEncoder):
+    """PNG with the metadata in tEXt chunks, same as FrameBase.saveImageWithMetaData"""
+
+    suffix = ".png"
+    embedsMetaData = True
+
+    def __init__(self, compressLevel: int = 6):
+        self.compressLevel = compressLevel
+
+    def encode(self, rgbImage: np.ndarray, metaData: Optional[Dict[str, str]] = None) -> bytes:
+        pngInfo = None
+        if metaData:
+            pngInfo = PngImagePlugin.PngInfo()
+            for key, value in metaData.items():
+                pngInfo.add_text(key, value)
+        buffer = BytesIO()
+        fromarray(rgbImage).save(
+            buffer, format="PNG", pnginfo=pngInfo, compress_level=self.compressLevel
+        )
+        return buffer.getvalue()
+
+
+class JPEGEncoder(ImageEncoder):
+    suffix = ".jpg"
+
+    def __init__(self, quality: int = 90):
+        self.quality = quality
+
+    def encode(self, rgbImage: np.ndarray, metaData: Optional[Dict[str, str]] = None) -> bytes:
+        buffer = BytesIO()
+        fromarray(rgbImage).save(buffer, format="JPEG", quality=self.quality)
+        return buffer.getvalue()
+
+
+class NpyEncoder(ImageEncoder):
+    """Raw uint8 array, loadable with np.load"""
+
+    suffix = ".npy"
+
+    def encode(self, rgbImage: np.ndarray, metaData: Optional[Dict[str, str]] = None) -> bytes:
+        buffer = BytesIO()
+        np.save(buffer, rgbImage)
+        return buffer.getvalue()
@@ -0,0 +1,111 @@
+"""
+Whole-image versions of the per-pixel conversions in PixelTypes
+
+All kernels take a YUYV image as stored in CameraImage.image/JPEGImage.image:
+shape (height, width * 2, 2), even columns hold (Y0, U), odd columns hold (Y1, V)
+"""
+from typing import List, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .PixelTypes import (
+    scaledGCoeffU,
+    scaledGCoeffV,
+    scaledInvUCoeff,
+    scaledInvVCoeff,
+    scaleExponent,
+)
+
+ColorRange = Tuple[int, Tuple[int, int], Tuple[int, int], Tuple[int, int]]
+"""(colorClass, (yMin, yMax), (uMin, uMax), (vMin, vMax)), bounds inclusive"""
+
+
+def yPlane(image: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    """Y of every pixel, (height, width * 2)"""
+    return image[:, :, 0]
+
+
+def uPlane(image: NDArray[np.uint8], fullResolution: bool = True) -> NDArray[np.uint8]:
+    """U of every pixel (shared by a YUYV pair), (height, width * 2) or (height, width) if not fullResolution"""
+    u = image[:, 0::2, 1]
+    return np.repeat(u, 2, axis=1) if fullResolution else u
+
+
+def vPlane(image: NDArray[np.uint8], fullResolution: bool = True) -> NDArray[np.uint8]:
+    """V of every pixel (shared by a YUYV pair), (height, width * 2) or (height, width) if not fullResolution"""
+    v = image[:, 1::2, 1]
+    return np.repeat(v, 2, axis=1) if fullResolution else v
+
+
+def grayscale(image: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    """Grayscale image, which is the Y plane (same as YUYVPixel.greyscale)"""
+    return yPlane(image).copy()
+
+
+def yuvImage(image: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    """(height, width * 2, 3) with channels (Y, U, V)"""
+    return np.stack([yPlane(image), uPlane(image), vPlane(image)], axis=-1)
+
+
+def rgbImage(image: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    """(height, width * 2, 3) RGB, same fixed point arithmetic as YUVPixel.fromYUVToRGB"""
+    y = yPlane(image).astype(np.int32)
+    u = uPlane(image).astype(np.int32) - 128
+    v = vPlane(image).astype(np.int32) - 128
+    result = np.empty(y.shape + (3,), dtype=np.uint8)
+    result[..., 0] = np.clip(y + ((v * scaledInvVCoeff) >> scaleExponent), 0, 255)
+    result[..., 1] = np.clip(
+        y - ((u * scaledGCoeffU + v * scaledGCoeffV) >> scaleExponent), 0, 255
+    )
+    result[..., 2] = np.clip(y + ((u * scaledInvUCoeff) >> scaleExponent), 0, 255)
+    return result
+
+
+def hsiImage(image: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    """
+    (height, width * 2, 3) with channels (H, S, I), each scaled to 0-255
+    Hue is an angle, so 256 wraps to 0 (same as HuePixel)
+    """
+    rgb = rgbImage(image).astype(np.float32)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    intensity = (r + g + b) / 3
+    minimum = np.min(rgb, axis=-1)
+    saturation = np.where(intensity > 0, 1 - minimum / np.maximum(intensity, 1e-6), 0)
+
+    numerator = 0.5 * ((r - g) + (r - b))
+    denominator = np.sqrt((r - g) ** 2 + (r - b) * (g - b))
+    theta = np.arccos(np.clip(numerator / np.maximum(denominator, 1e-6), -1, 1))
+    hue = np.where(b > g, 2 * np.pi - theta, theta)
+    hue = np.where(denominator > 0, hue, 0)  # gray pixels have no hue
+
+    result = np.empty(rgb.shape, dtype=np.uint8)
+    result[..., 0] = np.round(hue / (2 * np.pi) * 256).astype(np.int32) % 256
+    result[..., 1] = np.clip(np.round(saturation * 255), 0, 255)
+    result[..., 2] = np.clip(np.round(intensity), 0, 255)
+    return result
+
+
+def colorTableFromRanges(ranges: List[ColorRange], bits: int = 6) -> NDArray[np.uint8]:
+    """
+    Build a (2**bits, 2**bits, 2**bits) lookup table indexed by quantized (Y, U, V)
+    Cells not covered by any range are 0, later ranges overwrite earlier ones
+    """
+    shift = 8 - bits
+    table = np.zeros((1 << bits,) * 3, dtype=np.uint8)
+    for colorClass, (yMin, yMax), (uMin, uMax), (vMin, vMax) in ranges:
+        table[
+            yMin >> shift : (yMax >> shift) + 1,
+            uMin >> shift : (uMax >> shift) + 1,
+            vMin >> shift : (vMax >> shift) + 1,
+        ] = colorClass
+    return table
+
+
+def classifyColors(image: NDArray[np.uint8], colorTable: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    """Colour class of every pixel, (height, width * 2), looked up in a table from colorTableFromRanges"""
+    bits = int(np.log2(colorTable.shape[0]))
+    shift = 8 - bits
+    return colorTable[
+        yPlane(image) >> shift, uPlane(image) >> shift, vPlane(image) >> shift
+    ]
@@ -1,4 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
+from typing import Iterable, List, Optional
 
 import cv2
 import numpy as np
@@ -33,6 +35,20 @@ class JPEGImage(ImageBase, DataClass):
         super().__init__()
         self.timestamp: int
         self.size: int
+        self.jpegBytes: bytes  # compressed payload, decoded on first access of image
+
+        # cache
+        self._image_cached: Optional[np.ndarray] = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_image_cached"] = None  # the compressed payload is enough to recover the image
+        return state
+
+    def __setstate__(self, state):
+        # Reprs pickled before lazy decoding stored the decoded image directly
+        state.setdefault("_image_cached", state.pop("image", None))
+        self.__dict__.update(state)
 
     @classmethod
     def read(cls, sutil: StreamUtil, end) -> "JPEGImage":
@@ -49,16 +65,46 @@ class JPEGImage(ImageBase, DataClass):
         jpegImage.setResolution(width, height * 2)
         jpegImage.timestamp = int(timestamp)
 
-        rawImg = open(
-            BytesIO(sutil.read(jpegImage.size)), formats=["JPEG"]
-        )  # PIL deduce it is CMYK but it is actually YUYV
-        jpegImage.image = 255 - np.array(rawImg).reshape((height * 2, width * 2, 2))
+        jpegImage.jpegBytes = sutil.read(jpegImage.size)
 
         if sutil.tell() != end:
             raise ValueError("Buffer Size not used up")
 
         return jpegImage
 
+    @staticmethod
+    def decodeJPEG(jpegBytes: bytes, width: int, height: int) -> np.ndarray:
+        """Decode the compressed payload into a (height, width * 2, 2) YUYV array"""
+        rawImg = open(
+            BytesIO(jpegBytes), formats=["JPEG"]
+        )  # PIL deduce it is CMYK but it is actually YUYV
+        return 255 - np.asarray(rawImg).reshape((height, width * 2, 2))
+
+    @property
+    def image(self) -> np.ndarray:
+        if self._image_cached is None:
+            self._image_cached = self.decodeJPEG(self.jpegBytes, self.width, self.height)
+        return self._image_cached
+
+    @image.setter
+    def image(self, value: np.ndarray):
+        self._image_cached = value
+
+    @property
+    def isDecoded(self) -> bool:
+        return self._image_cached is not None
+
+    @staticmethod
+    def decodeAll(
+        images: Iterable["JPEGImage"], numWorkers: Optional[int] = None
+    ) -> List[np.ndarray]:
+        """
+        Decode many images at once with a thread pool (PIL releases the GIL while decoding)
+        The decoded images are also kept in each JPEGImage
+        """
+        with ThreadPoolExecutor(numWorkers) as executor:
+            return list(executor.map(lambda jpegImage: jpegImage.image, images))
+
     def asDict(self):
         return {
             "width": self.width,
@@ -1,2 +1,6 @@
 from .CameraImage import CameraImage
+from .ImageEncoder import ImageEncoder, JPEGEncoder, NpyEncoder, PNGEncoder
+from .ImageKernels import (classifyColors, colorTableFromRanges, grayscale,
+                           hsiImage, rgbImage, uPlane, vPlane, yPlane,
+                           yuvImage)
 from .JPEGImage import JPEGImage
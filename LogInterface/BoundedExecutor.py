@@ -0,0 +1,52 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import cpu_count
+from typing import Any, Callable, Deque, Optional, Tuple
+
+
+class BoundedExecutor:
+    """
+    Process pool with at most maxInFlight outstanding tasks, so memory doesn't grow with the log
+    Results are passed to onResult(result, context) in submission order, submit() waits for the oldest task when full
+    """
+
+    def __init__(
+        self,
+        onResult: Callable[[Any, Any], None],
+        numWorkers: Optional[int] = None,
+        maxInFlight: Optional[int] = None,
+    ):
+        self.onResult = onResult
+        self.numWorkers = cpu_count() if numWorkers is None else numWorkers
+        self.maxInFlight = 2 * self.numWorkers if maxInFlight is None else maxInFlight
+        self.pending: Deque[Tuple[Future, Any]] = deque()
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "BoundedExecutor":
+        self.executor = ProcessPoolExecutor(self.numWorkers)
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        """Collect the remaining results, or drop them if the caller raised"""
+        try:
+            if excType is None:
+                self.drain()
+        finally:
+            self.pending.clear()
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, fn: Callable[[Any], Any], task: Any, context: Any = None):
+        """Run fn(task) in a worker, context is passed to onResult with the result"""
+        if len(self.pending) >= self.maxInFlight:
+            self.collect()  # back pressure on the reader
+        self.pending.append((self.executor.submit(fn, task), context))
+
+    def collect(self):
+        """Wait for the oldest task and pass its result on (a worker's exception is raised here)"""
+        future, context = self.pending.popleft()
+        self.onResult(future.result(), context)
+
+    def drain(self):
+        """Collect all outstanding tasks, e.g. before results of a later task may be handled"""
+        while self.pending:
+            self.collect()
@@ -0,0 +1,110 @@
+import os
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .DataClasses import DataClass
+
+
+class ChunkArrays:
+    """
+    Struct-of-arrays storage of the frames and messages of an UncompressedChunk (array backed instance mode)
+
+    - message columns: start/end byte, logId and absolute frame index of every message
+    - frame columns: start/end byte, first/last(+1) absolute message index and thread id of every frame
+    Every column is a raw file in the log's cache dir, opened as a read-only memmap,
+    so pickling only stores the dir and the thread names (parsed representations go to the ReprCache)
+    """
+
+    columnTypes: Dict[str, str] = {
+        "messageStartBytes": "int64",
+        "messageEndBytes": "int64",
+        "messageLogIds": "uint8",
+        "messageFrameIndexes": "int64",
+        "frameStartBytes": "int64",
+        "frameEndBytes": "int64",
+        "frameMessageStarts": "int64",
+        "frameMessageEnds": "int64",
+        "frameThreadIds": "uint8",
+    }
+    builderTypeCodes: Dict[str, str] = {"int64": "q", "uint8": "B"}
+
+    def __init__(self, dir: Path, threadNames: List[str]):
+        self.dir = Path(dir)
+        self.threadNames = threadNames
+        self.reprObjs: Dict[int, DataClass] = {}
+        """Parsed representations by absolute message index, they outlive the message views"""
+
+        # cache
+        self._columns_cached: Dict[str, NDArray]
+        self._threadFrameIndexes_cached: Dict[str, NDArray[np.int64]]
+
+    @classmethod
+    def builder(cls) -> Dict[str, array]:
+        """Growable typed buffers of all columns, filled during eval and passed to write()"""
+        return {
+            name: array(cls.builderTypeCodes[dtype])
+            for name, dtype in cls.columnTypes.items()
+        }
+
+    def columnFilePath(self, name: str) -> Path:
+        return self.dir / f"chunkArray_{name}.cache"
+
+    def write(self, columns: Dict[str, array]):
+        """Write the columns to the cache dir, every file is written to a temporary file first"""
+        os.makedirs(self.dir, exist_ok=True)
+        for name, dtype in self.columnTypes.items():
+            path = self.columnFilePath(name)
+            tmpPath = path.with_name(path.name + ".tmp")
+            np.frombuffer(columns[name], dtype=dtype).tofile(tmpPath)
+            os.replace(tmpPath, path)
+        self._columns_cached = {}
+        self._threadFrameIndexes_cached = {}
+
+    def column(self, name: str) -> NDArray:
+        if not hasattr(self, "_columns_cached") or self._columns_cached is None:
+            self._columns_cached = {}
+        if name not in self._columns_cached:
+            path = self.columnFilePath(name)
+            if not path.exists():
+                raise OSError(f"Array backed chunk depends on cache file, not found: {path}")
+            if path.stat().st_size == 0:
+                self._columns_cached[name] = np.zeros(0, dtype=self.columnTypes[name])
+            else:
+                self._columns_cached[name] = np.memmap(path, dtype=self.columnTypes[name], mode="r")
+        return self._columns_cached[name]
+
+    def __getattr__(self, name: str) -> NDArray:
+        """Columns are available as attributes, e.g. arrays.messageStartBytes"""
+        if name in ChunkArrays.columnTypes:
+            return self.column(name)
+        raise AttributeError(name)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"dir": self.dir, "threadNames": self.threadNames}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self.reprObjs = {}
+        for name in self.columnTypes:  # fail on load (so Log.eval re-evaluates) instead of on first access
+            self.column(name)
+
+    @property
+    def numFrames(self) -> int:
+        return len(self.frameStartBytes)
+
+    @property
+    def numMessages(self) -> int:
+        return len(self.messageStartBytes)
+
+    def threadFrameIndexes(self, name: str) -> NDArray[np.int64]:
+        """Absolute frame indexes of all frames in the thread"""
+        if not hasattr(self, "_threadFrameIndexes_cached") or self._threadFrameIndexes_cached is None:
+            self._threadFrameIndexes_cached = {}
+        if name not in self._threadFrameIndexes_cached:
+            threadId = self.threadNames.index(name)
+            self._threadFrameIndexes_cached[name] = np.flatnonzero(self.frameThreadIds == threadId)
+        return self._threadFrameIndexes_cached[name]
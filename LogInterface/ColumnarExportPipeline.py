@@ -0,0 +1,263 @@
+import io
+import json
+import os
+import time
+from enum import Enum
+from mmap import ACCESS_READ, mmap
+from multiprocessing import cpu_count
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+from tqdm import tqdm
+
+from Primitive import Angle
+from StreamUtils import StreamUtil
+from Utils import dumpJson
+
+from .BoundedExecutor import BoundedExecutor
+from .DataClasses import DataClass
+
+Column = Tuple[str, str]
+"""(dotted name, numpy dtype string), dtype "json" means the value is stored as a json string"""
+
+
+class ColumnarExportPipeline:
+    """
+    Export every representation as a table (one row per message, one column per flattened field) as npz row groups
+    or parquet, row groups are parsed by a BoundedExecutor and <dir>/schema.json lists the columns and enum names
+    """
+
+    schemaName = "schema.json"
+    excludedClasses = [
+        "CameraImage",
+        "JPEGImage",
+        "Annotation",
+        "Stopwatch",
+        "FrameBegin",
+        "FrameFinished",
+    ]
+
+    def __init__(
+        self,
+        chunk: Any,
+        dir: Path,
+        format: str = "npz",
+        rowGroupSize: int = 10000,
+        numWorkers: Optional[int] = None,
+        maxInFlight: Optional[int] = None,
+    ):
+        if format not in ["npz", "parquet"]:
+            raise ValueError(f"Invalid table format: {format}")
+        self.chunk = chunk
+        self.dir = Path(dir)
+        self.format = format
+        self.rowGroupSize = rowGroupSize
+        self.numWorkers = cpu_count() if numWorkers is None else numWorkers
+        self.maxInFlight = maxInFlight
+
+    # Schema
+    def columns(self, className: str) -> List[Column]:
+        """Field columns of a representation (without the index columns), see TypeInfoChunk.flatFieldTypes"""
+        return self.chunk.log.TypeInfoChunk.flatFieldTypes(className)
+
+    def enumNames(self, className: str) -> Dict[str, List[str]]:
+        """{column: enum constant names}, the code of a constant is its index"""
+        TypeInfoChunk = self.chunk.log.TypeInfoChunk
+        return {
+            name: TypeInfoChunk.enumDescriptions[ctype]
+            for name, ctype in TypeInfoChunk.flatFields(className)
+            if ctype in TypeInfoChunk.enumDescriptions
+        }
+
+    # Workers
+    @staticmethod
+    def plainValue(value: Any) -> Any:
+        """asDict style value of a dynamic array element"""
+        if isinstance(value, DataClass):
+            return value.asDict()
+        elif isinstance(value, Enum):
+            return value.name
+        elif isinstance(value, Angle):
+            return value.value
+        return value
+
+    @staticmethod
+    def fieldValue(reprObj: DataClass, path: List[str], dtype: str) -> Any:
+        value: Any = reprObj
+        for key in path:
+            value = value[int(key)] if key.isdigit() else getattr(value, key)
+        if dtype == "json":
+            return dumpJson([ColumnarExportPipeline.plainValue(v) for v in value], indent=None)
+        elif isinstance(value, Enum):
+            return value.value
+        elif isinstance(value, Angle):
+            return value.value
+        return value
+
+    @staticmethod
+    def parseRowGroup(
+        task: Tuple[str, Callable, List[Column], NDArray[np.int64], NDArray[np.int64]]
+    ) -> Dict[str, np.ndarray]:
+        """Worker: parse the messages of a row group into one array per field column"""
+        logFilePath, read, columns, startBytes, endBytes = task
+        paths = [name.split(".") for name, _ in columns]
+        values: List[List[Any]] = [[] for _ in columns]
+        with open(logFilePath, "rb") as logFile, mmap(
+            logFile.fileno(), 0, access=ACCESS_READ
+        ) as buf:
+            sutil = StreamUtil(buf)
+            for start, end in zip(startBytes, endBytes):
+                sutil.seek(int(start) + 4, io.SEEK_SET)
+                reprObj = read(sutil, int(end))
+                for i, (name, dtype) in enumerate(columns):
+                    values[i].append(ColumnarExportPipeline.fieldValue(reprObj, paths[i], dtype))
+        return {
+            name: np.array(values[i], dtype=str if dtype in ["json", "str"] else dtype)
+            for i, (name, dtype) in enumerate(columns)
+        }
+
+    # Writing
+    def writeRowGroup(
+        self, className: str, rowGroupIndex: int, table: Dict[str, np.ndarray], writers: Dict
+    ):
+        """Write one row group, npz files are written to a temporary file first"""
+        if self.format == "npz":
+            classDir = self.dir / className
+            os.makedirs(classDir, exist_ok=True)
+            path = classDir / f"rowGroup_{rowGroupIndex:06d}.npz"
+            tmpPath = path.with_name(path.name + ".tmp")
+            with open(tmpPath, "wb") as f:
+                np.savez(f, **table)
+            os.replace(tmpPath, path)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            arrowTable = pa.table({name: pa.array(column) for name, column in table.items()})
+            if className not in writers:
+                writers[className] = pq.ParquetWriter(
+                    self.dir / f"{className}.parquet", arrowTable.schema
+                )
+            writers[className].write_table(arrowTable)
+
+    def run(
+        self, classNames: Optional[List[str]] = None, showProgress: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Export the representations (all non-image representations in the log by default)
+        Returns the schema
+        """
+        if self.format == "parquet":
+            import pyarrow  # fail before any work is done if it is missing
+        os.makedirs(self.dir, exist_ok=True)
+        chunk = self.chunk
+        dataClasses = chunk.log.TypeInfoChunk.dataClasses
+        dataClassDescriptions = chunk.log.TypeInfoChunk.dataClassDescriptions
+
+        frameIndexes, startBytes, endBytes = chunk.messageLocations()
+        logBytes = np.memmap(chunk.logFilePath, dtype=np.uint8, mode="r")
+        logIds = logBytes[startBytes] if len(startBytes) else np.zeros(0, dtype=np.uint8)
+        del logBytes
+        if classNames is None:
+            classNames = []
+            logIdToClassName = chunk.log.MessageIDChunk.logIdToClassName
+            for logId in np.unique(logIds):
+                className = logIdToClassName[int(logId)]
+                if className in dataClassDescriptions and className not in self.excludedClasses:
+                    classNames.append(className)
+            classNames.sort()
+        threadNames = np.empty(len(chunk.frames), dtype=object)
+        for name in chunk.threadNames:
+            threadNames[chunk.threadFrameIndexes(name)] = name
+        timestamps = chunk.timestamps
+
+        schema: Dict[str, Any] = {"format": self.format, "tables": {}}
+        writers: Dict[str, Any] = {}
+        startTime = time.perf_counter()
+        pbar = tqdm(desc="Exporting Tables", unit="msg", disable=not showProgress)
+
+        def collect(parsed: Dict[str, np.ndarray], context: Tuple[str, int, Dict[str, np.ndarray]]):
+            className, rowGroupIndex, table = context
+            table.update(parsed)
+            self.writeRowGroup(className, rowGroupIndex, table, writers)
+            pbar.update(len(table["messageIndex"]))
+
+        try:
+            with BoundedExecutor(collect, self.numWorkers, self.maxInFlight) as executor:
+                for className in classNames:
+                    columns = self.columns(className)
+                    messageIndexes = np.flatnonzero(logIds == chunk.logIdOf(f"id{className}"))
+                    schema["tables"][className] = {
+                        "columns": [
+                            ("absFrameIndex", "int64"),
+                            ("messageIndex", "int64"),
+                            ("timestamp", "uint32"),
+                            ("thread", "str"),
+                        ]
+                        + columns,
+                        "enums": self.enumNames(className),
+                        "numRows": len(messageIndexes),
+                        "numRowGroups": 0,
+                    }
+                    for rowGroupIndex, start in enumerate(
+                        range(0, len(messageIndexes), self.rowGroupSize)
+                    ):
+                        indexes = messageIndexes[start : start + self.rowGroupSize]
+                        rowFrameIndexes = frameIndexes[indexes]
+                        table = {
+                            "absFrameIndex": rowFrameIndexes,
+                            "messageIndex": indexes.astype(np.int64),
+                            "timestamp": timestamps[rowFrameIndexes],
+                            "thread": threadNames[rowFrameIndexes].astype(str),
+                        }
+                        executor.submit(
+                            self.parseRowGroup,
+                            (
+                                str(chunk.logFilePath),
+                                dataClasses[className].read,
+                                columns,
+                                startBytes[indexes],
+                                endBytes[indexes],
+                            ),
+                            (className, rowGroupIndex, table),
+                        )
+                        schema["tables"][className]["numRowGroups"] += 1
+        finally:
+            for writer in writers.values():
+                writer.close()
+            pbar.close()
+
+        with open(self.dir / self.schemaName, "w") as f:
+            json.dump(schema, f, indent=2)
+        if showProgress:
+            print(
+                f"Exported {sum(table['numRows'] for table in schema['tables'].values())} messages "
+                f"of {len(classNames)} representations in {time.perf_counter() - startTime:.1f}s"
+            )
+        return schema
+
+    # Reading
+    @classmethod
+    def loadSchema(cls, dir: Path) -> Dict[str, Any]:
+        with open(Path(dir) / cls.schemaName, "r") as f:
+            return json.load(f)
+
+    @classmethod
+    def loadTable(cls, dir: Path, className: str) -> Dict[str, np.ndarray]:
+        """All row groups of a representation's table as {column: array}"""
+        schema = cls.loadSchema(dir)
+        names = [name for name, _ in schema["tables"][className]["columns"]]
+        if schema["format"] == "parquet":
+            import pyarrow.parquet as pq
+
+            arrowTable = pq.read_table(Path(dir) / f"{className}.parquet")
+            return {name: arrowTable.column(name).to_numpy() for name in names}
+        rowGroups = []
+        for i in range(schema["tables"][className]["numRowGroups"]):
+            with np.load(Path(dir) / className / f"rowGroup_{i:06d}.npz") as rowGroup:
+                rowGroups.append({name: rowGroup[name] for name in names})
+        if len(rowGroups) == 0:
+            return {name: np.zeros(0) for name in names}
+        return {name: np.concatenate([rowGroup[name] for rowGroup in rowGroups]) for name in names}
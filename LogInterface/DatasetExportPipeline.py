@@ -0,0 +1,199 @@
+import io
+import json
+import os
+import tarfile
+import time
+from multiprocessing import cpu_count
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+from tqdm import tqdm
+
+from ImageUtils.ImageEncoder import ImageEncoder, PNGEncoder
+from Utils import dumpJson
+
+from .BoundedExecutor import BoundedExecutor
+from .ImageExportPipeline import ImageExportPipeline, VideoExportPipeline
+
+Sample = Tuple[int, str, str, int, int, bytes, Dict[str, Any], Dict[str, bytes]]
+"""(absFrameIndex, className, suffix, width, height, payload, label, metaDataPayloads), fields are added to the label by the worker"""
+
+
+class DatasetExportPipeline:
+    """
+    Export images paired with representation fields of the same frame as fixed-size "tar" (webdataset) or "npz" shards
+    Shards are written by a BoundedExecutor, manifest.json lists them and shuffledShards() gives a shuffled read order
+    """
+
+    manifestName = "manifest.json"
+
+    def __init__(
+        self,
+        chunk: Any,
+        dir: Path,
+        fields: List[str],
+        shardSize: int = 1000,
+        format: str = "tar",
+        encoder: Optional[ImageEncoder] = None,
+        numWorkers: Optional[int] = None,
+    ):
+        if format not in ["tar", "npz"]:
+            raise ValueError(f"Invalid shard format: {format}")
+        self.chunk = chunk
+        self.dir = Path(dir)
+        self.fields = fields
+        self.shardSize = shardSize
+        self.format = format
+        self.encoder = encoder
+        self.numWorkers = cpu_count() if numWorkers is None else numWorkers
+
+    @staticmethod
+    def encodeSample(sample: Sample, encoder: Optional[ImageEncoder]) -> Tuple[str, bytes]:
+        """(suffix, image bytes) of a sample, only decodes if the payload has to be re-encoded"""
+        absFrameIndex, className, suffix, width, height, payload, _, _ = sample
+        if className == "JPEGImage" and encoder is None:
+            return suffix, payload
+        if encoder is None:
+            encoder = PNGEncoder()
+        rgbImage = ImageExportPipeline.decodeRGB(className, width, height, payload)
+        return encoder.suffix, encoder.encode(rgbImage)
+
+    @staticmethod
+    def labelJson(sample: Sample, fields: List[str], reads: Dict[str, Any]) -> str:
+        """The label of a sample with the fields resolved in its frame's metadata"""
+        label = dict(sample[6])
+        metaData = ImageExportPipeline.readMetaData(reads, sample[7])
+        for field in fields:
+            label[field] = VideoExportPipeline.fieldValue(metaData, field)
+        return dumpJson(label, indent=None)
+
+    @staticmethod
+    def writeShard(
+        task: Tuple[Path, str, List[Sample], Optional[ImageEncoder], List[str], Dict[str, Any]]
+    ) -> Tuple[str, List[int]]:
+        """Worker: write one shard (to a temporary file first, so a shard on disk is always complete)"""
+        path, format, samples, encoder, fields, reads = task
+        tmpPath = path.with_name(path.name + ".tmp")
+        keys = [sample[0] for sample in samples]
+        labels = [DatasetExportPipeline.labelJson(sample, fields, reads) for sample in samples]
+        if format == "tar":
+            with tarfile.open(tmpPath, "w") as tar:
+                for sample, label in zip(samples, labels):
+                    suffix, data = DatasetExportPipeline.encodeSample(sample, encoder)
+                    for name, content in [
+                        (f"{sample[0]:09d}{suffix}", data),
+                        (f"{sample[0]:09d}.json", label.encode()),
+                    ]:
+                        info = tarfile.TarInfo(name)
+                        info.size = len(content)
+                        tar.addfile(info, io.BytesIO(content))
+        else:
+            images = [DatasetExportPipeline.encodeSample(sample, encoder)[1] for sample in samples]
+            with open(tmpPath, "wb") as f:
+                np.savez(
+                    f,
+                    keys=np.array(keys, dtype=np.int64),
+                    imageBytes=np.frombuffer(b"".join(images), dtype=np.uint8),
+                    imageOffsets=np.cumsum([0] + [len(image) for image in images]),
+                    labels=np.array(labels),
+                )
+        os.replace(tmpPath, path)
+        return path.name, keys
+
+    def run(self, threads: Optional[List[str]] = None, showProgress: bool = True) -> Dict[str, Any]:
+        """
+        Export every image of the threads (all threads by default) and write the manifest
+        Returns the manifest
+        """
+        os.makedirs(self.dir, exist_ok=True)
+        names = sorted({field.split(".")[0] for field in self.fields})
+        reads = self.chunk.metaDataReads(names)
+        shards: List[Dict[str, Any]] = []
+        startTime = time.perf_counter()
+        pbar = tqdm(desc="Exporting Dataset", unit="img", disable=not showProgress)
+
+        def collect(result: Tuple[str, List[int]], _):
+            name, keys = result
+            shards.append({"name": name, "numSamples": len(keys), "keys": keys})
+            pbar.update(len(keys))
+
+        try:
+            with BoundedExecutor(collect, self.numWorkers) as executor:
+                samples: List[Sample] = []
+                numShards = 0
+
+                def submit():
+                    nonlocal samples, numShards
+                    path = self.dir / f"shard_{numShards:06d}.{self.format}"
+                    executor.submit(self.writeShard, (path, self.format, samples, self.encoder, self.fields, reads))
+                    samples = []
+                    numShards += 1
+
+                for image in self.chunk.iterImageMessages(
+                    threads=threads, withMetaData=len(names) > 0, metaDataNames=names, parseMetaData=False
+                ):
+                    label = {
+                        "absFrameIndex": image["frameIndex"],
+                        "messageIndex": image["messageIndex"],
+                        "timestamp": image["frameTimestamp"],
+                        "threadName": image["threadName"],
+                    }
+                    samples.append(
+                        (
+                            image["frameIndex"],
+                            image["className"],
+                            ".jpg" if image["className"] == "JPEGImage" else ".png",
+                            image["width"],
+                            image["height"],
+                            bytes(image["payload"]),
+                            label,
+                            {name: bytes(payload) for name, payload in image["metaDataPayloads"].items()},
+                        )
+                    )
+                    if len(samples) == self.shardSize:
+                        submit()
+                if samples:
+                    submit()
+        finally:
+            pbar.close()
+
+        shards.sort(key=lambda shard: shard["name"])
+        manifest = {
+            "format": self.format,
+            "shardSize": self.shardSize,
+            "fields": self.fields,
+            "numSamples": sum(shard["numSamples"] for shard in shards),
+            "shards": shards,
+        }
+        with open(self.dir / self.manifestName, "w") as f:
+            json.dump(manifest, f)
+        if showProgress:
+            print(
+                f"Exported {manifest['numSamples']} samples in {len(shards)} shards "
+                f"in {time.perf_counter() - startTime:.1f}s"
+            )
+        return manifest
+
+    # Reading
+    @classmethod
+    def loadManifest(cls, dir: Path) -> Dict[str, Any]:
+        with open(Path(dir) / cls.manifestName, "r") as f:
+            return json.load(f)
+
+    @staticmethod
+    def shuffledShards(
+        manifest: Dict[str, Any], seed: int, epoch: int = 0
+    ) -> List[Tuple[str, NDArray]]:
+        """
+        Deterministic shuffled read order: [(shardName, order of samples in the shard), ...]
+        Shards are shuffled and samples are shuffled inside their shard, so every shard is still read sequentially
+        The same (seed, epoch) always gives the same order
+        """
+        rng = np.random.default_rng([seed, epoch])
+        shards = manifest["shards"]
+        return [
+            (shards[i]["name"], rng.permutation(shards[i]["numSamples"]))
+            for i in rng.permutation(len(shards))
+        ]
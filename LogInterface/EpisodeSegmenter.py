@@ -0,0 +1,125 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .FeaturePipeline import FeaturePipeline
+
+
+class EpisodeSegmenter:
+    """
+    Split the frames of a thread into episodes: maximal runs of frames whose GameState.state is a playing state
+
+    The GameState state and scores are extracted as columns (FeaturePipeline) and forward filled over frames
+    without a GameState, the boundaries are the edges of the playing mask. Every episode gets an outcome:
+    - "goalFor" / "goalAgainst": the own / opponent score increased between its first frame and the frame after it
+    - the name of the state the game switched to (e.g. "ownKickOff"), "truncated" if the log ends during the episode
+    """
+
+    stateClassName = "GameState::State"
+    columnNames = [
+        "startFrame",
+        "endFrame",
+        "startRow",
+        "endRow",
+        "startTime",
+        "endTime",
+        "endState",
+        "ownGoals",
+        "opponentGoals",
+        "outcome",
+    ]
+
+    def __init__(
+        self,
+        chunk: Any,
+        thread: str = "Cognition",
+        playingStates: Optional[List[str]] = None,
+        numWorkers: Optional[int] = None,
+    ):
+        self.chunk = chunk
+        self.thread = thread
+        self.playingStates = ["playing"] if playingStates is None else playingStates
+        self.numWorkers = numWorkers
+
+    @staticmethod
+    def forwardFill(values: NDArray, valid: NDArray[np.bool_], fill: int = -1) -> NDArray[np.int64]:
+        """values[i] of the latest valid row <= i, fill before the first valid row"""
+        rows = np.arange(len(values))
+        last = np.maximum.accumulate(np.where(valid, rows, -1))
+        return np.where(last >= 0, values[np.maximum(last, 0)].astype(np.int64), fill)
+
+    def run(self, showProgress: bool = True) -> Dict[str, NDArray]:
+        """
+        Episode columns:
+        startFrame/endFrame (absFrameIndex of the first/last frame), startRow/endRow (index range [start, end) in the thread),
+        startTime/endTime, endState (state code after the episode, -1 if the log ends), ownGoals, opponentGoals, outcome
+        """
+        stateNames = self.chunk.log.TypeInfoChunk.enumDescriptions[self.stateClassName]
+        playingCodes = [stateNames.index(name) for name in self.playingStates]
+        columns = FeaturePipeline(
+            self.chunk,
+            {
+                "state": "GameState.state",
+                "ownScore": "GameState.ownTeam.score",
+                "opponentScore": "GameState.opponentTeam.score",
+            },
+            self.thread,
+            numWorkers=self.numWorkers,
+        ).run(showProgress=showProgress)
+        numRows = len(columns["absFrameIndex"])
+        if numRows == 0:
+            return {name: np.zeros(0, dtype=str if name == "outcome" else np.int64) for name in self.columnNames}
+        has = columns["hasGameState"]
+        state = self.forwardFill(columns["state"], has)
+        ownScore = self.forwardFill(columns["ownScore"], has, 0)
+        opponentScore = self.forwardFill(columns["opponentScore"], has, 0)
+
+        isPlaying = np.isin(state, playingCodes)
+        edges = np.diff(np.concatenate([[0], isPlaying.astype(np.int8), [0]]))
+        startRows = np.flatnonzero(edges == 1)
+        endRows = np.flatnonzero(edges == -1)
+        isTruncated = endRows >= numRows
+        afterRows = np.minimum(endRows, numRows - 1)
+        endState = np.where(isTruncated, -1, state[afterRows])
+        ownGoals = ownScore[afterRows] - ownScore[startRows]
+        opponentGoals = opponentScore[afterRows] - opponentScore[startRows]
+
+        outcome = np.array(
+            [stateNames[code] if code >= 0 else "truncated" for code in endState], dtype=object
+        )
+        outcome[isTruncated] = "truncated"
+        outcome[opponentGoals > 0] = "goalAgainst"
+        outcome[ownGoals > 0] = "goalFor"
+
+        frames = columns["absFrameIndex"]
+        timestamps = columns["timestamp"]
+        lastRows = np.maximum(endRows - 1, 0)
+        return {
+            "startFrame": frames[startRows],
+            "endFrame": frames[lastRows],
+            "startRow": startRows,
+            "endRow": endRows,
+            "startTime": timestamps[startRows],
+            "endTime": timestamps[lastRows],
+            "endState": endState.astype(np.int64),
+            "ownGoals": ownGoals,
+            "opponentGoals": opponentGoals,
+            "outcome": outcome.astype(str),
+        }
+
+    @staticmethod
+    def episodeIndexes(episodes: Dict[str, NDArray], absFrameIndexes: NDArray) -> NDArray[np.int64]:
+        """Episode of every frame (absolute frame indexes, e.g. FeaturePipeline's absFrameIndex), -1 outside all episodes"""
+        absFrameIndexes = np.asarray(absFrameIndexes)
+        positions = np.searchsorted(episodes["startFrame"], absFrameIndexes, side="right") - 1
+        if len(episodes["endFrame"]) == 0:
+            return np.full(len(absFrameIndexes), -1, dtype=np.int64)
+        inside = (positions >= 0) & (absFrameIndexes <= episodes["endFrame"][np.maximum(positions, 0)])
+        return np.where(inside, positions, -1)
+
+    @staticmethod
+    def episodeStarts(episodes: Dict[str, NDArray], absFrameIndexes: NDArray) -> NDArray[np.bool_]:
+        """bool mask of the frames that start a new episode (or leave one), the episode_starts of the batch observations"""
+        indexes = EpisodeSegmenter.episodeIndexes(episodes, absFrameIndexes)
+        return np.concatenate([[True], indexes[1:] != indexes[:-1]]) if len(indexes) else indexes.astype(bool)
@@ -0,0 +1,282 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import cpu_count
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from numpy.typing import NDArray
+from tqdm import tqdm
+
+from .ColumnarExportPipeline import Column, ColumnarExportPipeline
+
+Feature = Union[str, Callable[[Dict[str, NDArray]], NDArray]]
+"""A field ("<ClassName>.<dotted field>"), a NumPy expression ("=<expression>") or a callable of the columns"""
+
+
+class FeaturePipeline:
+    """
+    Extract declared features of every frame of a thread as aligned NumPy columns, one row per frame
+
+    spec is an ordered {name: feature}:
+    - "<ClassName>.<dotted field>": a leaf of TypeInfoChunk.flatFields(ClassName), e.g. "RobotPose.translation.x",
+      enums are integer codes (names in enumNames()), angles are radians
+    - "=<expression>": a NumPy expression over the other features, e.g. "=np.hypot(ballX - x, ballY - y)",
+      shift(a, n) gives the value n rows before
+    - a callable: called with the dict of the features computed so far, returns an array
+    Besides the features, the result has absFrameIndex, timestamp and has<ClassName> columns,
+    fields of frames without the representation are NaN (floats) or 0
+
+    Planning: the fields are grouped by representation, the first message of each representation in every frame
+    is located from the index arrays without parsing, and only those messages are parsed (by a process pool,
+    in groups of rowGroupSize messages). Expressions are evaluated on the whole columns afterwards
+    """
+
+    schemaName = "schema.json"
+
+    def __init__(
+        self,
+        chunk: Any,
+        spec: Dict[str, Feature],
+        thread: str = "Cognition",
+        rowGroupSize: int = 10000,
+        numWorkers: Optional[int] = None,
+        frameRange: Optional[Tuple[int, int]] = None,
+        indexArrays: Optional[Dict[str, NDArray]] = None,
+    ):
+        self.chunk = chunk
+        self.spec = spec
+        self.thread = thread
+        self.frameRange = frameRange
+        """(first, last) absFrameIndex, only the frames of the thread in it become rows"""
+        self.rowGroupSize = rowGroupSize
+        self.numWorkers = cpu_count() if numWorkers is None else numWorkers
+        """0 parses in the main process"""
+
+        # cache
+        self._indexArrays_cached: Optional[Dict[str, NDArray]] = indexArrays
+
+    # Planning
+    @staticmethod
+    def isField(feature: Feature) -> bool:
+        return isinstance(feature, str) and not feature.startswith("=")
+
+    def plan(self) -> Dict[str, List[Tuple[str, Column]]]:
+        """{className: [(feature name, (dotted field, dtype)), ...]} of the field features"""
+        TypeInfoChunk = self.chunk.log.TypeInfoChunk
+        result: Dict[str, List[Tuple[str, Column]]] = {}
+        for name, feature in self.spec.items():
+            if not self.isField(feature):
+                continue
+            className, _, field = feature.partition(".")  # type: ignore
+            if className not in TypeInfoChunk.dataClassDescriptions:
+                raise KeyError(f"Feature {name}: unknown representation {className}")
+            dtypes = dict(TypeInfoChunk.flatFieldTypes(className))
+            if field not in dtypes:
+                raise KeyError(f"Feature {name}: {className} has no primitive field {field}")
+            if dtypes[field] in ["json", "str"]:
+                raise ValueError(f"Feature {name}: {feature} is not a numeric field")
+            result.setdefault(className, []).append((name, (field, dtypes[field])))
+        return result
+
+    def enumNames(self) -> Dict[str, List[str]]:
+        """{feature name: enum constant names} of the enum fields, the code of a constant is its index"""
+        TypeInfoChunk = self.chunk.log.TypeInfoChunk
+        result = {}
+        for name, feature in self.spec.items():
+            if self.isField(feature):
+                className, _, field = feature.partition(".")  # type: ignore
+                ctype = dict(TypeInfoChunk.flatFields(className))[field]
+                if ctype in TypeInfoChunk.enumDescriptions:
+                    result[name] = TypeInfoChunk.enumDescriptions[ctype]
+        return result
+
+    def locate(
+        self, className: str, frameIndexes: NDArray[np.int64], logIds: NDArray[np.uint8], rows: NDArray[np.int64]
+    ) -> Tuple[NDArray[np.int64], NDArray[np.int64]]:
+        """(rowIndexes, messageIndexes) of the first message of the representation in every frame of the thread"""
+        logId = self.chunk.log.MessageIDChunk.logIdOfKey(className)
+        if logId is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return self.chunk.locateFirstMessages(logId, frameIndexes, logIds, rows)
+
+    @property
+    def indexArrays(self) -> Dict[str, NDArray]:
+        """
+        {frameIndexes, startBytes, endBytes, logIds} of every message of the log
+        Pipelines over other frame ranges of the same log can reuse them (indexArrays=), see PipelineRunner
+        """
+        if self._indexArrays_cached is None:
+            frameIndexes, startBytes, endBytes = self.chunk.messageLocations()
+            logBytes = np.memmap(self.chunk.logFilePath, dtype=np.uint8, mode="r")
+            logIds = logBytes[startBytes] if len(startBytes) else np.zeros(0, dtype=np.uint8)
+            del logBytes
+            self._indexArrays_cached = {
+                "frameIndexes": frameIndexes,
+                "startBytes": startBytes,
+                "endBytes": endBytes,
+                "logIds": logIds,
+            }
+        return self._indexArrays_cached
+
+    # Expressions
+    @staticmethod
+    def shift(values: NDArray, n: int = 1) -> NDArray:
+        """The value n rows before (after for negative n), the first (last) rows repeat the edge value"""
+        values = np.asarray(values)
+        if n == 0 or len(values) == 0:
+            return values
+        indexes = np.clip(np.arange(len(values)) - n, 0, len(values) - 1)
+        return values[indexes]
+
+    def evalDerived(self, name: str, feature: Feature, columns: Dict[str, NDArray]) -> NDArray:
+        if callable(feature):
+            result = feature(columns)
+        else:
+            namespace = {"__builtins__": {}, "np": np, "shift": self.shift}
+            try:
+                result = eval(feature[1:], namespace, dict(columns))
+            except NameError as e:
+                raise KeyError(f"Feature {name}: {e}")
+        result = np.asarray(result)
+        if result.ndim == 0:
+            result = np.full(len(columns["absFrameIndex"]), result)
+        return result
+
+    # Running
+    def run(self, dropIncomplete: bool = False, showProgress: bool = True) -> Dict[str, NDArray]:
+        """
+        Aligned columns of all features, one row per frame of the thread
+        With dropIncomplete, frames that miss any of the representations are dropped (after evaluating expressions)
+        """
+        chunk = self.chunk
+        plan = self.plan()
+        rows = np.asarray(chunk.threadFrameIndexes(self.thread), dtype=np.int64)
+        if self.frameRange is not None:
+            first, last = self.frameRange
+            rows = rows[np.searchsorted(rows, first) : np.searchsorted(rows, last, side="right")]
+        columns: Dict[str, NDArray] = {
+            "absFrameIndex": rows,
+            "timestamp": np.asarray(chunk.timestamps[rows]),
+        }
+
+        # Only the messages of the rows' frames are searched, messages are in frame order
+        arrays = self.indexArrays
+        frameIndexes = arrays["frameIndexes"]
+        messageStart, messageEnd = 0, 0
+        if len(rows):
+            messageStart = np.searchsorted(frameIndexes, rows[0], side="left")
+            messageEnd = np.searchsorted(frameIndexes, rows[-1], side="right")
+        frameIndexes = frameIndexes[messageStart:messageEnd]
+        startBytes = arrays["startBytes"][messageStart:messageEnd]
+        endBytes = arrays["endBytes"][messageStart:messageEnd]
+        logIds = arrays["logIds"][messageStart:messageEnd]
+
+        tasks = []
+        for className, fields in plan.items():
+            rowIndexes, messageIndexes = self.locate(className, frameIndexes, logIds, rows)
+            has = np.zeros(len(rows), dtype=bool)
+            has[rowIndexes] = True
+            columns[f"has{className}"] = has
+            for name, (_, dtype) in fields:
+                isFloat = np.issubdtype(np.dtype(dtype), np.floating)
+                columns[name] = np.full(len(rows), np.nan if isFloat else 0, dtype=dtype)
+            read = chunk.log.TypeInfoChunk.dataClasses[className].read
+            for start in range(0, len(messageIndexes), self.rowGroupSize):
+                indexes = messageIndexes[start : start + self.rowGroupSize]
+                task = (
+                    str(chunk.logFilePath),
+                    read,
+                    [column for _, column in fields],
+                    startBytes[indexes],
+                    endBytes[indexes],
+                )
+                tasks.append((className, rowIndexes[start : start + self.rowGroupSize], task))
+
+        pbar = tqdm(total=len(tasks), desc="Extracting Features", disable=not showProgress)
+        try:
+            if self.numWorkers == 0:
+                results = map(ColumnarExportPipeline.parseRowGroup, [task for _, _, task in tasks])
+                self.fillColumns(columns, plan, tasks, results, pbar)
+            else:
+                with ProcessPoolExecutor(self.numWorkers) as executor:
+                    results = executor.map(
+                        ColumnarExportPipeline.parseRowGroup, [task for _, _, task in tasks]
+                    )
+                    self.fillColumns(columns, plan, tasks, results, pbar)
+        finally:
+            pbar.close()
+
+        for name, feature in self.spec.items():
+            if not self.isField(feature):
+                columns[name] = self.evalDerived(name, feature, columns)
+
+        if dropIncomplete:
+            complete = np.ones(len(rows), dtype=bool)
+            for className in plan:
+                complete &= columns[f"has{className}"]
+            columns = {name: values[complete] for name, values in columns.items()}
+
+        order = ["absFrameIndex", "timestamp", *self.spec.keys()]
+        return {name: columns[name] for name in order + [n for n in columns if n not in order]}
+
+    @staticmethod
+    def fillColumns(columns: Dict[str, NDArray], plan: Dict, tasks: List, results: Any, pbar: tqdm):
+        for (className, rowIndexes, _), table in zip(tasks, results):
+            for name, (field, _) in plan[className]:
+                columns[name][rowIndexes] = table[field]
+            pbar.update(1)
+
+    # Writing
+    def write(
+        self,
+        dir: Path,
+        rowsPerPart: int = 100000,
+        dropIncomplete: bool = False,
+        showProgress: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Write the columns as <dir>/part_<i>.npz files of rowsPerPart rows (each written to a temporary file first)
+        and <dir>/schema.json (feature specs, enum names, number of rows and parts), returns the schema
+        """
+        columns = self.run(dropIncomplete, showProgress)
+        dir = Path(dir)
+        os.makedirs(dir, exist_ok=True)
+        numRows = len(columns["absFrameIndex"])
+        numParts = 0
+        for start in range(0, numRows, rowsPerPart):
+            path = dir / f"part_{numParts:06d}.npz"
+            tmpPath = path.with_name(path.name + ".tmp")
+            with open(tmpPath, "wb") as f:
+                np.savez(f, **{name: values[start : start + rowsPerPart] for name, values in columns.items()})
+            os.replace(tmpPath, path)
+            numParts += 1
+        schema = {
+            "thread": self.thread,
+            "columns": [(name, values.dtype.name) for name, values in columns.items()],
+            "features": {
+                name: feature if isinstance(feature, str) else getattr(feature, "__name__", "callable")
+                for name, feature in self.spec.items()
+            },
+            "enums": self.enumNames(),
+            "numRows": numRows,
+            "numParts": numParts,
+        }
+        with open(dir / self.schemaName, "w") as f:
+            json.dump(schema, f, indent=2)
+        return schema
+
+    @classmethod
+    def load(cls, dir: Path) -> Dict[str, NDArray]:
+        """All parts written by write() as {column: array}"""
+        with open(Path(dir) / cls.schemaName, "r") as f:
+            schema = json.load(f)
+        names = [name for name, _ in schema["columns"]]
+        parts = []
+        for i in range(schema["numParts"]):
+            with np.load(Path(dir) / f"part_{i:06d}.npz") as part:
+                parts.append({name: part[name] for name in names})
+        if len(parts) == 0:
+            return {name: np.zeros(0, dtype=dtype) for name, dtype in schema["columns"]}
+        return {name: np.concatenate([part[name] for part in parts]) for name in names}
@@ -1,6 +1,6 @@
 from enum import Enum
 from importlib import import_module
-from typing import Any, List, Optional, Tuple, Type, Union
+from typing import Any, List, Optional, Sequence, Tuple, Type, Union
 
 import numpy as np
 
@@ -8,6 +8,7 @@ from StreamUtils import StreamUtil
 from Utils import MemoryMappedFile
 
 from ..LogInterfaceBase import (
+    AccessorHandle,
     IndexMap,
     LogInterfaceAccessorClass,
     LogInterfaceBaseClass,
@@ -21,6 +22,8 @@ Frames = Union[List[FrameInstance], "FrameAccessor"]
 
 
 class FrameAccessor(FrameBase, LogInterfaceAccessorClass):
+    handleKind = "Frame"
+
     @staticmethod
     def decodeIndexBytes(bytes: bytes) -> Tuple[int, str, int, int]:
         if len(bytes) != FrameAccessor.frameIdxByteLength:
@@ -46,27 +49,35 @@ class FrameAccessor(FrameBase, LogInterfaceAccessorClass):
         LogInterfaceAccessorClass.__init__(self, log, indexMap)
 
     def __getitem__(
-        self, key: Union[int, str, Enum]
-    ) -> Union["FrameAccessor", MessageBase]:
+        self, key: Union[int, slice, str, Enum]
+    ) -> Union["FrameAccessor", AccessorHandle, Any]:
+        """
+        int moves the accessor, a slice gives a LogView,
+        a message name/id gives an AccessorHandle of the message (cached per frame)
+        """
         if isinstance(key, int):
             self.indexCursor = key
             return self
+        elif isinstance(key, slice):
+            # frames[a:b] -> LogView over the selected frames
+            indexMap = self.indexMap[key]
+            return import_module("LogInterface.LogView").LogView(self.log, indexMap)
         else:
             result = self.log.getCachedInfo(self, key)
             if result is not None:
                 return result
-            result = super().__getitem__(key).copy()
-            self.log.cacheInfo(self, key, result.copy().freeze())
+            result = super().__getitem__(key).handle
+            self.log.cacheInfo(self, key, result)
             return result
 
     # Core
     @property
     def startByte(self) -> int:
-        return self.messages[0].startByte
+        return self.messageCursor[0].startByte
 
     @property
     def endByte(self) -> int:
-        return self.messages[-1].endByte
+        return self.messageCursor[-1].endByte
 
     # Index file related
     @staticmethod
@@ -101,17 +112,38 @@ class FrameAccessor(FrameBase, LogInterfaceAccessorClass):
     def absMessageIndexEnd(self) -> int:
         return self.frameByteIndex[3]
 
+    @property
+    def messageLogIds(self) -> Sequence[int]:
+        """logIds of the frame's messages, read from the message index file and the log bytes"""
+        records = self.parent.messages[self.absMessageIndexStart : self.absMessageIndexEnd].indexRecords
+        logBytes = np.frombuffer(self.logBytes, dtype=np.uint8)
+        return logBytes[records[:, 2].astype(np.int64)]
+
+    def messageAt(self, index: int) -> AccessorHandle:
+        return AccessorHandle(self.log, "Message", self.absMessageIndexStart + index)
+
     def verifyMessages(self):
         for i in range(len(self)):
-            self.children[i].verify()
+            self.messageCursor[i].verify()
 
     # Children
     @property
-    def children(self) -> Messages:
-        if not hasattr(self, "_children") or self._children.frameIndex != self.absIndex:
+    def messageCursor(self) -> MessageAccessor:
+        """
+        Private message cursor of the current frame, rebased when the frame cursor moves
+        Not a copy: it is moved by every lookup on the frame, use children/messages to keep an accessor
+        """
+        if not hasattr(self, "_children") or self._children._frozen:
             self._children = self.getMessageAccessor()
+        elif self._children.frameIndex != self.absIndex:
+            self._children.rebase(range(self.absMessageIndexStart, self.absMessageIndexEnd))
         return self._children
 
+    @property
+    def children(self) -> Messages:
+        """Message accessor of the current frame, an O(1) copy of messageCursor that later frames never move"""
+        return self.messageCursor.copy()
+
     @children.setter
     def children(self, value: Messages):
         self._children = value
@@ -166,7 +198,7 @@ class FrameAccessor(FrameBase, LogInterfaceAccessorClass):
             pass
         else:
             result = []
-            for message in self.messages:
+            for message in self.messageCursor:
                 result.append(message.className)
             self.log.cacheInfo(self, "classNames", result)
         return result
@@ -3,12 +3,12 @@ import os
 from abc import abstractmethod
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Union
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 from PIL import PngImagePlugin
 
 from StreamUtils import StreamUtil
-from Utils import dumpJson
+from Utils import dumpJson, dumpJsonTo
 
 from ..Chunk import Chunk
 from ..DataClasses import Timer
@@ -26,16 +26,13 @@ class FrameBase(LogInterfaceBaseClass):
     ]
     """These threads has the FrameInfo module that reports the time stamp of the frame, Referee do not have such module"""
 
-    _timestamps_cache: List[int]
-    # _timestamps_cache: NDArray[np.uint32]
+    frameTimestampFileName: str = "frameTimestampFile.cache"
 
     def __init__(self, chunk: Chunk):
         super().__init__()
         self._children: Messages
 
         # cache
-        self._threadIndex_cached: int
-        self._timestamp_cached: int
         self._timer_cached: Timer
 
     # Magic functions
@@ -44,7 +41,7 @@ class FrameBase(LogInterfaceBaseClass):
         return dumpJson(self.asDict(), indent=self.strIndent)
 
     def __contains__(self, key: Union[str, Enum]) -> bool:
-        for message in self.messages:
+        for message in self.messageCursor:
             if (
                 message.className == key
                 if isinstance(key, str)
@@ -65,7 +62,7 @@ class FrameBase(LogInterfaceBaseClass):
                 "There might be multiple Annotations in a frame, please use frame.Annotations to get them"
             )
         elif isinstance(key, str) or isinstance(key, Enum):
-            for message in self.messages:
+            for message in self.messageCursor:
                 if (
                     message.className == key
                     if isinstance(key, str)
@@ -80,6 +77,54 @@ class FrameBase(LogInterfaceBaseClass):
         else:
             raise KeyError("Invalid key type")
 
+    def get(
+        self,
+        keys: Union[str, Enum, Sequence[Union[str, Enum]]],
+        default: Any = None,
+        parse: bool = True,
+    ) -> Union[Optional[MessageBase], Tuple[Optional[MessageBase], ...]]:
+        """
+        Get the messages of several representations (class names or message id enums) in one pass over the frame's messages
+        A single key gives its message, a list of keys gives a tuple of messages in the same order; missing ones are default
+        With parse, the representation objects of the found messages are parsed before returning
+        """
+        isSingle = isinstance(keys, (str, Enum))
+        keyList = [keys] if isSingle else list(keys)
+        MessageIDChunk = self.log.MessageIDChunk
+        keyLogIds: List[Optional[int]] = []
+        for key in keyList:
+            if key == "Annotation" or key == self.log.MessageID["idAnnotation"]:
+                raise Exception(
+                    "There might be multiple Annotations in a frame, please use frame.Annotations to get them"
+                )
+            keyLogIds.append(MessageIDChunk.logIdOfKey(key))
+
+        wanted = set(logId for logId in keyLogIds if logId is not None)
+        found: Dict[int, int] = {}
+        if wanted:
+            for index, logId in enumerate(self.messageLogIds):
+                logId = int(logId)
+                if logId in wanted and logId not in found:
+                    found[logId] = index
+                    if len(found) == len(wanted):
+                        break
+
+        messages = {logId: self.messageAt(index) for logId, index in found.items()}
+        if parse:
+            for message in messages.values():
+                message.reprObj  # parses the message if it is not parsed yet
+        result = tuple(messages.get(logId, default) for logId in keyLogIds)
+        return result[0] if isSingle else result
+
+    @property
+    def messageLogIds(self) -> Sequence[int]:
+        """logIds of the frame's messages, in order"""
+        return [message.logId for message in self.messageCursor]
+
+    def messageAt(self, index: int) -> MessageBase:
+        """The index-th message of the frame"""
+        return self.messageCursor[index]
+
     # def __getattribute__(self, name: str) -> MessageBase:
     #     try:
     #         result = super().__getattribute__(name)
@@ -95,10 +140,11 @@ class FrameBase(LogInterfaceBaseClass):
     def agentLoc(self) -> Tuple[float, float, float]:
         """[x, y, rotation]"""
         try:
+            RobotPose = self.get("RobotPose")
             agentLoc = (
-                float(self["RobotPose"]["translation"].x),
-                float(self["RobotPose"]["translation"].y),
-                float(self["RobotPose"]["rotation"].value),
+                float(RobotPose["translation"].x),
+                float(RobotPose["translation"].y),
+                float(RobotPose["rotation"].value),
             )
         except:
             return None
@@ -108,9 +154,10 @@ class FrameBase(LogInterfaceBaseClass):
     def ballLoc(self) -> Tuple[float, float]:
         """[x, y]"""
         try:
+            FieldBall = self.get("FieldBall")
             ballLoc = (
-                float(self["FieldBall"]["positionOnField"].x),
-                float(self["FieldBall"]["positionOnField"].y),
+                float(FieldBall["positionOnField"].x),
+                float(FieldBall["positionOnField"].y),
             )
         except:
             return None
@@ -137,12 +184,14 @@ class FrameBase(LogInterfaceBaseClass):
         """[[x, y],...]"""
         try:
             opponentLoc = []
-            for opponent in self["GlobalOpponentsModel"]["opponents"]:
+            GlobalOpponentsModel, RobotPose = self.get(["GlobalOpponentsModel", "RobotPose"])
+            translation = RobotPose["translation"]
+            for opponent in GlobalOpponentsModel["opponents"]:
                 # Have to convert to global coordinates
                 opponentLoc.append(
                     (
-                        float(opponent.position.x + self["RobotPose"]["translation"].x),
-                        float(opponent.position.y + self["RobotPose"]["translation"].y),
+                        float(opponent.position.x + translation.x),
+                        float(opponent.position.y + translation.y),
                     )
                 )
         except:
@@ -153,10 +202,11 @@ class FrameBase(LogInterfaceBaseClass):
     def motionBasics(self) -> Tuple[float, float, float]:
         """[speed_x, speed_y, rotation]"""
         try:
+            speed = self.get("MotionInfo")["speed"]
             motionBasics = (
-                float(self["MotionInfo"]["speed"]["translation"].x),
-                float(self["MotionInfo"]["speed"]["translation"].y),
-                float(self["MotionInfo"]["speed"]["rotation"].value),
+                float(speed["translation"].x),
+                float(speed["translation"].y),
+                float(speed["rotation"].value),
             )
         except:
             return None
@@ -165,16 +215,17 @@ class FrameBase(LogInterfaceBaseClass):
     @property
     def kickBasics(self) -> Tuple[float, float, float]:
         try:
+            MotionRequest = self.get("MotionRequest")
             alignPreciselyModified = 0
-            if self["MotionRequest"]["alignPrecisely"].value == 0:
+            if MotionRequest["alignPrecisely"].value == 0:
                 alignPreciselyModified = 1
-            elif self["MotionRequest"]["alignPrecisely"].value == 1:
+            elif MotionRequest["alignPrecisely"].value == 1:
                 alignPreciselyModified = 0
-            elif self["MotionRequest"]["alignPrecisely"].value == 2:
+            elif MotionRequest["alignPrecisely"].value == 2:
                 alignPreciselyModified = 0.5
             kickBasics = (
-                self["MotionRequest"]["kickType"].name,
-                int(self["MotionRequest"]["kickLength"]),
+                MotionRequest["kickType"].name,
+                int(MotionRequest["kickLength"]),
                 alignPreciselyModified,
             )
         except:
@@ -228,6 +279,11 @@ class FrameBase(LogInterfaceBaseClass):
     def messages(self, value: Messages):
         self.children = value
 
+    @property
+    def messageCursor(self) -> Messages:
+        """The messages for lookups inside the frame, FrameAccessor overrides it with its private cursor (not copied)"""
+        return self.children
+
     @property
     def Annotations(self) -> Messages:
         """
@@ -235,19 +291,19 @@ class FrameBase(LogInterfaceBaseClass):
         You cannot access annotation elsewhere because it is the only kind of
         message that might appear multiple times in a frame
         """
-        if isinstance(self.children, LogInterfaceAccessorClass):
+        if isinstance(self.messageCursor, LogInterfaceAccessorClass):
             annotationMap: list[int] = []
-            for message in self.messages:
+            for message in self.messageCursor:
                 if message.className == "Annotation":
                     annotationMap.append(message.absIndex)
-            result: MessageAccessor = self.children.copy()  # type: ignore
+            result: MessageAccessor = self.messageCursor.copy()  # type: ignore
             if len(annotationMap) == 0:
                 return []
             result.indexMap = annotationMap  # type: ignore
             return result
-        elif isinstance(self.children, list):
+        elif isinstance(self.messageCursor, list):
             result: list[MessageInstance] = []
-            for message in self.messages:
+            for message in self.messageCursor:
                 if message.className == "Annotation":
                     result.append(message)  # type:ignore
             return result
@@ -277,7 +333,7 @@ class FrameBase(LogInterfaceBaseClass):
     @property
     def numMessages(self) -> int:
         """The number of messages in this frame"""
-        return len(self.messages)
+        return len(self.messageCursor)
 
     @property
     def timer(self) -> Timer:
@@ -294,34 +350,25 @@ class FrameBase(LogInterfaceBaseClass):
 
     @property
     def threadIndex(self) -> int:
-        """The index of this frame in its thread"""
-        if hasattr(self, "_threadIndex_cached"):
-            return self._threadIndex_cached
-        thread = self.log.getContentChunk().thread(self.threadName)
-        if isinstance(thread, LogInterfaceAccessorClass):
-            if thread is self:
-                return self.indexCursor
-            for frame in thread:
-                if frame.absIndex == self.absIndex:
-                    return frame.indexCursor
-        elif isinstance(thread, list):
-            for i, c in enumerate(thread):
-                c._threadIndex_cached = i
-        return self._threadIndex_cached
+        """The index of this frame in its thread (see UncompressedChunk.frameThreadIndexes)"""
+        return int(self.log.getContentChunk().frameThreadIndexes[self.absIndex])
 
     @property
     def threadTimeInterval(self) -> int:
         """The time elapse between this log frame and the last log frame of the thread"""
         if self.threadIndex == 0:
             return 0
-        return self.timestamp - self.thread[self.threadIndex - 1].timestamp
+        threadTimestamps = self.log.getContentChunk().threadTimestamps(self.threadName)
+        return int(threadTimestamps[self.threadIndex]) - int(
+            threadTimestamps[self.threadIndex - 1]
+        )
 
     # Dict Representation of the object
     @property
     def reprsDict(self) -> Dict[str, Dict]:
         """Dict of ClassName: Representation object for all messages in this frame"""
         result = {}
-        for message in self.messages:
+        for message in self.messageCursor:
             result[message.className] = message.reprDict
         return result
 
@@ -349,103 +396,13 @@ class FrameBase(LogInterfaceBaseClass):
     @property
     def timestamp(self) -> int:
         """
-        The time stamp of this frame, if it doesn't have a timestamp, use the timestamp of closest frame that has one
+        The time stamp of this frame, if it doesn't have a timestamp, it is interpolated from the closest frames that have one
         """
-
-        if (
-            not hasattr(FrameBase, "_timestamps_cache")
-            or FrameBase._timestamps_cache is None
-        ):
-            setattr(FrameBase, "_timestamps_cache", [0] * len(self.parent.children))
-        elif len(self._timestamps_cache) != len(self.parent.children):
-            self._timestamps_cache.extend(
-                [0] * (len(self.parent.children) - len(self._timestamps_cache))
-            )
-
-        if self._timestamps_cache[self.absIndex] != 0:
-            return self._timestamps_cache[self.absIndex]
-
-        if "FrameInfo" in self and "time" in self["FrameInfo"]:
-            self._timestamps_cache[self.absIndex] = self["FrameInfo"]["time"]
-            return self._timestamps_cache[self.absIndex]
-        else:
-            # Fake a reasonable timestamp
-            sign = -1
-            distance = 0
-            found = False
-            rangeOfIndex = range(len(self.parent.children))
-            while (
-                self.absIndex + distance in rangeOfIndex
-                or self.absIndex - distance in rangeOfIndex
-            ):
-                if self.absIndex + sign * distance in rangeOfIndex:
-                    cand = self.parent.children[self.absIndex + sign * distance]
-                    if "FrameInfo" in cand and "time" in cand["FrameInfo"]:
-                        for i in range(distance):
-                            self._timestamps_cache[self.absIndex + sign * i] = (
-                                cand.timestamp - sign * (distance - i)
-                            )
-                        found = True
-                        break
-                if sign == 1:
-                    distance += 1
-                else:
-                    sign = -sign
-            if not found:
-                for i in rangeOfIndex:
-                    self._timestamps_cache = range(len(self.parent.children))
-        return self._timestamps_cache[self.absIndex]
+        return int(self.log.getContentChunk().timestamps[self.absIndex])
 
     def interpolateAllTimestamps(self):
-        # Fake a reasonable timestamp
-        lastValidTimestamp = -1
-        lastFrameWithoutTimestamp = (
-            -2
-        )  # -1 means no frame without timestamp; -2 no valid timestamp from [0]
-        for i in range(len(self.parent.children)):
-            frame = self.parent.children[i]
-
-            currentFrameHasTimestamp = False
-            if self._timestamps_cache[frame.absIndex] != 0:
-                timestamp = self._timestamps_cache[frame.absIndex]
-                currentFrameHasTimestamp = True
-            elif "FrameInfo" in frame and "time" in frame["FrameInfo"]:
-                timestamp = frame["FrameInfo"]["time"]
-                currentFrameHasTimestamp = True
-
-            if currentFrameHasTimestamp:
-                if lastFrameWithoutTimestamp != -1:
-                    pass
-                elif lastFrameWithoutTimestamp == -2:
-                    for j in range(lastFrameWithoutTimestamp, i):
-                        self._timestamps_cache[j] = timestamp - j
-                else:
-                    for j in range(lastFrameWithoutTimestamp, i):
-                        interpolatedTimestamp = int(
-                            lastValidTimestamp
-                            + (timestamp - lastValidTimestamp)
-                            / (i - lastFrameWithoutTimestamp)
-                            * (j - lastFrameWithoutTimestamp)
-                        )
-                        self._timestamps_cache[j] = interpolatedTimestamp
-            else:
-                if lastFrameWithoutTimestamp == -1:
-                    lastFrameWithoutTimestamp = i
-
-            if currentFrameHasTimestamp:
-                lastValidTimestamp = timestamp
-
-        if lastFrameWithoutTimestamp == -1:
-            pass
-        elif lastFrameWithoutTimestamp == -2:
-            print("Warning: No frame has valid timestamp, frame index is used instead")
-            for i in range(len(self.parent.children)):
-                self._timestamps_cache[i] = i
-        else:
-            for j in range(lastFrameWithoutTimestamp, len(self.parent.children)):
-                self._timestamps_cache[j] = (
-                    lastValidTimestamp + (j - lastFrameWithoutTimestamp) + 1
-                )
+        """Recompute the timestamps of all frames (they are normally computed during eval)"""
+        self.log.getContentChunk().evalTimestamps()
 
     @property
     def picklePath(self) -> Path:
@@ -481,7 +438,7 @@ class FrameBase(LogInterfaceBaseClass):
     @property
     def hasImage(self) -> bool:
         """Check if this frame contains at least one Image message"""
-        for message in self.messages.copy():
+        for message in self.messageCursor:
             if message.isImage:
                 return True
         return False
@@ -565,4 +522,4 @@ class FrameBase(LogInterfaceBaseClass):
             dir = self.log.frameDir
         os.makedirs(dir, exist_ok=True)
         with open(os.path.join(dir, fileName), "w") as f:
-            f.write(str(self))
+            dumpJsonTo(self.asDict(), f, indent=self.strIndent)
@@ -14,8 +14,8 @@ class FrameInstance(FrameBase, LogInterfaceInstanceClass):
 
         self.dummyMessages: Messages
 
-        # cache
-        self._absMessageIndexStart_cached: int
+        # recorded by UncompressedChunk during eval
+        self._absIndex: int
 
     def __getitem__(self, key: Union[int, str, Enum]) -> FrameBase:
         if isinstance(key, int):
@@ -31,13 +31,7 @@ class FrameInstance(FrameBase, LogInterfaceInstanceClass):
     @property
     def absMessageIndexStart(self) -> int:
         """Absolute message index in the whole file (after removing the dummy messages)"""
-        if hasattr(self, "_absMessageIndexStart_cached"):
-            return self._absMessageIndexStart_cached
-        cnt = 0
-        for frame in self.parent.children:
-            frame._absMessageIndexStart_cached = cnt
-            cnt += len(frame.messages) + len(frame.dummyMessages)
-        return self._absMessageIndexStart_cached
+        return int(self.parent.frameMessageIndexStarts[self.absIndex])
 
     @property
     def absMessageIndexEnd(self) -> int:
@@ -45,13 +39,16 @@ class FrameInstance(FrameBase, LogInterfaceInstanceClass):
 
     @property
     def absIndex(self) -> int:
-        """Absolute frame index in the whole file"""
-        if hasattr(self, "_absIndex_cached"):
-            return self._absIndex_cached
-        else:
+        """Absolute frame index in the whole file, recorded during eval"""
+        if not hasattr(self, "_absIndex"):  # frames unpickled from caches written before it was recorded
             for idx, frame in enumerate(self.parent.children):
-                frame._absIndex_cached = idx
-        return self._absIndex_cached
+                frame._absIndex = idx
+        return self._absIndex
+
+    @property
+    def index(self) -> int:
+        """Index in the chunk's frames, which is the absolute index"""
+        return self.absIndex
 
     # Children
     @property
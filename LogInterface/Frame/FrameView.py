@@ -0,0 +1,65 @@
+from typing import Any, List, Sequence
+
+from StreamUtils import StreamUtil
+
+from ..Message import MessageView
+from .FrameInstance import FrameInstance
+
+
+class FrameView(FrameInstance):
+    """
+    Frame of an array backed chunk: a thin view over one row of the chunk's ChunkArrays, created on access
+    Its messages are MessageViews, created when the frame's children are first accessed
+    """
+
+    def __init__(self, chunk: Any, absIndex: int):
+        FrameInstance.__init__(self, chunk)
+        self._absIndex = int(absIndex)
+        self.dummyMessages = []  # dummy messages are not kept in the arrays
+
+    # Storage fields
+    @property
+    def _startByte(self) -> int:
+        return int(self.parent.arrays.frameStartBytes[self._absIndex])
+
+    @property
+    def _endByte(self) -> int:
+        return int(self.parent.arrays.frameEndBytes[self._absIndex])
+
+    # Core
+    @property
+    def threadName(self) -> str:
+        arrays = self.parent.arrays
+        return arrays.threadNames[arrays.frameThreadIds[self._absIndex]]
+
+    @property
+    def absMessageIndexStart(self) -> int:
+        return int(self.parent.arrays.frameMessageStarts[self._absIndex])
+
+    @property
+    def absMessageIndexEnd(self) -> int:
+        return int(self.parent.arrays.frameMessageEnds[self._absIndex])
+
+    @property
+    def messageLogIds(self) -> Sequence[int]:
+        return self.parent.arrays.messageLogIds[self.absMessageIndexStart : self.absMessageIndexEnd]
+
+    def messageAt(self, index: int) -> MessageView:
+        return MessageView(self.parent, self.absMessageIndexStart + index, self)
+
+    # Children
+    @property
+    def children(self) -> List[MessageView]:
+        if not hasattr(self, "_children"):
+            self._children = [
+                MessageView(self.parent, absIndex, self)
+                for absIndex in range(self.absMessageIndexStart, self.absMessageIndexEnd)
+            ]
+        return self._children
+
+    @children.setter
+    def children(self, value: List[MessageView]) -> None:
+        self._children = value
+
+    def eval(self, sutil: StreamUtil, offset: int = 0):
+        raise NotImplementedError("Frame views are created from evaluated arrays, they cannot eval")
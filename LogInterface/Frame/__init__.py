@@ -1,5 +1,6 @@
 from .FrameAccessor import FrameAccessor, Frames
 from .FrameBase import FrameBase
 from .FrameInstance import FrameInstance
+from .FrameView import FrameView
 
-# __all__ = ["FrameBase", "FrameInstance", "FrameAccessor", "Frames"]
+# __all__ = ["FrameBase", "FrameInstance", "FrameAccessor", "FrameView", "Frames"]
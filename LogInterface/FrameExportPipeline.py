@@ -0,0 +1,222 @@
+import gzip
+import io
+import os
+import shutil
+import time
+from mmap import ACCESS_READ, mmap
+from multiprocessing import cpu_count
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+from StreamUtils import StreamUtil
+from Utils import dumpJson
+
+from .BoundedExecutor import BoundedExecutor
+
+FrameRecord = Tuple[Dict[str, Any], List[Tuple[str, int, int]]]
+"""(infoDict, [(className, startByte, endByte), ...] of the frame's messages)"""
+
+
+class FrameExportPipeline:
+    """
+    Export every frame as a json line (FrameBase.asDict) into <dir>/<logStem>_<thread>.ndjson(.gz) per thread
+    Parts of framesPerPart frames are written by a BoundedExecutor and concatenated in order
+    """
+
+    def __init__(
+        self,
+        chunk: Any,
+        dir: Path,
+        compress: bool = False,
+        framesPerPart: int = 1000,
+        numWorkers: Optional[int] = None,
+        maxInFlight: Optional[int] = None,
+    ):
+        self.chunk = chunk
+        self.dir = Path(dir)
+        self.compress = compress
+        self.framesPerPart = framesPerPart
+        self.numWorkers = cpu_count() if numWorkers is None else numWorkers
+        self.maxInFlight = maxInFlight
+
+    @property
+    def suffix(self) -> str:
+        return ".ndjson.gz" if self.compress else ".ndjson"
+
+    def threadFilePath(self, thread: str) -> Path:
+        return self.dir / f"{Path(self.chunk.logFilePath).stem}_{thread}{self.suffix}"
+
+    @staticmethod
+    def writePart(
+        task: Tuple[str, Path, bool, Dict[str, Callable], List[FrameRecord]]
+    ) -> Tuple[Path, int]:
+        """Worker: parse the messages of a range of frames and write them as json lines"""
+        logFilePath, partPath, compress, reads, records = task
+        with open(logFilePath, "rb") as logFile, mmap(
+            logFile.fileno(), 0, access=ACCESS_READ
+        ) as buf, open(partPath, "wb") as partFile:
+            sutil = StreamUtil(buf)
+            out: IO[bytes] = gzip.GzipFile(fileobj=partFile, mode="wb") if compress else partFile
+            for infoDict, messages in records:
+                reprsDict = {}
+                for className, start, end in messages:
+                    sutil.seek(start + 4, io.SEEK_SET)
+                    reprsDict[className] = reads[className](sutil, end).asDict()
+                line = dumpJson({"Info": infoDict, "ReprsDict": reprsDict}, indent=None)
+                out.write(line.encode() + b"\n")
+            if compress:
+                out.close()
+        return partPath, len(records)
+
+    def indexArrays(self) -> Dict[str, Any]:
+        """Index arrays the records of the parts are built from, one entry per message or per frame"""
+        chunk = self.chunk
+        frameIndexes, startBytes, endBytes = chunk.messageLocations()
+        numFrames = len(chunk.frames)
+        logBytes = np.memmap(chunk.logFilePath, dtype=np.uint8, mode="r")
+        logIds = logBytes[startBytes] if len(startBytes) else np.zeros(0, dtype=np.uint8)
+        del logBytes
+        imageLogIds = [
+            logId
+            for logId in [chunk.logIdOf("idCameraImage"), chunk.logIdOf("idJPEGImage")]
+            if logId is not None
+        ]
+        return {
+            "frameStarts": np.searchsorted(frameIndexes, np.arange(numFrames), side="left"),
+            "frameEnds": np.searchsorted(frameIndexes, np.arange(numFrames), side="right"),
+            "startBytes": startBytes,
+            "endBytes": endBytes,
+            "logIds": logIds,
+            "isImage": np.isin(logIds, imageLogIds),
+            "timestamps": chunk.timestamps,
+        }
+
+    def partRecords(
+        self, arrays: Dict[str, Any], thread: str, threadFrameIndexes: np.ndarray, start: int, stop: int
+    ) -> List[FrameRecord]:
+        """
+        Records of the frames [start, stop) of the thread, built when the part is submitted
+        Messages with an unknown logId (className None) or without a data class are listed in classNames but not parsed
+        """
+        classNameOfLogId = self.chunk.log.MessageIDChunk.logIdToClassName
+        dataClasses = self.chunk.log.TypeInfoChunk.dataClasses
+        startBytes, endBytes, timestamps = arrays["startBytes"], arrays["endBytes"], arrays["timestamps"]
+        records: List[FrameRecord] = []
+        for threadIndex in range(start, stop):
+            frameIndex = threadFrameIndexes[threadIndex]
+            frameStart, frameEnd = arrays["frameStarts"][frameIndex], arrays["frameEnds"][frameIndex]
+            classNames = [classNameOfLogId[int(logId)] for logId in arrays["logIds"][frameStart:frameEnd]]
+            startByte = int(startBytes[frameStart]) if frameEnd > frameStart else 0
+            endByte = int(endBytes[frameEnd - 1]) if frameEnd > frameStart else 0
+            infoDict = {
+                "threadName": thread,
+                "timestamp": int(timestamps[frameIndex]),
+                "threadTimeInterval": 0
+                if threadIndex == 0
+                else int(timestamps[frameIndex]) - int(timestamps[threadFrameIndexes[threadIndex - 1]]),
+                "frameIndex": int(frameIndex),
+                "frameIndexInThread": threadIndex,
+                "hasImage": bool(arrays["isImage"][frameStart:frameEnd].any()),
+                "numMessages": int(frameEnd - frameStart),
+                "classNames": classNames,
+                "bytesSize": endByte - startByte,
+                "byteStartPos": startByte,
+                "byteEndPos": endByte,
+            }
+            messages = [
+                (className, int(startBytes[i]), int(endBytes[i]))
+                for className, i in zip(classNames, range(frameStart, frameEnd))
+                if className in dataClasses
+            ]
+            records.append((infoDict, messages))
+        return records
+
+    def run(self, threads: Optional[List[str]] = None, showProgress: bool = True) -> Dict[str, Path]:
+        """
+        Export every frame of the threads (all threads by default)
+        Returns {threadName: path of the ndjson file}
+        """
+        os.makedirs(self.dir, exist_ok=True)
+        partDir = self.dir / f".{Path(self.chunk.logFilePath).stem}_parts"
+        os.makedirs(partDir, exist_ok=True)
+        chunk = self.chunk
+        dataClasses = chunk.log.TypeInfoChunk.dataClasses
+        if threads is None:
+            threads = list(chunk.threadNames)
+        threadFrameIndexes = {
+            thread: chunk.threadFrameIndexes(thread)
+            if thread in chunk.threadNames
+            else np.zeros(0, dtype=np.int64)
+            for thread in threads
+        }
+        numFrames = sum(len(indexes) for indexes in threadFrameIndexes.values())
+        arrays = self.indexArrays()
+        startTime = time.perf_counter()
+        pbar = tqdm(desc="Exporting Frames", unit="frame", total=numFrames, disable=not showProgress)
+
+        result: Dict[str, Path] = {}
+        threadFiles: Dict[str, IO[bytes]] = {}
+
+        def openThreadFile(thread: str) -> IO[bytes]:
+            if thread not in threadFiles:
+                path = self.threadFilePath(thread)
+                threadFiles[thread] = open(path.with_name(path.name + ".tmp"), "wb")
+            return threadFiles[thread]
+
+        def closeThreadFile(thread: str):
+            path = self.threadFilePath(thread)
+            openThreadFile(thread).close()
+            del threadFiles[thread]
+            os.replace(path.with_name(path.name + ".tmp"), path)
+            result[thread] = path
+
+        def collect(part: Tuple[Path, int], context: Tuple[str, bool]):
+            # Parts are collected in submission order, so every thread file is concatenated in order
+            partPath, numPartFrames = part
+            thread, isLast = context
+            with open(partPath, "rb") as partFile:
+                shutil.copyfileobj(partFile, openThreadFile(thread))
+            partPath.unlink()
+            pbar.update(numPartFrames)
+            if isLast:
+                closeThreadFile(thread)
+
+        try:
+            with BoundedExecutor(collect, self.numWorkers, self.maxInFlight) as executor:
+                for thread in threads:
+                    indexes = threadFrameIndexes[thread]
+                    if len(indexes) == 0:
+                        executor.drain()
+                        closeThreadFile(thread)
+                        continue
+                    for partIndex, start in enumerate(range(0, len(indexes), self.framesPerPart)):
+                        stop = min(start + self.framesPerPart, len(indexes))
+                        partRecords = self.partRecords(arrays, thread, indexes, start, stop)
+                        reads = {
+                            className: dataClasses[className].read
+                            for _, messages in partRecords
+                            for className, _, _ in messages
+                        }
+                        executor.submit(
+                            self.writePart,
+                            (
+                                str(chunk.logFilePath),
+                                partDir / f"{thread}_{partIndex:06d}{self.suffix}",
+                                self.compress,
+                                reads,
+                                partRecords,
+                            ),
+                            (thread, stop == len(indexes)),
+                        )
+        finally:
+            pbar.close()
+            for threadFile in threadFiles.values():
+                threadFile.close()
+            shutil.rmtree(partDir, ignore_errors=True)
+
+        if showProgress:
+            print(f"Exported {numFrames} frames of {len(result)} threads in {time.perf_counter() - startTime:.1f}s")
+        return result
@@ -0,0 +1,324 @@
+import os
+import queue
+import threading
+import time
+from multiprocessing import cpu_count
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from tqdm import tqdm
+
+from ImageUtils.ImageEncoder import ImageEncoder, PNGEncoder
+from ImageUtils.JPEGImage import JPEGImage
+from StreamUtils import StreamUtil
+from Utils import dumpJson
+
+from .BoundedExecutor import BoundedExecutor
+
+
+class ImageExportPipeline:
+    """
+    Export the camera stream of a log with all cores and constant memory (see BoundedExecutor)
+    reader (message index, nothing parsed) -> workers (decode, YUYV to RGB, encode) -> writer threads
+    """
+
+    def __init__(
+        self,
+        chunk: Any,
+        dir: Path,
+        encoder: Optional[ImageEncoder] = None,
+        numWorkers: Optional[int] = None,
+        numWriters: int = 2,
+        maxInFlight: Optional[int] = None,
+    ):
+        self.chunk = chunk
+        self.dir = Path(dir)
+        self.encoder = PNGEncoder() if encoder is None else encoder
+        self.numWorkers = cpu_count() if numWorkers is None else numWorkers
+        self.numWriters = numWriters
+        self.maxInFlight = maxInFlight
+
+    @staticmethod
+    def decodeRGB(className: str, width: int, height: int, payload: bytes) -> np.ndarray:
+        """Payload of a JPEGImage/CameraImage message to a (height, width * 2, 3) RGB image"""
+        if className == "JPEGImage":
+            yuyv = JPEGImage.decodeJPEG(payload, width, height)
+        else:
+            yuyv = np.frombuffer(payload, dtype=np.uint8).reshape((height, width * 2, 2))
+        return cv2.cvtColor(yuyv, cv2.COLOR_YUV2RGB_YUYV)
+
+    @staticmethod
+    def readMetaData(reads: Dict[str, Any], payloads: Dict[str, Any]) -> Dict[str, Any]:
+        """{name: reprDict} of the message bodies in metaDataPayloads (UncompressedChunk.iterImageMessages)"""
+        result = {}
+        for name, payload in payloads.items():
+            result[name] = reads[name](StreamUtil(bytes(payload)), len(payload)).asDict()
+        return result
+
+    @staticmethod
+    def encodeImage(
+        task: Tuple[str, str, int, int, bytes, Dict[str, Any], Dict[str, bytes], Optional[Dict], ImageEncoder]
+    ) -> Tuple[str, bytes, Optional[bytes]]:
+        """Worker: parse the metadata, decode the payload, convert it to RGB and encode it (and the sidecar)"""
+        imgName, className, width, height, payload, reads, metaDataPayloads, sidecar, encoder = task
+        metaData = ImageExportPipeline.readMetaData(reads, metaDataPayloads)
+        rgbImage = ImageExportPipeline.decodeRGB(className, width, height, payload)
+        data = encoder.encode(rgbImage, {name: dumpJson(value) for name, value in metaData.items()})
+        if sidecar is None:
+            return imgName, data, None
+        sidecar.update(metaData)
+        return imgName, data, dumpJson(sidecar).encode()
+
+    def writeFiles(self, writeQueue: queue.Queue, errors: List[BaseException]):
+        """
+        Writer thread: write (path, bytes) pairs until a None is received
+        A failed write is recorded in errors (raised by run()), later items are skipped
+        """
+        while True:
+            item = writeQueue.get()
+            if item is None:
+                break
+            try:
+                if not errors:
+                    for path, data in item:
+                        with open(path, "wb") as f:
+                            f.write(data)
+            except BaseException as e:
+                errors.append(e)
+
+    def run(self, threads: Optional[List[str]] = None, showProgress: bool = True) -> Dict[str, float]:
+        """
+        Export every image of the threads (all threads by default)
+        Returns {"numImages", "numBytes", "seconds", "imagesPerSecond", "MBPerSecond"}
+        """
+        os.makedirs(self.dir, exist_ok=True)
+        numImages = 0
+        numBytes = 0
+
+        def queueFiles(result: Tuple[str, bytes, Optional[bytes]], _):
+            nonlocal numImages, numBytes
+            imgName, data, sidecar = result
+            files = [(self.dir / f"{imgName}{self.encoder.suffix}", data)]
+            if sidecar is not None:
+                files.append((self.dir / f"{imgName}.json", sidecar))
+            writeQueue.put(files)  # blocks while the writers are behind
+            numImages += 1
+            numBytes += len(data)
+            pbar.update(1)
+
+        executor = BoundedExecutor(queueFiles, self.numWorkers, self.maxInFlight)
+        writeQueue: queue.Queue = queue.Queue(maxsize=executor.maxInFlight)
+        errors: List[BaseException] = []
+        writers = [
+            threading.Thread(target=self.writeFiles, args=(writeQueue, errors), daemon=True)
+            for _ in range(self.numWriters)
+        ]
+        for writer in writers:
+            writer.start()
+        pbar = tqdm(desc="Exporting Images", unit="img", disable=not showProgress)
+        startTime = time.perf_counter()
+
+        reads = self.chunk.metaDataReads(self.chunk.imageMetaDataNames)
+        try:
+            with executor:
+                for image in self.chunk.iterImageMessages(threads=threads, parseMetaData=False):
+                    if errors:
+                        break
+                    sidecar = None
+                    if not self.encoder.embedsMetaData:
+                        sidecar = {key: image[key] for key in self.chunk.imageSidecarKeys}
+                    executor.submit(
+                        self.encodeImage,
+                        (
+                            image["imgName"],
+                            image["className"],
+                            image["width"],
+                            image["height"],
+                            bytes(image["payload"]),
+                            reads,
+                            {name: bytes(payload) for name, payload in image["metaDataPayloads"].items()},
+                            sidecar,
+                            self.encoder,
+                        ),
+                    )
+        finally:  # the writers always stop, also when the reader or a worker raised
+            for _ in writers:
+                writeQueue.put(None)
+            for writer in writers:
+                writer.join()
+            pbar.close()
+        if errors:
+            raise errors[0]
+
+        seconds = time.perf_counter() - startTime
+        stats = {
+            "numImages": numImages,
+            "numBytes": numBytes,
+            "seconds": seconds,
+            "imagesPerSecond": numImages / seconds if seconds > 0 else 0.0,
+            "MBPerSecond": numBytes / 2**20 / seconds if seconds > 0 else 0.0,
+        }
+        if showProgress:
+            print(
+                f"Exported {numImages} images ({stats['numBytes'] / 2**20:.1f} MB) in {seconds:.1f}s: "
+                f"{stats['imagesPerSecond']:.1f} images/s, {stats['MBPerSecond']:.1f} MB/s"
+            )
+        return stats
+
+
+class VideoExportPipeline:
+    """
+    Export the camera stream of one thread (e.g. Upper/Lower) as a video, images are decoded by a BoundedExecutor
+    With useTimestamps images are repeated or dropped to keep their frame's time, overlayFields are drawn as text
+    """
+
+    def __init__(
+        self,
+        chunk: Any,
+        path: Path,
+        fps: float = 30,
+        fourcc: str = "mp4v",
+        overlayFields: Optional[List[str]] = None,
+        useTimestamps: bool = True,
+        numWorkers: Optional[int] = None,
+        maxInFlight: Optional[int] = None,
+    ):
+        self.chunk = chunk
+        self.path = Path(path)
+        self.fps = fps
+        self.fourcc = fourcc
+        self.overlayFields = [] if overlayFields is None else overlayFields
+        self.useTimestamps = useTimestamps
+        self.numWorkers = cpu_count() if numWorkers is None else numWorkers
+        self.maxInFlight = maxInFlight
+
+    @staticmethod
+    def fieldValue(metaData: Dict[str, Any], field: str) -> Any:
+        """Resolve "Representation.dotted.field" in the reprDicts of a frame, None if missing"""
+        value: Any = metaData
+        for key in field.split("."):
+            if isinstance(value, dict) and key in value:
+                value = value[key]
+            else:
+                return None
+        return value
+
+    @staticmethod
+    def decodeFrame(
+        task: Tuple[str, int, int, bytes, List[str], Dict[str, Any], Dict[str, bytes]]
+    ) -> np.ndarray:
+        """Worker: decode the payload to BGR (what VideoWriter expects) and draw the overlay lines"""
+        className, width, height, payload, lines, reads, metaDataPayloads = task
+        if lines:
+            metaData = ImageExportPipeline.readMetaData(reads, metaDataPayloads)
+            lines = lines[:1] + [
+                f"{field}: {VideoExportPipeline.fieldValue(metaData, field)}" for field in lines[1:]
+            ]
+        image = cv2.cvtColor(
+            ImageExportPipeline.decodeRGB(className, width, height, payload),
+            cv2.COLOR_RGB2BGR,
+        )
+        scale = image.shape[0] / 960
+        for i, line in enumerate(lines):
+            cv2.putText(
+                image,
+                line,
+                (int(10 * scale) + 1, int((i + 1) * 36 * scale) + 1),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                scale,
+                (0, 255, 0),
+                max(int(2 * scale), 1),
+            )
+        return image
+
+    def run(self, thread: str, showProgress: bool = True) -> Dict[str, float]:
+        """
+        Write the images of the thread into the video
+        Returns {"numImages", "numVideoFrames", "seconds", "imagesPerSecond"}
+        """
+        os.makedirs(self.path.parent, exist_ok=True)
+        overlayNames = sorted({field.split(".")[0] for field in self.overlayFields})
+        reads = self.chunk.metaDataReads(overlayNames)
+        writer: Optional[cv2.VideoWriter] = None
+        size: Tuple[int, int] = (0, 0)
+        numImages = 0
+        numVideoFrames = 0
+        startTime = time.perf_counter()
+        pbar = tqdm(desc=f"Exporting {thread} Video", unit="img", disable=not showProgress)
+
+        previous: Optional[Tuple[np.ndarray, int]] = None
+        videoStartTime = 0
+
+        def write(image: np.ndarray, timestamp: int):
+            """Write the previous image until the timestamp of the new one"""
+            nonlocal writer, size, previous, videoStartTime, numImages, numVideoFrames
+            if writer is None:
+                size = (image.shape[1], image.shape[0])
+                writer = cv2.VideoWriter(
+                    str(self.path), cv2.VideoWriter_fourcc(*self.fourcc), self.fps, size
+                )
+                videoStartTime = timestamp
+            if (image.shape[1], image.shape[0]) != size:
+                image = cv2.resize(image, size)
+            if previous is not None:
+                repeat = 1
+                if self.useTimestamps:
+                    # Number of video frames whose time falls in [previous timestamp, timestamp)
+                    repeat = int(
+                        np.ceil((timestamp - videoStartTime) * self.fps / 1000)
+                        - np.ceil((previous[1] - videoStartTime) * self.fps / 1000)
+                    )
+                for _ in range(max(repeat, 0)):
+                    writer.write(previous[0])
+                    numVideoFrames += 1
+            previous = (image, timestamp)
+            numImages += 1
+            pbar.update(1)
+
+        try:
+            with BoundedExecutor(write, self.numWorkers, self.maxInFlight) as executor:
+                for image in self.chunk.iterImageMessages(
+                    threads=[thread],
+                    withMetaData=len(overlayNames) > 0,
+                    metaDataNames=overlayNames,
+                    parseMetaData=False,
+                ):
+                    lines = []
+                    if self.overlayFields:  # the first line, then the fields (resolved by the worker)
+                        lines = [f"T{image['frameTimestamp']} F{image['frameIndex']}"] + self.overlayFields
+                    executor.submit(
+                        self.decodeFrame,
+                        (
+                            image["className"],
+                            image["width"],
+                            image["height"],
+                            bytes(image["payload"]),
+                            lines,
+                            reads,
+                            {name: bytes(payload) for name, payload in image["metaDataPayloads"].items()},
+                        ),
+                        image["frameTimestamp"],
+                    )
+            if previous is not None and writer is not None:
+                writer.write(previous[0])  # the last image is shown for one video frame
+                numVideoFrames += 1
+        finally:
+            if writer is not None:
+                writer.release()
+            pbar.close()
+
+        seconds = time.perf_counter() - startTime
+        stats = {
+            "numImages": numImages,
+            "numVideoFrames": numVideoFrames,
+            "seconds": seconds,
+            "imagesPerSecond": numImages / seconds if seconds > 0 else 0.0,
+        }
+        if showProgress:
+            print(
+                f"Exported {numImages} images as {numVideoFrames} video frames in {seconds:.1f}s: "
+                f"{stats['imagesPerSecond']:.1f} images/s"
+            )
+        return stats
@@ -1,27 +1,34 @@
 import csv
 import io
 import os
+import pickle
 from collections import OrderedDict
 from enum import Enum, auto
 from mmap import mmap
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Type, Union
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
+import numpy as np
 from numpy.typing import NDArray
 
+from ImageUtils.ImageEncoder import ImageEncoder
 from Primitive.PrimitiveDefinitions import Bool
 from StreamUtils import StreamUtil
 from Utils import MemoryMappedFile
 
 from .Chunk import Chunk, ChunkEnum
 from .DataClasses import DataClass
+from .FeaturePipeline import Feature
 from .Frame import FrameAccessor, FrameBase, FrameInstance, Frames
-from .LogInterfaceBase import (IndexMap, LogInterfaceAccessorClass,
+from .LogInterfaceBase import (AccessorHandle, IndexMap, LogInterfaceAccessorClass,
                                LogInterfaceBaseClass,
                                LogInterfaceInstanceClass)
+from .LogView import LogView
 from .Message import MessageAccessor, MessageBase, MessageInstance, Messages
 from .MessageIDChunk import MessageIDChunk as MChunk
+from .PipelineRunner import PipelineRunner
 from .SettingsChunk import SettingsChunk as SChunk
+from .ThumbnailCache import ThumbnailCache
 from .TypeInfoChunk import TypeInfoChunk as TChunk
 from .UncompressedChunk import UncompressedChunk as UChunk
 
@@ -45,7 +52,7 @@ class Log(LogInterfaceInstanceClass):
 
     For small log file, it is recommended to parse all bytes at once
     1. readLogFile(filePath)
-    2. eval()
+    2. eval() (or eval(isArrayBacked=True) to keep frames and messages as arrays instead of objects)
     3. parseBytes()
     4. Do something on the parsed data
 
@@ -62,6 +69,8 @@ class Log(LogInterfaceInstanceClass):
     # TODO: Move it to a config file
     evalInformationFormat = EvalInformationFormat.CSV
 
+    asDictFields = ["SettingsChunk", "MessageIDChunk", "TypeInfoChunk", "UncompressedChunk"]
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -127,17 +136,23 @@ class Log(LogInterfaceInstanceClass):
         offset: int = 0,
         isLogFileLarge: bool = False,
         forceReEval: bool = False,
+        isArrayBacked: bool = False,
     ):
         """
         This function evaluate the the start and end position of messages, read settings and write the LogClasses
-        The first time you run eval on a log file, it will dump an indexes file, and use the file afterwards
+        The first time you run eval on a log file, it will dump a manifest (see dumpManifest), and reopen the log from it afterwards
+        isArrayBacked: instance mode where frames and messages are rows of arrays in the cache dir (see ChunkArrays)
+        Plain instance mode keeps pickling the whole object tree (Log_<stem>.pkl), so it is reopened as the same objects
         """
-        if not forceReEval and os.path.isfile(self.picklePath):
-            try:
-                self.pickleLoad()
+        if not forceReEval:
+            if self.loadManifest(isLogFileLarge, isArrayBacked):
                 return
-            except EOFError as e:  # Something wrong with the indexes file, remove it
-                os.remove(self.picklePath)
+            if not isLogFileLarge and not isArrayBacked and os.path.isfile(self.picklePath):
+                try:
+                    self.pickleLoad()
+                    return
+                except (EOFError, OSError) as e:  # Something wrong with the indexes file (or the cache files it needs), remove it
+                    os.remove(self.picklePath)
 
         self._children = []
 
@@ -162,7 +177,9 @@ class Log(LogInterfaceInstanceClass):
             match chunkMagicBit:
                 case ChunkEnum.UncompressedChunk.value:
                     self.UncompressedChunk = UChunk(self)
-                    self.UncompressedChunk.eval(sutil, offset, isLogFileLarge)
+                    self.UncompressedChunk.eval(
+                        sutil, offset, isLogFileLarge, isArrayBacked
+                    )
                     self._children.append(self.UncompressedChunk)
                 case ChunkEnum.CompressedChunk.value:
                     raise NotImplementedError("Compressed chunk not implemented")
@@ -187,12 +204,121 @@ class Log(LogInterfaceInstanceClass):
 
         self._startByte = offset
         self._endByte = sutil.tell() - startPos + offset
-        self.pickleDump()
+        if self.isInstanceMode:
+            self.pickleDump()
+        else:
+            self.dumpManifest()
 
     def parseBytes(self):
         for i in self.children:
             i.parseBytes()
-        self.pickleDump()
+        if self.isInstanceMode:
+            self.pickleDump()
+        else:
+            self.UncompressedChunk.dumpReprCache()
+
+    @property
+    def isInstanceMode(self) -> bool:
+        """Frames and messages are FrameInstance/MessageInstance objects (neither accessor nor array backed mode)"""
+        chunk = self.UncompressedChunk
+        return not isinstance(chunk.frames, LogInterfaceAccessorClass) and not chunk.isArrayBacked
+
+    # Manifest
+    manifestVersion: int = 1
+    chunkClasses: Dict[str, Type[Chunk]] = {
+        "SettingsChunk": SChunk,
+        "MessageIDChunk": MChunk,
+        "TypeInfoChunk": TChunk,
+        "UncompressedChunk": UChunk,
+    }
+
+    @property
+    def manifestPath(self) -> Path:
+        return self.cacheDir / f"Log_{Path(self._logFilePath).stem}.manifest"
+
+    def manifestLogFileInfo(self) -> Tuple[int, int]:
+        stat = os.stat(self.logFilePath)
+        return stat.st_size, stat.st_mtime_ns
+
+    def dumpManifest(self):
+        """
+        Persist the small part of the evaluated log: the chunks (without frames and messages), the schema hash
+        and the cache files the frames and messages are attached from (see UncompressedChunk.manifestState)
+        Parsed representations are persisted separately by parseBytes() (see ReprCache)
+        """
+        chunks = []
+        for chunk in self._children:
+            name = type(chunk).__name__
+            if name == "UncompressedChunk":
+                state = chunk.manifestState()
+            else:
+                state = chunk.__getstate__()
+                state.pop("_parent", None)
+            chunks.append((name, state))
+        manifest = {
+            "version": self.manifestVersion,
+            "logFile": self.manifestLogFileInfo(),
+            "schemaHash": self.TypeInfoChunk.schemaHash,
+            "startByte": self._startByte,
+            "endByte": self._endByte,
+            "chunks": chunks,
+            "cacheFiles": {
+                str(path): path.stat().st_size
+                for path in self.UncompressedChunk.manifestFilePaths()
+            },
+        }
+        os.makedirs(self.cacheDir, exist_ok=True)
+        tmpPath = self.manifestPath.with_name(self.manifestPath.name + ".tmp")
+        with open(tmpPath, "wb") as f:
+            pickle.dump(manifest, f)
+        os.replace(tmpPath, self.manifestPath)
+
+    def loadManifest(self, isLogFileLarge: bool = False, isArrayBacked: bool = False) -> bool:
+        """
+        Reopen the log from its manifest, returns False if there is no usable manifest (eval is needed)
+        The manifest is only used for the mode it was written in: accessor mode needs isLogFileLarge,
+        array backed mode needs isArrayBacked, plain instance mode never uses it
+        """
+        if not self.manifestPath.exists():
+            return False
+        try:
+            with open(self.manifestPath, "rb") as f:
+                manifest = pickle.load(f)
+        except (EOFError, OSError, pickle.UnpicklingError):  # OSError: ChunkArrays files are missing
+            return False
+        if (
+            manifest.get("version", None) != self.manifestVersion
+            or tuple(manifest["logFile"]) != self.manifestLogFileInfo()
+        ):
+            return False
+        for path, size in manifest["cacheFiles"].items():
+            if not os.path.isfile(path) or os.path.getsize(path) != size:
+                return False
+        modes = [state["mode"] for name, state in manifest["chunks"] if name == "UncompressedChunk"]
+        if modes != [("accessor" if isLogFileLarge else "arrays" if isArrayBacked else "instance")]:
+            return False
+
+        self._children = []
+        for name, state in manifest["chunks"]:
+            chunkClass = self.chunkClasses[name]
+            chunk = chunkClass.__new__(chunkClass)
+            if name == "UncompressedChunk":
+                chunk.__init__(self)
+                uncompressedState = state
+            else:
+                chunk.__setstate__(dict(state))
+                chunk.parent = self
+            setattr(self, name, chunk)
+            self._children.append(chunk)
+        if self.TypeInfoChunk.schemaHash != manifest["schemaHash"]:
+            return False
+        try:
+            self.UncompressedChunk.attachManifestState(uncompressedState)
+        except OSError:
+            return False
+        self._startByte = manifest["startByte"]
+        self._endByte = manifest["endByte"]
+        return True
 
     @property
     def numMessages(self) -> int:
@@ -233,6 +359,196 @@ class Log(LogInterfaceInstanceClass):
     def children(self) -> List[Chunk]:
         return self._children
 
+    # Time based navigation
+    @property
+    def timestamps(self) -> NDArray[np.uint32]:
+        """Timestamp of every frame, indexed by absolute frame index"""
+        return self.getContentChunk().timestamps
+
+    def seekTime(self, time: int, thread: str = "Cognition") -> FrameBase:
+        """
+        Move to the latest frame of the thread whose timestamp <= time
+        For accessor mode, the thread's accessor is moved and returned
+        """
+        return self.getContentChunk().thread(thread)[
+            self.getContentChunk().threadIndexAt(time, thread)
+        ]
+
+    def frameAt(self, time: int, thread: Optional[str] = None) -> FrameBase:
+        """The latest frame (of the thread if given) whose timestamp <= time"""
+        return self.frames[self.getContentChunk().frameIndexAt(time, thread)]
+
+    def asofJoin(
+        self,
+        left: str,
+        right: str,
+        tolerance: Optional[int] = None,
+        direction: str = "backward",
+    ) -> Tuple[NDArray[np.int64], NDArray[np.int64]]:
+        """
+        For every frame of the left thread, the frame of the right thread current at its timestamp
+        e.g. asofJoin("Cognition", "Motion") -> (cognitionFrameIndexes, motionFrameIndexes)
+        See UncompressedChunk.asofJoin for details
+        """
+        return self.getContentChunk().asofJoin(left, right, tolerance, direction)
+
+    def exportJPEGs(
+        self,
+        dir: Optional[Path] = None,
+        threads: Optional[List[str]] = None,
+        withMetaData: bool = True,
+        showProgress: bool = True,
+    ) -> int:
+        """Write the original JPEG bytes (plus a json sidecar) of every JPEGImage, see UncompressedChunk.exportJPEGs"""
+        return self.getContentChunk().exportJPEGs(dir, threads, withMetaData, showProgress)
+
+    def exportImages(
+        self,
+        dir: Optional[Path] = None,
+        encoder: Optional[ImageEncoder] = None,
+        threads: Optional[List[str]] = None,
+        numWorkers: Optional[int] = None,
+        numWriters: int = 2,
+        maxInFlight: Optional[int] = None,
+        showProgress: bool = True,
+    ) -> Dict[str, float]:
+        """Decode and encode (PNG by default) every image with all cores, see ImageExportPipeline"""
+        return self.getContentChunk().exportImages(
+            dir, encoder, threads, numWorkers, numWriters, maxInFlight, showProgress
+        )
+
+    def exportVideo(
+        self,
+        thread: str = "Upper",
+        path: Optional[Path] = None,
+        fps: float = 30,
+        fourcc: str = "mp4v",
+        overlayFields: Optional[List[str]] = None,
+        useTimestamps: bool = True,
+        numWorkers: Optional[int] = None,
+        maxInFlight: Optional[int] = None,
+        showProgress: bool = True,
+    ) -> Dict[str, float]:
+        """Write the camera stream of a thread into a video, see VideoExportPipeline"""
+        return self.getContentChunk().exportVideo(
+            thread,
+            path,
+            fps,
+            fourcc,
+            overlayFields,
+            useTimestamps,
+            numWorkers,
+            maxInFlight,
+            showProgress,
+        )
+
+    def exportDataset(
+        self,
+        fields: List[str],
+        dir: Optional[Path] = None,
+        threads: Optional[List[str]] = None,
+        shardSize: int = 1000,
+        format: str = "tar",
+        encoder: Optional[ImageEncoder] = None,
+        numWorkers: Optional[int] = None,
+        showProgress: bool = True,
+    ) -> Dict[str, Any]:
+        """Write images and representation fields of the same frame into shards, see DatasetExportPipeline"""
+        return self.getContentChunk().exportDataset(
+            fields, dir, threads, shardSize, format, encoder, numWorkers, showProgress
+        )
+
+    def exportFrames(
+        self,
+        dir: Optional[Path] = None,
+        threads: Optional[List[str]] = None,
+        compress: bool = False,
+        framesPerPart: int = 1000,
+        numWorkers: Optional[int] = None,
+        showProgress: bool = True,
+    ) -> Dict[str, Path]:
+        """Write every frame as a json line into one ndjson file per thread, see FrameExportPipeline"""
+        return self.getContentChunk().exportFrames(
+            dir, threads, compress, framesPerPart, numWorkers, showProgress
+        )
+
+    def exportTables(
+        self,
+        dir: Optional[Path] = None,
+        classNames: Optional[List[str]] = None,
+        format: str = "npz",
+        rowGroupSize: int = 10000,
+        numWorkers: Optional[int] = None,
+        showProgress: bool = True,
+    ) -> Dict[str, Any]:
+        """Write every representation as a columnar table, see ColumnarExportPipeline"""
+        return self.getContentChunk().exportTables(
+            dir, classNames, format, rowGroupSize, numWorkers, showProgress
+        )
+
+    def extractFeatures(
+        self,
+        spec: Dict[str, Feature],
+        thread: str = "Cognition",
+        dir: Optional[Path] = None,
+        dropIncomplete: bool = False,
+        rowsPerPart: int = 100000,
+        rowGroupSize: int = 10000,
+        numWorkers: Optional[int] = None,
+        showProgress: bool = True,
+        frameRange: Optional[Tuple[int, int]] = None,
+    ) -> Dict[str, Any]:
+        """Aligned feature columns of every frame of the thread (written to dir if given), see FeaturePipeline"""
+        return self.getContentChunk().extractFeatures(
+            spec, thread, dir, dropIncomplete, rowsPerPart, rowGroupSize, numWorkers, showProgress, frameRange
+        )
+
+    def episodes(
+        self,
+        thread: str = "Cognition",
+        playingStates: Optional[List[str]] = None,
+        numWorkers: Optional[int] = None,
+        showProgress: bool = True,
+    ) -> Dict[str, NDArray]:
+        """Episodes (runs of playing GameState frames) with their frame ranges and outcome, see EpisodeSegmenter"""
+        return self.getContentChunk().episodes(thread, playingStates, numWorkers, showProgress)
+
+    def pipelineRunner(
+        self,
+        dir: Optional[Path] = None,
+        thread: str = "Cognition",
+        rangeKind: str = "episodes",
+        framesPerRange: int = 1000,
+        playingStates: Optional[List[str]] = None,
+    ) -> PipelineRunner:
+        """A resumable runner of stages over the episodes/frame ranges of the thread, see PipelineRunner"""
+        if dir is None:
+            dir = self.outputDir / f"{Path(self.logFilePath).stem}_pipeline"
+        return PipelineRunner(self, dir, thread, rangeKind, framesPerRange, playingStates)
+
+    def thumbnails(self, size: Tuple[int, int] = (160, 120)) -> ThumbnailCache:
+        """Fixed-size RGB thumbnails of all image messages, generated on first access, see ThumbnailCache"""
+        return self.getContentChunk().thumbnails(size)
+
+    # Views
+    def window(
+        self, t0: int, t1: int, threads: Optional[List[str]] = None
+    ) -> LogView:
+        """View of the frames (of the threads if given) whose timestamp is in [t0, t1]"""
+        timestamps = self.timestamps
+        return LogView(
+            self, np.flatnonzero((timestamps >= t0) & (timestamps <= t1)), threads
+        )
+
+    def view(
+        self,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        threads: Optional[List[str]] = None,
+    ) -> LogView:
+        """View of the frames with absolute index in [start, stop), same as frames[start:stop] in accessor mode"""
+        return LogView(self, range(len(self.frames))[start:stop], threads)
+
     @property
     def outputDir(self):
         return (
@@ -261,12 +577,14 @@ class Log(LogInterfaceInstanceClass):
                 self._Info_cached[type][name][absIndex] = value
             else:
                 self._Info_cached[type][name].pop(absIndex)  # remove the old one
-                self._Info_cached[type][name][absIndex] = [value]
+                self._Info_cached[type][name][absIndex] = value
         if len(self._Info_cached[type][name]) > 100:
             self._Info_cached[type][name].popitem(last=False)
 
     def cacheInfo(self, obj, name: str, value):
-        if isinstance(obj, LogInterfaceAccessorClass):
+        if isinstance(obj, AccessorHandle):
+            type = obj.kind
+        elif isinstance(obj, LogInterfaceAccessorClass):
             if isinstance(obj, FrameBase):
                 type = "Frame"
             elif isinstance(obj, MessageBase):
@@ -280,7 +598,9 @@ class Log(LogInterfaceInstanceClass):
         self.writeCacheInfo(type, name, absIndex, value)
 
     def getCachedInfo(self, obj, name: str):
-        if isinstance(obj, LogInterfaceAccessorClass):
+        if isinstance(obj, AccessorHandle):
+            type = obj.kind
+        elif isinstance(obj, LogInterfaceAccessorClass):
             if isinstance(obj, FrameBase):
                 type = "Frame"
             elif isinstance(obj, MessageBase):
@@ -301,6 +621,36 @@ class Log(LogInterfaceInstanceClass):
             return None
         return self._Info_cached[type][name][absIndex]
 
+    def sharedCursor(self, kind: str, absIndex: int) -> LogInterfaceAccessorClass:
+        """
+        The accessor over all frames/messages (kind "Frame"/"Message") shared by all AccessorHandles of this log,
+        moved to absIndex
+        """
+        if not hasattr(self, "_cursors_cached") or self._cursors_cached is None:
+            self._cursors_cached = {}
+        if kind not in self._cursors_cached:
+            if kind == "Frame":
+                self._cursors_cached[kind] = self.getFrameAccessor()
+            elif kind == "Message":
+                self._cursors_cached[kind] = self.getMessageAccessor()
+            else:
+                raise ValueError(f"Invalid accessor kind: {kind}")
+        cursor = self._cursors_cached[kind]
+        cursor.indexCursor = absIndex  # the indexMap covers everything, so index == absIndex
+        return cursor
+
+    @property
+    def messageIndexRecords(self) -> NDArray[np.uint64]:
+        """
+        (absMessageIndex, absFrameIndex, startByte, endByte) of every message, a read-only memmap of the message index
+        file opened once (UncompressedChunk drops it when the index files are rewritten)
+        """
+        if not hasattr(self, "_messageIndexRecords_cached") or self._messageIndexRecords_cached is None:
+            self._messageIndexRecords_cached = np.memmap(
+                self.cacheDir / MessageAccessor.messageIdxFileName, dtype=np.uint64, mode="r"
+            ).reshape(-1, 4)
+        return self._messageIndexRecords_cached
+
     def getMessageAccessor(
         self, indexMap: Optional[IndexMap] = None
     ) -> MessageAccessor:
@@ -310,8 +660,10 @@ class Log(LogInterfaceInstanceClass):
         return FrameAccessor(self, indexMap)
 
     def getAccessorCopyOf(
-        self, source: LogInterfaceBaseClass
+        self, source: Union[LogInterfaceBaseClass, AccessorHandle]
     ) -> LogInterfaceAccessorClass:
+        if isinstance(source, AccessorHandle):
+            return source.resolve()
         if isinstance(source, FrameBase):
             if isinstance(source, FrameAccessor):
                 result = self.getFrameAccessor(source.indexMap)
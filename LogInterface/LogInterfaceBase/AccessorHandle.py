@@ -0,0 +1,70 @@
+from typing import Any
+
+
+class AccessorHandle:
+    """
+    Immutable flyweight reference to one frame/message of an accessor mode log: (log, kind, absIndex)
+    kind is "Frame" or "Message" (same names as the Log info cache)
+
+    A handle only holds three slots, attribute and item access are forwarded to a cursor shared by all
+    handles of the same log (Log.sharedCursor), so keeping millions of them doesn't create accessor objects
+    Use resolve() to get an independent accessor that won't be moved by other handles
+    """
+
+    __slots__ = ("log", "kind", "absIndex")
+
+    def __init__(self, log: Any, kind: str, absIndex: int):
+        object.__setattr__(self, "log", log)
+        object.__setattr__(self, "kind", kind)
+        object.__setattr__(self, "absIndex", int(absIndex))
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("AccessorHandle is immutable")
+
+    def __reduce__(self):
+        return (AccessorHandle, (self.log, self.kind, self.absIndex))
+
+    @property
+    def cursor(self) -> Any:
+        """The log's shared cursor of this kind, moved to absIndex (it moves again on the next handle access)"""
+        return self.log.sharedCursor(self.kind, self.absIndex)
+
+    def resolve(self) -> Any:
+        """An independent accessor at absIndex"""
+        return self.cursor.copy()
+
+    def __getattr__(self, name: str) -> Any:
+        if name in AccessorHandle.__slots__:  # not initialized yet (e.g. during unpickling)
+            raise AttributeError(name)
+        return getattr(self.cursor, name)
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.cursor[key]
+
+    # Forwarded explicitly, special methods are looked up on the type and never reach __getattr__
+    def __contains__(self, key: Any) -> bool:
+        return key in self.cursor
+
+    def __len__(self) -> int:
+        return len(self.cursor)
+
+    def __iter__(self) -> Any:
+        return iter(self.cursor)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, AccessorHandle):
+            return NotImplemented
+        return (
+            self.log is other.log
+            and self.kind == other.kind
+            and self.absIndex == other.absIndex
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.log), self.kind, self.absIndex))
+
+    def __str__(self) -> str:
+        return str(self.cursor)
+
+    def __repr__(self) -> str:
+        return f"AccessorHandle({self.kind}, {self.absIndex})"
@@ -7,6 +7,7 @@ from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
 from Utils import MemoryMappedFile
 
+from .AccessorHandle import AccessorHandle
 from .LogInterfaceBase import IndexMap, LogInterfaceBaseClass
 from .LogInterfaceInstanceClass import LogInterfaceInstanceClass
 
@@ -23,6 +24,9 @@ class LogInterfaceAccessorClass(LogInterfaceBaseClass):
     accessor would delay the resolve of log class
     """
 
+    handleKind: str
+    """Kind of the AccessorHandle of this accessor ("Frame" or "Message")"""
+
     def __init__(self, log: Any, indexMap: Optional[IndexMap]):
         """Core invariants: log; idxFileName; indexMap (valid range of the accessor)"""
         """Core variables: indexCursor"""
@@ -42,6 +46,7 @@ class LogInterfaceAccessorClass(LogInterfaceBaseClass):
         return len(self._indexMap)
 
     def __iter__(self):
+        """Iterate with one cursor: the same (copied once) accessor is moved and returned at every step"""
         result = self.copy()
         result.indexCursor = 0
         result._iterStart = True
@@ -242,13 +247,33 @@ class LogInterfaceAccessorClass(LogInterfaceBaseClass):
     # Tools
     def copy(self) -> "LogInterfaceAccessorClass":
         """
-        Copy and accessor with the same indexCursor
+        Copy and accessor with the same indexMap and indexCursor
+        The indexMap is shared (it is never modified in place) and caches are not copied, so this is O(1)
         NOTE: copy() will not copy frozen state
         """
-        result = self.log.getAccessorCopyOf(self)
-        result.indexCursor = self.indexCursor
+        result = object.__new__(type(self))
+        for key, value in self.__dict__.items():
+            if key.endswith("_cached") or key == "_children":
+                continue
+            result.__dict__[key] = value
+        result._frozen = False
+        result._iterStart = True
         return result
 
+    def rebase(self, indexMap: IndexMap) -> "LogInterfaceAccessorClass":
+        """Reuse this accessor for another (non-empty) indexMap, the cursor goes back to the first element"""
+        if self._frozen:
+            raise RuntimeError("Cannot modify frozen accessor")
+        self._indexMap = indexMap
+        self._indexCursor = 0
+        self._iterStart = True
+        return self
+
+    @property
+    def handle(self) -> AccessorHandle:
+        """Immutable (log, kind, absIndex) reference to the current item"""
+        return AccessorHandle(self.log, self.handleKind, self.absIndex)
+
     @abstractmethod
     def getInstance(self) -> "LogInterfaceInstanceClass":
         raise NotImplementedError(
@@ -285,9 +310,11 @@ class LogInterfaceAccessorClass(LogInterfaceBaseClass):
     def isAccessorClass(self) -> bool:
         return True
 
-    def freeze(self) -> None:
+    def freeze(self) -> "LogInterfaceAccessorClass":
         """
         Freeze the object's absIndex (if it is a iterator, it won't be able to move anymore)
+        Returns self, so copy().freeze() gives a frozen copy
         NOTE: copy() will not copy frozen state
         """
         self._frozen = True
+        return self
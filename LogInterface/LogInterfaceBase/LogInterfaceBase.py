@@ -104,20 +104,17 @@ class LogInterfaceBaseClass(ABC):
         pass
 
     # Recursive Methods
+    asDictFields: List[str] = []
+    """Attributes serialized by the base asDict(), subclasses list them explicitly instead of reflecting over dir()"""
+
     def asDict(
         self,
     ):
-        """Base recursive asDict() implementation"""
+        """Base recursive asDict() implementation, serializes asDictFields"""
         result = {}
-        for attr in dir(self):
-            if not attr.startswith("_"):
-                try:
-                    obj = getattr(self, attr)
-                    if hasattr(obj, "asDict"):
-                        result[attr] = obj.asDict()
-                except AttributeError:
-                    result[attr] = getattr(self, attr)
-
+        for attr in self.asDictFields:
+            obj = getattr(self, attr)
+            result[attr] = obj.asDict() if hasattr(obj, "asDict") else obj
         return result
 
     def parseBytes(self):
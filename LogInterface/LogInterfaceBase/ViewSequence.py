@@ -0,0 +1,37 @@
+from collections.abc import Sequence
+from typing import Any, Iterator, Type, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+class ViewSequence(Sequence):
+    """
+    Lazy sequence of the frames/messages of an array backed chunk (see ChunkArrays)
+    Only absolute indexes are stored, a view object (viewClass(chunk, absIndex)) is created when an item is accessed
+    """
+
+    def __init__(
+        self,
+        chunk: Any,
+        viewClass: Type,
+        absIndexes: Union[range, NDArray[np.int64]],
+    ):
+        self.chunk = chunk
+        self.viewClass = viewClass
+        self.absIndexes = absIndexes
+
+    def __len__(self) -> int:
+        return len(self.absIndexes)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return ViewSequence(self.chunk, self.viewClass, self.absIndexes[index])
+        return self.viewClass(self.chunk, self.absIndexes[index])  # raises IndexError
+
+    def __iter__(self) -> Iterator[Any]:
+        for absIndex in self.absIndexes:
+            yield self.viewClass(self.chunk, absIndex)
+
+    def __repr__(self) -> str:
+        return f"ViewSequence({self.viewClass.__name__}, {len(self)} items)"
@@ -1,10 +1,14 @@
+from .AccessorHandle import AccessorHandle
 from .LogInterfaceAccessorClass import LogInterfaceAccessorClass
 from .LogInterfaceBase import IndexMap, LogInterfaceBaseClass
 from .LogInterfaceInstanceClass import LogInterfaceInstanceClass
+from .ViewSequence import ViewSequence
 
 __all__ = [
+    "AccessorHandle",
     "IndexMap",
     "LogInterfaceBaseClass",
     "LogInterfaceAccessorClass",
     "LogInterfaceInstanceClass",
+    "ViewSequence",
 ]
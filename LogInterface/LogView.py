@@ -0,0 +1,269 @@
+from collections import OrderedDict
+from functools import partial
+from multiprocessing import Pool, cpu_count
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+from tqdm import tqdm
+
+from .DataClasses import DataClass
+from .Frame import FrameBase, Frames
+from .LogInterfaceBase import IndexMap, LogInterfaceAccessorClass
+from .Message import MessageBase, Messages
+
+
+class LogView:
+    """
+    A lightweight window over a Log, restricted to a set of absolute frame indexes
+    Create it with log.window(t0, t1, threads) / log.view(start, stop, threads) / log.frames[a:b] (accessor mode)
+
+    All accessors handed out by the view carry indexMaps narrowed to the window
+    and parsed representations are kept in the view's own bounded cache,
+    so memory and CPU cost scale with the window rather than with the whole log
+    """
+
+    defaultCacheSize = 1000
+
+    def __init__(
+        self,
+        log: Any,
+        frameIndexes: IndexMap,
+        threads: Optional[List[str]] = None,
+        cacheSize: Optional[int] = None,
+    ):
+        self.log = log
+        self.cacheSize = self.defaultCacheSize if cacheSize is None else cacheSize
+
+        chunk = log.getContentChunk()
+        self._threadNames: List[str] = (
+            chunk.threadNames if threads is None else list(threads)
+        )
+        for name in self._threadNames:
+            if name not in chunk.threads:
+                raise KeyError(f"Thread {name} not found")
+
+        if isinstance(frameIndexes, range) and frameIndexes.step == 1:
+            indexes = np.arange(frameIndexes.start, frameIndexes.stop, dtype=np.int64)
+        else:
+            indexes = np.unique(np.asarray(frameIndexes, dtype=np.int64))
+        threadWindows = [self.inWindow(chunk.threadFrameIndexes(name), indexes) for name in self._threadNames]
+
+        if threads is None and isinstance(frameIndexes, range) and frameIndexes.step == 1:
+            # Keep contiguous windows as range, so the frame accessor's indexMap stays O(1)
+            self._frameIndexMap: IndexMap = frameIndexes
+            self._frameIndexes = indexes
+        else:
+            if threads is not None:
+                indexes = np.sort(np.concatenate(threadWindows + [np.zeros(0, dtype=np.int64)]))
+            self._frameIndexes = indexes
+            self._frameIndexMap = indexes.tolist()
+
+        self._threadIndexMaps: Dict[str, List[int]] = {
+            name: window.tolist() for name, window in zip(self._threadNames, threadWindows)
+        }
+
+        # cache
+        self._reprs_cached: OrderedDict[int, DataClass] = OrderedDict()
+
+    @staticmethod
+    def inWindow(threadIndexes: NDArray[np.int64], window: NDArray[np.int64]) -> NDArray[np.int64]:
+        """
+        The (sorted) thread frame indexes that are in the (sorted, unique) window
+        The thread indexes are cut to the window's span with searchsorted first, so the cost scales with the window
+        """
+        if len(window) == 0:
+            return threadIndexes[:0]
+        cut = threadIndexes[
+            np.searchsorted(threadIndexes, window[0]) : np.searchsorted(threadIndexes, window[-1], side="right")
+        ]
+        if window[-1] - window[0] + 1 == len(window):  # contiguous window, the cut is exact
+            return cut
+        positions = np.minimum(np.searchsorted(window, cut), len(window) - 1)
+        return cut[window[positions] == cut]
+
+    def __len__(self) -> int:
+        return len(self._frameIndexes)
+
+    def __iter__(self):
+        return iter(self.frames)
+
+    def __getitem__(self, key: int) -> FrameBase:
+        return self.frames[key]
+
+    def __str__(self) -> str:
+        if len(self) == 0:
+            return "LogView(empty)"
+        return (
+            f"LogView(frames {self._frameIndexes[0]}-{self._frameIndexes[-1]}, "
+            f"{len(self)} frames, threads: {self.threadNames})"
+        )
+
+    @property
+    def isAccessorMode(self) -> bool:
+        return isinstance(self.log.frames, LogInterfaceAccessorClass)
+
+    # Frames
+    @property
+    def frameIndexes(self) -> NDArray[np.int64]:
+        """Absolute frame indexes in the window"""
+        return self._frameIndexes
+
+    @property
+    def timestamps(self) -> NDArray[np.uint32]:
+        """Timestamps of the frames in the window"""
+        return np.asarray(self.log.timestamps[self._frameIndexes])
+
+    @property
+    def frames(self) -> Frames:
+        return self.getFrames(self._frameIndexMap)
+
+    def thread(self, name: str) -> Frames:
+        if name not in self._threadIndexMaps:
+            raise KeyError(f"Thread {name} not in view")
+        return self.getFrames(self._threadIndexMaps[name])
+
+    @property
+    def threads(self) -> Dict[str, Frames]:
+        return {name: self.thread(name) for name in self._threadNames}
+
+    @property
+    def threadNames(self) -> List[str]:
+        return list(self._threadNames)
+
+    def getFrames(self, indexMap: IndexMap) -> Frames:
+        """Frame accessor narrowed to indexMap (accessor mode) or list of frames (instance mode)"""
+        if len(indexMap) == 0:
+            return []
+        if self.isAccessorMode:
+            return self.log.getFrameAccessor(indexMap)
+        frames = self.log.frames
+        return [frames[i] for i in indexMap]
+
+    # Messages
+    @property
+    def messages(self) -> Messages:
+        """All messages of the frames in the window"""
+        if len(self) == 0:
+            return []
+        if self.isAccessorMode:
+            frameIndexFile = np.memmap(
+                self.log.cacheDir / FrameBase.frameIdxFileName,
+                dtype=np.dtype(
+                    [("absIndex", "<u4"), ("thread", "S12"), ("start", "<u8"), ("end", "<u8")]
+                ),
+                mode="r",
+            )
+            entries = frameIndexFile[self._frameIndexes]
+            messageIndexes: List[int] = []
+            for start, end in zip(entries["start"].tolist(), entries["end"].tolist()):
+                messageIndexes.extend(range(start, end))
+            if len(messageIndexes) == 0:
+                return []
+            return self.log.getMessageAccessor(messageIndexes)
+        result = []
+        for frame in self.frames:
+            result.extend(frame.messages)
+        return result
+
+    # Representations
+    def reprObj(self, message: MessageBase) -> DataClass:
+        """Representation object of a message in the window, kept in the view's own cache"""
+        if not self.isAccessorMode:
+            return message.reprObj  # Instance messages keep their own reprObj
+        key = message.absIndex
+        if key in self._reprs_cached:
+            self._reprs_cached.move_to_end(key)
+            return self._reprs_cached[key]
+        result = message.reprObj
+        self.cacheRepr(key, result)
+        return result
+
+    def cacheRepr(self, absMessageIndex: int, reprObj: DataClass):
+        self._reprs_cached[absMessageIndex] = reprObj
+        self._reprs_cached.move_to_end(absMessageIndex)
+        while len(self._reprs_cached) > self.cacheSize:
+            self._reprs_cached.popitem(last=False)
+
+    def clearCache(self):
+        self._reprs_cached.clear()
+
+    def parseBytes(
+        self, classNames: Optional[List[str]] = None, showProgress: bool = True
+    ):
+        """
+        Parse the messages of the window (optionally only the given classes) with multiprocessing
+        In accessor mode, only the last cacheSize representations are kept
+        """
+        unparsed = []
+        for message in self.messages:
+            if classNames is not None and message.className not in classNames:
+                continue
+            if self.isAccessorMode:
+                if message.absIndex in self._reprs_cached:
+                    continue
+                unparsed.append(message.copy())
+            elif not message.isParsed:
+                unparsed.append(message)
+        if len(unparsed) == 0:
+            return
+        if self.isAccessorMode and len(unparsed) > self.cacheSize:
+            print(
+                f"Warning: parsing {len(unparsed)} messages, but only {self.cacheSize} will stay cached in the view"
+            )
+
+        Wrapper = partial(MessageBase.parseBytesWrapper, logFilePath=self.log.logFilePath)
+        with Pool(min(cpu_count(), len(unparsed))) as p:
+            results = list(
+                tqdm(
+                    p.imap(
+                        Wrapper,
+                        [
+                            (message.startByte + 4, message.endByte, message.classType.read)
+                            for message in unparsed
+                        ],
+                    ),
+                    total=len(unparsed),
+                    desc="Parsing Window Messages",
+                    disable=not showProgress,
+                )
+            )
+        for message, result in zip(unparsed, results):
+            if self.isAccessorMode:
+                self.cacheRepr(message.absIndex, result)
+            else:
+                message.reprObj = result
+
+    def column(
+        self, className: str, field: str, thread: Optional[str] = None
+    ) -> Tuple[NDArray[np.int64], NDArray]:
+        """
+        Values of a (dotted) field of a representation over the window
+        e.g. view.column("RobotPose", "translation.x", "Cognition")
+        Returns (absFrameIndexes, values), frames without the representation are skipped
+        """
+        frames = self.frames if thread is None else self.thread(thread)
+        attrs = field.split(".") if field else []
+        frameIndexes = []
+        values = []
+        for frame in frames:
+            if className not in frame.classNames:
+                continue
+            value: Any = self.reprObj(frame[className])
+            for attr in attrs:
+                value = value[attr] if isinstance(value, DataClass) else getattr(value, attr)
+            frameIndexes.append(frame.absIndex)
+            values.append(value)
+        return np.array(frameIndexes, dtype=np.int64), np.asarray(values)
+
+    # Narrowing
+    def window(self, t0: int, t1: int, threads: Optional[List[str]] = None) -> "LogView":
+        """Sub-view of the frames whose timestamp is in [t0, t1]"""
+        timestamps = self.timestamps
+        indexes = self._frameIndexes[(timestamps >= t0) & (timestamps <= t1)]
+        return LogView(
+            self.log,
+            indexes,
+            self._threadNames if threads is None else threads,
+            self.cacheSize,
+        )
@@ -19,6 +19,7 @@ Messages = Union[List[MessageInstance], "MessageAccessor"]
 
 class MessageAccessor(MessageBase, LogInterfaceAccessorClass):
     messageIdxFileName: str = "messageIndexFile.cache"
+    handleKind = "Message"
     maxCachedReprObj: int = 200
 
     @staticmethod
@@ -196,5 +197,6 @@ class MessageAccessor(MessageBase, LogInterfaceAccessorClass):
         result._logId = UChar(self.logId)
         if self.isParsed:
             result.reprObj = self.reprObj
-        result._absIndex_cached = self.absIndex
+        result._absIndex = self.absIndex
+        result._index = self.index
         return result
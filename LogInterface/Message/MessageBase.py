@@ -115,26 +115,27 @@ class MessageBase(LogInterfaceBaseClass):
     @property
     def id(self) -> UChar:
         """Corresponding id in MessageID, most commonly used"""
-        return self.log.MessageIDChunk.mapLogToID[self.logId]
+        return self.log.MessageIDChunk.logIdToID[self.logId]
 
     @property
     def idName(self) -> str:
         """
         Name of the id, the only identifier of the type of the message
         """
-        return self.log.MessageIDChunk.logIDNames[self.logId]
+        return self.log.MessageIDChunk.logIdToIDName[self.logId]
 
     @property
     def className(self) -> str:
         """The representation object's class name"""
-        result = self.idName
-        result = result[2:] if result.startswith("id") else result
-        return result
+        return self.log.MessageIDChunk.logIdToClassName[self.logId]
 
     @property
     def classType(self) -> Type[DataClass]:
         """Type class of the representation object"""
-        return self.log.TypeInfoChunk.dataClasses[self.className]
+        result = self.log.TypeInfoChunk.logIdToClassType[self.logId]
+        if result is None:
+            raise KeyError(f"No data class for message {self.idName}")
+        return result
 
     # Magic functions
     def __str__(self) -> str:
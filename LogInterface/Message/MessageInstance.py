@@ -18,6 +18,10 @@ class MessageInstance(MessageBase, LogInterfaceInstanceClass):
         self._reprObject: DataClass
         self._logId: UChar
 
+        # recorded by UncompressedChunk during eval
+        self._index: int
+        self._absIndex: int
+
         # cache
         self._reprDict_cached: Dict[str, Any]
 
@@ -115,20 +119,14 @@ class MessageInstance(MessageBase, LogInterfaceInstanceClass):
 
     @property
     def index(self) -> int:
-        """The index of the message in the frame"""
-        if hasattr(self, "_index_cached"):
-            return self._index_cached
-        else:
+        """The index of the message in the frame, recorded during eval"""
+        if not hasattr(self, "_index"):  # messages unpickled from caches written before it was recorded
             # All the parent's children are Instance Classes, no need to worry
-            result = -1
             for i, c in enumerate(self.parent.children):
-                if c is self:
-                    result = i
-                else:
-                    c._index_cached = i
-            if result == -1:
+                c._index = i
+            if not hasattr(self, "_index"):
                 raise ValueError(f"{self} not found in {self.parent}'s children")
-            return result
+        return self._index
 
     @index.setter
     def index(self, value: int):
@@ -136,23 +134,17 @@ class MessageInstance(MessageBase, LogInterfaceInstanceClass):
 
     @property
     def absIndex(self) -> int:
-        """Absolute message index in the whole file"""
-        if hasattr(self, "_absIndex_cached"):
-            return self._absIndex_cached
+        """Absolute message index in the whole file, recorded during eval"""
+        if hasattr(self, "_absIndex"):
+            return self._absIndex
         if isinstance(self.frame, LogInterfaceInstanceClass):
-            cnt = self.frame.absMessageIndexStart  # type: ignore
-            for dummy in self.frame.dummyMessages:  # type: ignore
-                dummy._absIndex_cached = cnt
-                cnt += 1
-            for message in self.frame.messages:  # type: ignore
-                message._absIndex_cached = cnt
-                cnt += 1
+            self.frame.parent.recordMessageIndexes(self.frame)
         elif isinstance(self.frame, LogInterfaceAccessorClass):
-            self._absIndex_cached = self.frame.absMessageIndexStart + self.index  # type: ignore
+            self._absIndex = self.frame.absMessageIndexStart + self.index  # type: ignore
         else:
             raise ValueError(f"Unsupported frame type: {type(self.frame)}")
 
-        return self._absIndex_cached
+        return self._absIndex
 
     @absIndex.setter
     def absIndex(self, value: int):
@@ -0,0 +1,79 @@
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ..LogInterfaceBase import AccessorHandle
+from .MessageAccessor import MessageAccessor
+
+
+class MessageSequence(Sequence):
+    """
+    Lazy view of all messages of an accessor mode log (UncompressedChunk.messages)
+
+    Backed by the message index file: len() is computed from the file size,
+    an int index gives an AccessorHandle and a slice gives another MessageSequence (both O(1)),
+    so counting or slicing doesn't create one object per message
+    """
+
+    def __init__(self, log: Any, absIndexes: Optional[range] = None):
+        self.log = log
+        if absIndexes is None:
+            size = self.indexFilePath.stat().st_size
+            absIndexes = range(size // MessageAccessor.messageIdxByteLength)
+        self.absIndexes = absIndexes
+
+    @property
+    def indexFilePath(self) -> Path:
+        return self.log.cacheDir / MessageAccessor.messageIdxFileName
+
+    def __len__(self) -> int:
+        return len(self.absIndexes)
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[AccessorHandle, "MessageSequence"]:
+        if isinstance(index, slice):
+            return MessageSequence(self.log, self.absIndexes[index])
+        return AccessorHandle(self.log, "Message", self.absIndexes[index])  # raises IndexError
+
+    def __iter__(self) -> Iterator[AccessorHandle]:
+        for absIndex in self.absIndexes:
+            yield AccessorHandle(self.log, "Message", absIndex)
+
+    def __contains__(self, value: Any) -> bool:
+        return (
+            isinstance(value, AccessorHandle)
+            and value.log is self.log
+            and value.kind == "Message"
+            and value.absIndex in self.absIndexes
+        )
+
+    def index(self, value: Any, start: int = 0, stop: Optional[int] = None) -> int:
+        if value not in self:
+            raise ValueError(f"{value!r} is not in MessageSequence")
+        result = self.absIndexes.index(value.absIndex)
+        if result < start or (stop is not None and result >= stop):
+            raise ValueError(f"{value!r} is not in MessageSequence")
+        return result
+
+    def count(self, value: Any) -> int:
+        return 1 if value in self else 0
+
+    @property
+    def indexRecords(self) -> NDArray[np.uint64]:
+        """
+        (absMessageIndex, absFrameIndex, startByte, endByte) rows of the view,
+        a read-only memmap slice (no copy) for contiguous views, a copy otherwise
+        """
+        if len(self.absIndexes) == 0:
+            return np.zeros((0, 4), dtype=np.uint64)
+        records = self.log.messageIndexRecords
+        if self.absIndexes.step == 1:
+            return records[self.absIndexes.start : self.absIndexes.stop]
+        return records[np.asarray(self.absIndexes)]
+
+    def __repr__(self) -> str:
+        return f"MessageSequence({self.absIndexes.start}, {self.absIndexes.stop}, {self.absIndexes.step})"
@@ -0,0 +1,102 @@
+from importlib import import_module
+from typing import Any
+
+from Primitive import *
+from StreamUtils import StreamUtil
+
+from ..DataClasses import DataClass
+from .MessageInstance import MessageInstance
+
+
+class MessageView(MessageInstance):
+    """
+    Message of an array backed chunk: a thin view over one row of the chunk's ChunkArrays, created on access
+    The storage fields of MessageInstance (_startByte, _endByte, _logId, _reprObject) read and write the arrays,
+    so the parsed representation outlives the view
+    """
+
+    def __init__(self, chunk: Any, absIndex: int, frame: Any = None):
+        MessageInstance.__init__(self, frame)
+        self._chunk = chunk
+        self._absIndex = int(absIndex)
+
+    # Storage fields
+    @property
+    def _startByte(self) -> int:
+        return int(self._chunk.arrays.messageStartBytes[self._absIndex])
+
+    @property
+    def _endByte(self) -> int:
+        return int(self._chunk.arrays.messageEndBytes[self._absIndex])
+
+    @property
+    def _logId(self) -> UChar:
+        return int(self._chunk.arrays.messageLogIds[self._absIndex])
+
+    @property
+    def _reprObject(self) -> DataClass:
+        try:
+            return self._chunk.arrays.reprObjs[self._absIndex]
+        except KeyError:
+            raise AttributeError("_reprObject")  # not parsed, hasattr() is False
+
+    @_reprObject.setter
+    def _reprObject(self, value: DataClass):
+        self._chunk.arrays.reprObjs[self._absIndex] = value
+
+    @_reprObject.deleter
+    def _reprObject(self):
+        self._chunk.arrays.reprObjs.pop(self._absIndex, None)
+
+    def hasPickledRepr(self) -> bool:
+        return self._absIndex in self._chunk.reprCache or super().hasPickledRepr()
+
+    def loadRepr(self) -> bool:
+        """Load the representation object from the chunk's ReprCache, or from the per message pickle file"""
+        reprObj = self._chunk.reprCache.load(self._absIndex)
+        if reprObj is not None:
+            self.reprObj = reprObj
+            return True
+        return super().loadRepr()
+
+    def freeMem(self):
+        """@Override: Free the message's repr object memory"""
+        del self._reprObject
+        if hasattr(self, "_reprDict_cached"):
+            del self._reprDict_cached
+
+    # Hierarchy
+    @property
+    def log(self) -> Any:
+        return self._chunk.log
+
+    @property
+    def parent(self) -> Any:
+        if self._parent is None:
+            self._parent = import_module("LogInterface.Frame").FrameView(
+                self._chunk, self._chunk.arrays.messageFrameIndexes[self._absIndex]
+            )  # Static import would cause loop import
+        return self._parent
+
+    @parent.setter
+    def parent(self, value: Any):
+        self._parent = value
+
+    @property
+    def frameIndex(self) -> int:
+        return int(self._chunk.arrays.messageFrameIndexes[self._absIndex])
+
+    @property
+    def index(self) -> int:
+        """The index of the message in the frame"""
+        return self._absIndex - int(
+            self._chunk.arrays.frameMessageStarts[self.frameIndex]
+        )
+
+    @property
+    def absIndex(self) -> int:
+        """Absolute message index in the whole file"""
+        return self._absIndex
+
+    def eval(self, sutil: StreamUtil, offset: int = 0):
+        raise NotImplementedError("Message views are created from evaluated arrays, they cannot eval")
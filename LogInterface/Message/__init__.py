@@ -1,5 +1,14 @@
 from .MessageAccessor import MessageAccessor, Messages
 from .MessageBase import MessageBase
 from .MessageInstance import MessageInstance
+from .MessageSequence import MessageSequence
+from .MessageView import MessageView
 
-__all__ = ["MessageBase", "MessageInstance", "MessageAccessor", "Messages"]
+__all__ = [
+    "MessageBase",
+    "MessageInstance",
+    "MessageAccessor",
+    "MessageSequence",
+    "MessageView",
+    "Messages",
+]
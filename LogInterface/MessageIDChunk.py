@@ -1,7 +1,10 @@
 import importlib
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Type
+from typing import Dict, List, Optional, Tuple, Type, Union
+
+import numpy as np
+from numpy.typing import NDArray
 
 from StreamUtils import *
 from Utils import sanitizeCName
@@ -18,6 +21,12 @@ class MessageIDChunk(Chunk):
         self.mapLogToID: Dict  # Maps log IDs to their corresponding message IDs
         self.mapIDToLog: Dict  # Maps message IDs back to log IDs
 
+        # Lookup tables indexed by logId (0..255), built at eval, None for logIds not in the log
+        self._logIdToID: Tuple[Optional[int], ...]
+        self._logIdToIDName: Tuple[Optional[str], ...]
+        self._logIdToClassName: Tuple[Optional[str], ...]
+        self._classNameToLogId: Dict[str, int]
+
         #cache
         self._MessageID_cached: Type[Enum]
 
@@ -50,11 +59,70 @@ class MessageIDChunk(Chunk):
             else:
                 self.mapLogToID[id] = self.MessageID.undefined.value # type: ignore
 
+        self.buildLogIdTables()
+
         self._children = []  # This chunk has no children
 
         self._startByte = offset
         self._endByte = sutil.tell() - startPos + offset
 
+    # logId lookup tables
+    numLogIds: int = 256
+
+    def buildLogIdTables(self):
+        """Numeric id, id name and class name of every logId, so classifying a message is a single indexed load"""
+        logIdToIDName = [self.logIDNames.get(logId, None) for logId in range(self.numLogIds)]
+        self._logIdToIDName = tuple(logIdToIDName)
+        self._logIdToID = tuple(self.mapLogToID.get(logId, None) for logId in range(self.numLogIds))
+        self._logIdToClassName = tuple(
+            None if idName is None else idName[2:] if idName.startswith("id") else idName
+            for idName in logIdToIDName
+        )
+        self._classNameToLogId = {
+            className: logId
+            for logId, className in enumerate(self._logIdToClassName)
+            if className is not None
+        }
+
+    @property
+    def logIdToID(self) -> Tuple[Optional[int], ...]:
+        if not hasattr(self, "_logIdToID"):  # chunks unpickled from caches written before the tables existed
+            self.buildLogIdTables()
+        return self._logIdToID
+
+    @property
+    def logIdToIDName(self) -> Tuple[Optional[str], ...]:
+        if not hasattr(self, "_logIdToIDName"):
+            self.buildLogIdTables()
+        return self._logIdToIDName
+
+    @property
+    def logIdToClassName(self) -> Tuple[Optional[str], ...]:
+        if not hasattr(self, "_logIdToClassName"):
+            self.buildLogIdTables()
+        return self._logIdToClassName
+
+    @property
+    def classNameToLogId(self) -> Dict[str, int]:
+        if not hasattr(self, "_classNameToLogId"):
+            self.buildLogIdTables()
+        return self._classNameToLogId
+
+    def logIdOfKey(self, key: Union[str, Enum]) -> Optional[int]:
+        """logId of a message key (class name or MessageID enum), None if the log doesn't have it"""
+        if isinstance(key, str):
+            return self.classNameToLogId.get(key, None)
+        return self.mapIDToLog.get(key.value, None)
+
+    @property
+    def logIdToIDArray(self) -> NDArray[np.int64]:
+        """logIdToID as an array (-1 for logIds not in the log), e.g. logIdToIDArray[logIds] classifies many messages at once"""
+        if not hasattr(self, "_logIdToIDArray_cached") or self._logIdToIDArray_cached is None:
+            self._logIdToIDArray_cached = np.array(
+                [-1 if id is None else id for id in self.logIdToID], dtype=np.int64
+            )
+        return self._logIdToIDArray_cached
+
     def asDict(self):
         return {
             "logIDNames": self.logIDNames,
@@ -0,0 +1,257 @@
+import io
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import numpy as np
+from numpy.typing import NDArray
+from tqdm import tqdm
+
+from .FeaturePipeline import Feature, FeaturePipeline
+
+Range = Dict[str, Any]
+"""{index, startFrame, endFrame (absFrameIndex, inclusive), startRow, endRow (thread rows [start, end)), outcome}"""
+Stage = Callable[["PipelineRunner", Range], Dict[str, NDArray]]
+"""stage(runner, range) -> {name: array}, the outputs of the range"""
+
+
+class PipelineRunner:
+    """
+    Run stages over the ranges of a thread (episodes, or fixed size frame ranges) and record every committed
+    range in a journal, so an interrupted run restarts at the first uncommitted range
+
+    - <dir>/ranges.json: the log file (size, mtime) and the ranges, computed once from the index arrays
+      (and the GameState columns for episodes), a restart reuses them without walking the frames
+    - <dir>/<stage>/range_<index>.npz: outputs of a stage for a range, written to a temporary file first
+    - <dir>/journal.jsonl: one json line per committed (stage, range), appended and fsynced after the output
+      is in place; a partial last line (interrupted write) is ignored
+    Ranges are processed in order, all stages of a range before the next range, so at most one range is redone
+    """
+
+    rangesFileName = "ranges.json"
+    journalFileName = "journal.jsonl"
+
+    def __init__(
+        self,
+        log: Any,
+        dir: Path,
+        thread: str = "Cognition",
+        rangeKind: str = "episodes",
+        framesPerRange: int = 1000,
+        playingStates: Optional[List[str]] = None,
+    ):
+        if rangeKind not in ["episodes", "frames"]:
+            raise ValueError(f"Invalid range kind: {rangeKind}")
+        self.log = log
+        self.dir = Path(dir)
+        self.thread = thread
+        self.rangeKind = rangeKind
+        self.framesPerRange = framesPerRange
+        self.playingStates = playingStates
+        self.stages: Dict[str, Stage] = {}
+
+        # cache
+        self._ranges_cached: Optional[List[Range]] = None
+        self._featureIndexArrays_cached: Optional[Dict[str, NDArray]] = None
+
+    def addStage(self, name: str, stage: Stage) -> "PipelineRunner":
+        """Stages run in the order they are added, a stage can read earlier stages' outputs with loadRange()"""
+        self.stages[name] = stage
+        return self
+
+    @staticmethod
+    def featureStage(spec: Dict[str, Feature], dropIncomplete: bool = False, numWorkers: Optional[int] = 0) -> Stage:
+        """A stage that extracts the features of the range's frames (see FeaturePipeline)"""
+
+        def stage(runner: "PipelineRunner", rangeInfo: Range) -> Dict[str, NDArray]:
+            pipeline = FeaturePipeline(
+                runner.log.getContentChunk(),
+                spec,
+                runner.thread,
+                numWorkers=numWorkers,
+                frameRange=(rangeInfo["startFrame"], rangeInfo["endFrame"]),
+                indexArrays=runner.featureIndexArrays,
+            )
+            return pipeline.run(dropIncomplete, showProgress=False)
+
+        return stage
+
+    @property
+    def featureIndexArrays(self) -> Dict[str, NDArray]:
+        """Message index arrays of the log (FeaturePipeline.indexArrays), computed once for all ranges"""
+        if self._featureIndexArrays_cached is None:
+            self._featureIndexArrays_cached = FeaturePipeline(self.log.getContentChunk(), {}, self.thread).indexArrays
+        return self._featureIndexArrays_cached
+
+    # Ranges
+    @property
+    def rangesFilePath(self) -> Path:
+        return self.dir / self.rangesFileName
+
+    @property
+    def journalFilePath(self) -> Path:
+        return self.dir / self.journalFileName
+
+    @property
+    def rangesInfo(self) -> Dict[str, Any]:
+        """What the ranges depend on, a journal written for other ranges cannot be resumed"""
+        return {
+            "logFile": Path(self.log.logFilePath).name,
+            "logFileInfo": list(self.log.manifestLogFileInfo()),
+            "thread": self.thread,
+            "rangeKind": self.rangeKind,
+            "framesPerRange": self.framesPerRange if self.rangeKind == "frames" else None,
+            "playingStates": self.playingStates if self.rangeKind == "episodes" else None,
+        }
+
+    def computeRanges(self) -> List[Range]:
+        chunk = self.log.getContentChunk()
+        if self.rangeKind == "episodes":
+            episodes = chunk.episodes(self.thread, self.playingStates, showProgress=False)
+            return [
+                {
+                    "index": i,
+                    "startFrame": int(episodes["startFrame"][i]),
+                    "endFrame": int(episodes["endFrame"][i]),
+                    "startRow": int(episodes["startRow"][i]),
+                    "endRow": int(episodes["endRow"][i]),
+                    "outcome": str(episodes["outcome"][i]),
+                }
+                for i in range(len(episodes["startFrame"]))
+            ]
+        rows = chunk.threadFrameIndexes(self.thread)
+        return [
+            {
+                "index": i,
+                "startFrame": int(rows[start]),
+                "endFrame": int(rows[min(start + self.framesPerRange, len(rows)) - 1]),
+                "startRow": start,
+                "endRow": min(start + self.framesPerRange, len(rows)),
+                "outcome": None,
+            }
+            for i, start in enumerate(range(0, len(rows), self.framesPerRange))
+        ]
+
+    @property
+    def ranges(self) -> List[Range]:
+        """The ranges, loaded from ranges.json if it was written for the same log and settings"""
+        if self._ranges_cached is None:
+            if self.rangesFilePath.exists():
+                with open(self.rangesFilePath, "r") as f:
+                    saved = json.load(f)
+                if saved["info"] != self.rangesInfo:
+                    raise ValueError(
+                        f"{self.dir} holds a run over other ranges ({saved['info']}), use another dir or delete it"
+                    )
+                self._ranges_cached = saved["ranges"]
+            else:
+                self._ranges_cached = self.computeRanges()
+                self.writeAtomic(
+                    self.rangesFilePath,
+                    json.dumps({"info": self.rangesInfo, "ranges": self._ranges_cached}, indent=2).encode(),
+                )
+        return self._ranges_cached
+
+    # Journal
+    def committed(self) -> Dict[str, Set[int]]:
+        """{stage: committed range indexes} from the journal"""
+        result: Dict[str, Set[int]] = {}
+        if not self.journalFilePath.exists():
+            return result
+        with open(self.journalFilePath, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # partial line of an interrupted write
+                result.setdefault(entry["stage"], set()).add(entry["range"])
+        return result
+
+    def commit(self, stage: str, rangeInfo: Range, outputPath: Path):
+        """Append a journal entry, flushed to disk before the next range starts"""
+        entry = {
+            "stage": stage,
+            "range": rangeInfo["index"],
+            "startFrame": rangeInfo["startFrame"],
+            "endFrame": rangeInfo["endFrame"],
+            "output": str(outputPath.relative_to(self.dir)),
+            "time": time.time(),
+        }
+        with open(self.journalFilePath, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def dropPartialJournalLine(self):
+        """Truncate an interrupted last line, so the next entry starts on its own line"""
+        if not self.journalFilePath.exists():
+            return
+        with open(self.journalFilePath, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    # Outputs
+    @staticmethod
+    def writeAtomic(path: Path, data: bytes):
+        os.makedirs(path.parent, exist_ok=True)
+        tmpPath = path.with_name(path.name + ".tmp")
+        with open(tmpPath, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmpPath, path)
+
+    def outputPath(self, stage: str, index: int) -> Path:
+        return self.dir / stage / f"range_{index:06d}.npz"
+
+    def writeOutputs(self, stage: str, index: int, outputs: Dict[str, NDArray]) -> Path:
+        path = self.outputPath(stage, index)
+        buffer = io.BytesIO()
+        np.savez(buffer, **outputs)
+        self.writeAtomic(path, buffer.getvalue())
+        return path
+
+    def loadRange(self, stage: str, index: int) -> Dict[str, NDArray]:
+        with np.load(self.outputPath(stage, index)) as outputs:
+            return {name: outputs[name] for name in outputs.files}
+
+    def load(self, stage: str) -> Dict[str, NDArray]:
+        """Outputs of all committed ranges of the stage, concatenated in range order"""
+        indexes = sorted(self.committed().get(stage, set()))
+        parts = [self.loadRange(stage, index) for index in indexes]
+        if len(parts) == 0:
+            return {}
+        return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+    # Running
+    def pending(self) -> List[Range]:
+        """Ranges that have at least one uncommitted stage"""
+        committed = self.committed()
+        return [
+            rangeInfo
+            for rangeInfo in self.ranges
+            if any(rangeInfo["index"] not in committed.get(stage, set()) for stage in self.stages)
+        ]
+
+    def run(self, showProgress: bool = True) -> int:
+        """Run the uncommitted stages of every range, returns the number of committed (stage, range) pairs"""
+        if len(self.stages) == 0:
+            raise ValueError("No stage to run, use addStage() first")
+        os.makedirs(self.dir, exist_ok=True)
+        self.dropPartialJournalLine()
+        committed = self.committed()
+        pending = self.pending()
+        if showProgress and len(pending) < len(self.ranges):
+            print(f"Resuming at range {pending[0]['index'] if pending else len(self.ranges)} of {len(self.ranges)}")
+        count = 0
+        for rangeInfo in tqdm(pending, desc="Running Pipeline", disable=not showProgress):
+            for name, stage in self.stages.items():
+                if rangeInfo["index"] in committed.get(name, set()):
+                    continue
+                path = self.writeOutputs(name, rangeInfo["index"], stage(self, rangeInfo))
+                self.commit(name, rangeInfo, path)
+                count += 1
+        return count
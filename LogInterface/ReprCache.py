@@ -0,0 +1,124 @@
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .DataClasses import DataClass
+
+
+class ReprCache:
+    """
+    Parsed representations of a log, stored separately from the Log manifest and loaded one message at a time
+
+    - reprCacheFile.cache: concatenated pickles of the representations
+    - reprCacheIndexFile.cache: int64 (start, end) byte range of every message's pickle, (-1, -1) if it is not cached
+    - reprCacheInfo.json: schema hash of the TypeInfoChunk and number of messages,
+      the cache is discarded when they don't match the log anymore
+    """
+
+    dataFileName = "reprCacheFile.cache"
+    indexFileName = "reprCacheIndexFile.cache"
+    infoFileName = "reprCacheInfo.json"
+
+    def __init__(self, chunk: Any):
+        self.chunk = chunk
+
+        # cache
+        self._index_cached: Optional[NDArray[np.int64]] = None
+
+    @property
+    def dataFilePath(self) -> Path:
+        return self.chunk.log.cacheDir / self.dataFileName
+
+    @property
+    def indexFilePath(self) -> Path:
+        return self.chunk.log.cacheDir / self.indexFileName
+
+    @property
+    def infoFilePath(self) -> Path:
+        return self.chunk.log.cacheDir / self.infoFileName
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        return {
+            "schemaHash": self.chunk.log.TypeInfoChunk.schemaHash,
+            "numMessages": len(self.chunk.messages),
+        }
+
+    @property
+    def isValid(self) -> bool:
+        if not self.infoFilePath.exists() or not self.indexFilePath.exists():
+            return False
+        with open(self.infoFilePath, "r") as f:
+            if json.load(f) != self.info:
+                return False
+        return self.indexFilePath.stat().st_size == self.info["numMessages"] * 16
+
+    def reset(self):
+        """Create an empty cache (no message cached)"""
+        os.makedirs(self.chunk.log.cacheDir, exist_ok=True)
+        numMessages = self.info["numMessages"]
+        open(self.dataFilePath, "wb").close()
+        np.full((numMessages, 2), -1, dtype=np.int64).tofile(self.indexFilePath)
+        with open(self.infoFilePath, "w") as f:
+            json.dump(self.info, f)  # written last, it marks a complete cache
+        self._index_cached = None
+
+    @property
+    def index(self) -> NDArray[np.int64]:
+        if self._index_cached is None:
+            if not self.isValid:
+                return np.zeros((0, 2), dtype=np.int64)
+            if self.indexFilePath.stat().st_size == 0:
+                self._index_cached = np.zeros((0, 2), dtype=np.int64)
+            else:
+                self._index_cached = np.memmap(
+                    self.indexFilePath, dtype=np.int64, mode="r"
+                ).reshape(-1, 2)
+        return self._index_cached
+
+    def __contains__(self, absIndex: int) -> bool:
+        index = self.index
+        return 0 <= absIndex < len(index) and index[absIndex, 0] >= 0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.index[:, 0] >= 0))
+
+    def load(self, absIndex: int) -> Optional[DataClass]:
+        """The cached representation of a message, None if it is not cached"""
+        if absIndex not in self:
+            return None
+        start, end = self.index[absIndex]
+        with open(self.dataFilePath, "rb") as f:
+            f.seek(int(start))
+            return pickle.loads(f.read(int(end - start)))
+
+    def dump(self, reprObjs: Dict[int, DataClass]) -> int:
+        """
+        Append the representations that are not cached yet, returns the number of appended representations
+        The pickles are flushed before the index is updated, so an interrupted dump never indexes a partial pickle
+        """
+        if not self.isValid:
+            self.reset()
+        index = self.index
+        newIndexes = sorted(i for i in reprObjs if index[i, 0] < 0)
+        if len(newIndexes) == 0:
+            return 0
+        ranges = np.zeros((len(newIndexes), 2), dtype=np.int64)
+        with open(self.dataFilePath, "ab") as f:
+            position = f.tell()
+            for i, absIndex in enumerate(newIndexes):
+                data = pickle.dumps(reprObjs[absIndex])
+                f.write(data)
+                ranges[i] = (position, position + len(data))
+                position += len(data)
+        self._index_cached = None
+        writableIndex = np.memmap(self.indexFilePath, dtype=np.int64, mode="r+").reshape(-1, 2)
+        writableIndex[newIndexes] = ranges
+        writableIndex.flush()
+        del writableIndex
+        return len(newIndexes)
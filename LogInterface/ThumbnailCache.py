@@ -0,0 +1,154 @@
+import os
+from io import BytesIO
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+from PIL.Image import open as openImage
+from tqdm import tqdm
+
+from .BoundedExecutor import BoundedExecutor
+
+
+class ThumbnailCache:
+    """
+    Fixed-size RGB thumbnails (uint8 memmap) of every image message in the log's cache dir, with their absolute
+    message / frame indexes; JPEGs are decoded at reduced size with PIL's draft mode
+    """
+
+    def __init__(self, chunk: Any, size: Tuple[int, int] = (160, 120)):
+        """size: (width, height) of a thumbnail"""
+        self.chunk = chunk
+        self.size = size
+
+        # cache
+        self._thumbnails_cached: Optional[np.memmap] = None
+        self._index_cached: Optional[NDArray[np.int64]] = None
+
+    def __len__(self) -> int:
+        return len(self.messageIndexes)
+
+    def __getitem__(self, index: int) -> NDArray[np.uint8]:
+        return self.thumbnails[index]
+
+    # Files
+    @property
+    def thumbnailFilePath(self) -> Path:
+        return self.chunk.log.cacheDir / f"thumbnailFile_{self.size[0]}x{self.size[1]}.cache"
+
+    @property
+    def indexFilePath(self) -> Path:
+        """(messageIndex, frameIndex) of every thumbnail, written last so it marks a complete cache"""
+        return self.chunk.log.cacheDir / f"thumbnailIndexFile_{self.size[0]}x{self.size[1]}.cache"
+
+    @property
+    def isValid(self) -> bool:
+        if not self.thumbnailFilePath.exists() or not self.indexFilePath.exists():
+            return False
+        numImages = self.indexFilePath.stat().st_size // 16
+        return self.thumbnailFilePath.stat().st_size == numImages * self.thumbnailBytes
+
+    @property
+    def thumbnailBytes(self) -> int:
+        return self.size[0] * self.size[1] * 3
+
+    # Access
+    @property
+    def index(self) -> NDArray[np.int64]:
+        if self._index_cached is None:
+            if not self.isValid:
+                self.build()
+            self._index_cached = np.fromfile(self.indexFilePath, dtype=np.int64).reshape(-1, 2)
+        return self._index_cached
+
+    @property
+    def messageIndexes(self) -> NDArray[np.int64]:
+        return self.index[:, 0]
+
+    @property
+    def frameIndexes(self) -> NDArray[np.int64]:
+        return self.index[:, 1]
+
+    @property
+    def thumbnails(self) -> np.ndarray:
+        if self._thumbnails_cached is None:
+            if len(self.index) == 0:
+                return np.zeros((0, self.size[1], self.size[0], 3), dtype=np.uint8)
+            self._thumbnails_cached = np.memmap(
+                self.thumbnailFilePath,
+                dtype=np.uint8,
+                mode="r",
+                shape=(len(self.index), self.size[1], self.size[0], 3),
+            )
+        return self._thumbnails_cached
+
+    def ofMessage(self, messageIndex: int) -> NDArray[np.uint8]:
+        """Thumbnail of an image message"""
+        position = int(np.searchsorted(self.messageIndexes, messageIndex))
+        if position == len(self) or self.messageIndexes[position] != messageIndex:
+            raise KeyError(f"Message {messageIndex} is not an image")
+        return self.thumbnails[position]
+
+    def ofFrame(self, frameIndex: int) -> NDArray[np.uint8]:
+        """Thumbnail of the (first) image in a frame"""
+        position = int(np.searchsorted(self.frameIndexes, frameIndex))
+        if position == len(self) or self.frameIndexes[position] != frameIndex:
+            raise KeyError(f"Frame {frameIndex} has no image")
+        return self.thumbnails[position]
+
+    # Generation
+    @staticmethod
+    def makeThumbnail(task: Tuple[str, int, int, bytes, Tuple[int, int]]) -> NDArray[np.uint8]:
+        """Worker: decode a payload at reduced size and resize it to the thumbnail size"""
+        className, width, height, payload, size = task
+        if className == "JPEGImage":
+            rawImg = openImage(BytesIO(payload), formats=["JPEG"])
+            # Every CMYK pixel of the JPEG is a YUYV pair, so the JPEG is half as wide as the image
+            rawImg.draft("CMYK", ((size[0] + 1) // 2, size[1]))
+            rawArray = np.asarray(rawImg)
+            yuyv = (255 - rawArray).reshape((rawArray.shape[0], rawArray.shape[1] * 2, 2))
+        else:
+            yuyv = np.frombuffer(payload, dtype=np.uint8).reshape((height, width * 2, 2))
+        rgbImage = cv2.cvtColor(yuyv, cv2.COLOR_YUV2RGB_YUYV)
+        return cv2.resize(rgbImage, size, interpolation=cv2.INTER_AREA)
+
+    def build(
+        self,
+        numWorkers: Optional[int] = None,
+        maxInFlight: Optional[int] = None,
+        showProgress: bool = True,
+    ):
+        """Generate the thumbnails of all image messages with a BoundedExecutor"""
+        os.makedirs(self.chunk.log.cacheDir, exist_ok=True)
+        if self.indexFilePath.exists():
+            self.indexFilePath.unlink()
+        self._thumbnails_cached = None
+        self._index_cached = None
+
+        index: List[Tuple[int, int]] = []
+        pbar = tqdm(desc="Generating Thumbnails", unit="img", disable=not showProgress)
+        try:
+            with open(self.thumbnailFilePath, "wb") as thumbnailFile:
+
+                def write(thumbnail: NDArray[np.uint8], _):
+                    thumbnailFile.write(thumbnail.tobytes())
+                    pbar.update(1)
+
+                with BoundedExecutor(write, numWorkers, maxInFlight) as executor:
+                    for image in self.chunk.iterImageMessages(withMetaData=False):
+                        executor.submit(
+                            self.makeThumbnail,
+                            (
+                                image["className"],
+                                image["width"],
+                                image["height"],
+                                bytes(image["payload"]),
+                                self.size,
+                            ),
+                        )
+                        index.append((image["messageIndex"], image["frameIndex"]))
+        finally:
+            pbar.close()
+        np.array(index, dtype=np.int64).reshape(-1, 2).tofile(self.indexFilePath)
@@ -1,10 +1,12 @@
+import hashlib
 import importlib
+import json
 import os
 import pickle
 import re
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Type
+from typing import Callable, Dict, List, Optional, Tuple, Type
 
 from ImageUtils import CameraImage, JPEGImage
 from LogInterface.LogInterfaceBase import LogInterfaceInstanceClass
@@ -18,6 +20,9 @@ from .DataClasses import (Annotation, DataClass, FrameBegin, FrameFinished,
 
 
 class TypeInfoChunk(Chunk):
+    selfDefinedClasses = ["Annotation", "Stopwatch", "FrameBegin", "FrameFinished"]
+    """Classes implemented in LogInterface.DataClasses instead of being generated"""
+
     def __init__(self, parent):
         super().__init__(parent)
 
@@ -36,6 +41,16 @@ class TypeInfoChunk(Chunk):
     def dataClasses(self):
         return self._dataClasses
 
+    @property
+    def schemaHash(self) -> str:
+        """Hash of the enum and data class descriptions, identifies the generated LogClasses (and pickled representations)"""
+        if not hasattr(self, "_schemaHash_cached"):
+            description = json.dumps(
+                [self.enumDescriptions, self.dataClassDescriptions], sort_keys=True
+            )
+            self._schemaHash_cached = hashlib.sha1(description.encode()).hexdigest()
+        return self._schemaHash_cached
+
     def registerEnums(self):
         LogEnum = importlib.import_module(".LogClasses.LogEnum", "LogInterface")
         self._enumClasses = {}
@@ -76,9 +91,8 @@ class TypeInfoChunk(Chunk):
         codeLines.append("from Primitive import *")
         codeLines.append("from StreamUtils import *")
 
-        selfDefinedClasses = ["Annotation", "Stopwatch", "FrameBegin", "FrameFinished"]
         for className, dataClass in self.dataClassDescriptions.items():
-            if className in selfDefinedClasses:
+            if className in self.selfDefinedClasses:
                 continue
             codeLines.append(f"class {sanitizeCName(className)}(DataClass):")
             codeLines.append(f'\t"""CXX Class Name: {className}"""')
@@ -102,21 +116,9 @@ class TypeInfoChunk(Chunk):
                 f"\t\treturn {{",
             ]
             for attrName in readOrder:
-                ctype, length = type2ReadInstruction(attributeCtype[attrName])
-                if length == 1:
-                    mainComponent = f"self.{attrName}"
-                else:
-                    mainComponent = f"attrValue"
-                if ctype in self.primitives:
-                    mainComponent += ""
-                elif ctype in self.dataClassDescriptions:
-                    mainComponent += ".asDict()"
-                elif ctype in self.enumDescriptions:
-                    mainComponent += ".name"
-                if length != 1:
-                    mainComponent = (
-                        f"[{mainComponent} for attrValue in self.{attrName}]"
-                    )
+                mainComponent = self.asDictExpression(
+                    f"self.{attrName}", attributeCtype[attrName], [className]
+                )
                 asDictFunction.append(f'\t\t\t"{attrName}":{mainComponent},')
             asDictFunction.append(
                 "\t\t}",
@@ -163,6 +165,33 @@ class TypeInfoChunk(Chunk):
         with open(Path(__file__).parent / "LogClasses" / "LogClass.py", "w") as f:
             f.write(classString)
 
+    def asDictExpression(self, expr: str, attrCtype: str, visiting: List[str]) -> str:
+        """
+        Generated code converting expr (a value of attrCtype) into its asDict() form
+        Nested classes are inlined as dict literals, so the generated asDict() doesn't call the asDict() of its members
+        Classes that are already being inlined (recursive types) and self defined classes still call asDict()
+        """
+        ctype, length = type2ReadInstruction(attrCtype)
+        if length != 1:
+            if ctype in self.primitives:
+                return f"list({expr})"
+            element = f"v{len(visiting)}"
+            return f"[{self.asDictExpression(element, ctype, visiting)} for {element} in {expr}]"
+        if ctype in self.enumDescriptions:
+            return f"{expr}.name"
+        if ctype in self.dataClassDescriptions:
+            if ctype in visiting or ctype in self.selfDefinedClasses:
+                return f"{expr}.asDict()"
+            items = [
+                f'"{sanitizeCName(attrName)}":'
+                + self.asDictExpression(
+                    f"{expr}.{sanitizeCName(attrName)}", attrCtype, visiting + [ctype]
+                )
+                for attrName, attrCtype in self.dataClassDescriptions[ctype]
+            ]
+            return "{" + ",".join(items) + "}"
+        return expr
+
     def registerDataClasses(self):
         self._dataClasses = {}
         LogClass = importlib.import_module(".LogClasses.LogClass", "LogInterface")
@@ -175,6 +204,25 @@ class TypeInfoChunk(Chunk):
         self._dataClasses["FrameBegin"] = FrameBegin
         self._dataClasses["FrameFinished"] = FrameFinished
 
+    @property
+    def logIdToClassType(self) -> Tuple[Optional[Type[DataClass]], ...]:
+        """Data class of every logId (see MessageIDChunk.logIdToClassName), None if it has no data class"""
+        if not hasattr(self, "_logIdToClassType_cached") or self._logIdToClassType_cached is None:
+            self._logIdToClassType_cached = tuple(
+                self.dataClasses.get(className, None)
+                for className in self.log.MessageIDChunk.logIdToClassName
+            )
+        return self._logIdToClassType_cached
+
+    @property
+    def logIdToRead(self) -> Tuple[Optional[Callable], ...]:
+        """read() of the data class of every logId, picklable for process pools"""
+        if not hasattr(self, "_logIdToRead_cached") or self._logIdToRead_cached is None:
+            self._logIdToRead_cached = tuple(
+                None if classType is None else classType.read for classType in self.logIdToClassType
+            )
+        return self._logIdToRead_cached
+
     def eval(self, sutil: StreamUtil, offset: int = 0):
         startPos = sutil.tell()
         chunkMagicBit = sutil.readUChar()
@@ -274,6 +322,88 @@ class TypeInfoChunk(Chunk):
     def parseBytes(self):
         pass
 
+    # Binary layout
+    def typeSize(self, ctype: str) -> Optional[int]:
+        """
+        Number of bytes a value of ctype occupies in a message body
+        Returns None if the size is not fixed (strings, dynamic arrays, or classes containing them)
+        """
+        ctype, length = type2ReadInstruction(ctype)
+        if length == -1:
+            return None
+        if ctype in self.primitives:
+            if ctype not in CType2Numpy or CType2Numpy[ctype] is Str:
+                return None
+            elementSize = 4 if CType2Numpy[ctype] is Angle else np.dtype(CType2Numpy[ctype]).itemsize
+        elif ctype in self.enumDescriptions:
+            elementSize = 1
+        elif ctype in self.dataClassDescriptions:
+            elementSize = 0
+            for attrName, attrCtype in self.dataClassDescriptions[ctype]:
+                attrSize = self.typeSize(attrCtype)
+                if attrSize is None:
+                    return None
+                elementSize += attrSize
+        else:
+            return None
+        return elementSize * length
+
+    def fieldOffset(self, className: str, attrName: str) -> Optional[int]:
+        """
+        Byte offset of attrName inside the message body of className
+        Returns None if any attribute stored before it does not have a fixed size
+        """
+        offset = 0
+        for name, attrCtype in self.dataClassDescriptions[className]:
+            if name == attrName:
+                return offset
+            attrSize = self.typeSize(attrCtype)
+            if attrSize is None:
+                return None
+            offset += attrSize
+        raise KeyError(f"{className} has no attribute {attrName}")
+
+    def flatFields(self, className: str, prefix: str = "") -> List[Tuple[str, str]]:
+        """
+        (dotted name, leaf ctype) of every primitive/enum value in className
+        Nested classes are flattened to dotted names (asDict keys), fixed-size arrays to name.0, name.1, ...
+        Dynamic arrays are not flattened, their leaf ctype ends with "*"
+        """
+        result = []
+        for attrName, attrCtype in self.dataClassDescriptions[className]:
+            name = prefix + sanitizeCName(attrName)
+            ctype, length = type2ReadInstruction(attrCtype)
+            if length == -1:
+                result.append((name, attrCtype))
+                continue
+            names = [name] if length == 1 else [f"{name}.{i}" for i in range(length)]
+            for elementName in names:
+                if ctype in self.dataClassDescriptions:
+                    result.extend(self.flatFields(ctype, elementName + "."))
+                else:
+                    result.append((elementName, ctype))
+        return result
+
+    def flatFieldTypes(self, className: str) -> List[Tuple[str, str]]:
+        """
+        (dotted name, numpy dtype name) of every flatFields leaf, the dtype a column of the field is stored as
+        Enums are uint8 codes and angles float32, dynamic arrays are "json" and other non numeric leaves "str"
+        """
+        result = []
+        for name, ctype in self.flatFields(className):
+            if ctype.endswith("*"):
+                dtype = "json"
+            elif ctype in self.enumDescriptions:
+                dtype = "uint8"
+            elif CType2Numpy.get(ctype, None) is Angle:
+                dtype = "float32"
+            elif ctype in CType2Numpy and CType2Numpy[ctype] is not str:
+                dtype = np.dtype(CType2Numpy[ctype]).name
+            else:
+                dtype = "str"
+            result.append((name, dtype))
+        return result
+
     def asDict(self) -> Dict:
         return {
             "primitives": self.primitives,
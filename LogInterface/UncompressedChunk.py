@@ -1,23 +1,45 @@
 import asyncio
 import csv
+import io
 import os
 from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
 from functools import partial
 from multiprocessing import Pool, cpu_count
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
+from numpy.typing import NDArray
 from tqdm import tqdm
 
+from ImageUtils.ImageEncoder import ImageEncoder
+from ImageUtils.PixelTypes import YUYVPixel
 from Primitive.PrimitiveDefinitions import UChar
 from StreamUtils import AbsoluteByteIndex, StreamUtil, SutilCursor
-from Utils import MemoryMappedFile
+from Utils import MemoryMappedFile, dumpJson
 
 from .Chunk import Chunk, ChunkEnum
+from .ChunkArrays import ChunkArrays
 from .DataClasses import DataClass, Stopwatch, Timer
-from .Frame import FrameAccessor, FrameBase, FrameInstance, Frames
-from .LogInterfaceBase import IndexMap, LogInterfaceAccessorClass
-from .Message import MessageAccessor, MessageBase, MessageInstance, Messages
+from .ColumnarExportPipeline import ColumnarExportPipeline
+from .DatasetExportPipeline import DatasetExportPipeline
+from .EpisodeSegmenter import EpisodeSegmenter
+from .FeaturePipeline import Feature, FeaturePipeline
+from .Frame import FrameAccessor, FrameBase, FrameInstance, Frames, FrameView
+from .FrameExportPipeline import FrameExportPipeline
+from .ImageExportPipeline import ImageExportPipeline, VideoExportPipeline
+from .LogInterfaceBase import AccessorHandle, IndexMap, LogInterfaceAccessorClass, ViewSequence
+from .Message import (
+    MessageAccessor,
+    MessageBase,
+    MessageInstance,
+    Messages,
+    MessageSequence,
+    MessageView,
+)
+from .ReprCache import ReprCache
+from .ThumbnailCache import ThumbnailCache
 
 
 class UncompressedChunk(Chunk):
@@ -31,6 +53,9 @@ class UncompressedChunk(Chunk):
         self._threads: Dict[str, Frames] = {}
         self._timers: Dict[str, Timer] = {}
 
+        # array backed instance mode (Log.eval(isArrayBacked=True))
+        self._arrays: ChunkArrays
+
         # cached index of messages and data objects
         self._messages_cached: Messages
         self._reprs_cached: List[DataClass]
@@ -48,6 +73,7 @@ class UncompressedChunk(Chunk):
             self.log.cacheDir / MessageAccessor.messageIdxFileName
         )
         frameIdxFilePath: Path = self.log.cacheDir / FrameAccessor.frameIdxFileName
+        self.log._messageIndexRecords_cached = None
         if messageIdxFilePath.exists():
             messageIdxFilePath.unlink()
         if frameIdxFilePath.exists():
@@ -103,54 +129,68 @@ class UncompressedChunk(Chunk):
         except OSError:
             pass
 
-        messageIdxFile = open(messageIdxFilePath, "ab")
-        frameIdxFile = open(frameIdxFilePath, "ab")
-
-        while byteIndex < min(usedSize, remainingSize):
-            frame = FrameInstance(self)
-            try:
-                frame.eval(sutil, byteIndex + messageStartByte)
-            except EOFError:
-                break  # TODO: check this, should not be EOFError in UncompressedChunk
-
-            frameMessageIndexStart = messageCnt
-            for message in frame.messages:
-                messageIdxFile.write(
-                    MessageAccessor.encodeIndexBytes(
-                        (messageCnt, frameCnt, message.startByte, message.endByte)
+        # Index files must be flushed before they are memory mapped by the accessors below
+        with open(messageIdxFilePath, "ab") as messageIdxFile, open(
+            frameIdxFilePath, "ab"
+        ) as frameIdxFile:
+            while byteIndex < min(usedSize, remainingSize):
+                frame = FrameInstance(self)
+                try:
+                    frame.eval(sutil, byteIndex + messageStartByte)
+                except EOFError:
+                    break  # TODO: check this, should not be EOFError in UncompressedChunk
+
+                frameMessageIndexStart = messageCnt
+                for message in frame.messages:
+                    messageIdxFile.write(
+                        MessageAccessor.encodeIndexBytes(
+                            (messageCnt, frameCnt, message.startByte, message.endByte)
+                        )
                     )
-                )
 
-                messageCnt += 1
+                    messageCnt += 1
 
-            frameMessageIndexEnd = messageCnt
+                frameMessageIndexEnd = messageCnt
 
-            frameIdxFile.write(
-                FrameAccessor.encodeIndexBytes(
-                    (
-                        frameCnt,
-                        frame.threadName,
-                        frameMessageIndexStart,
-                        frameMessageIndexEnd,
+                frameIdxFile.write(
+                    FrameAccessor.encodeIndexBytes(
+                        (
+                            frameCnt,
+                            frame.threadName,
+                            frameMessageIndexStart,
+                            frameMessageIndexEnd,
+                        )
                     )
                 )
-            )
 
-            byteIndex += frame.size
-            frameCnt += 1
-        self.frames = self.log.getFrameAccessor()
-        threadIndexMaps = {}
-
-        for index, frame in enumerate(self.frames):
-            if frame.threadName not in threadIndexMaps:
-                threadIndexMaps[frame.threadName] = [index]
-            else:
-                threadIndexMaps[frame.threadName].append(index)
-        for threadName, indexes in threadIndexMaps.items():
-            self._threads[threadName] = FrameAccessor(self.log, indexes)
+                byteIndex += frame.size
+                frameCnt += 1
+        self.log._messageIndexRecords_cached = None  # the message index file has grown
+        self.attachFrameAccessor()
         self._startByte = offset
         self._endByte = sutil.tell() - startPos + offset
 
+    def attachFrameAccessor(self):
+        """Create the frame and thread accessors from the index files, thread names are read as one array"""
+        self.frames = self.log.getFrameAccessor()
+        frameIdxFilePath = self.log.cacheDir / FrameAccessor.frameIdxFileName
+        self._threads = {}
+        if frameIdxFilePath.stat().st_size == 0:
+            return
+        frameIndex = np.memmap(
+            frameIdxFilePath,
+            dtype=[("absIndex", "<u4"), ("threadName", "S12"), ("start", "<u8"), ("end", "<u8")],
+            mode="r",
+        )
+        threadNames = np.asarray(frameIndex["threadName"])
+        self._frameThreadIndexes = np.zeros(len(threadNames), dtype=np.int64)
+        _, firstIndexes = np.unique(threadNames, return_index=True)
+        for firstIndex in sorted(firstIndexes):  # in order of appearance
+            threadName = threadNames[firstIndex]
+            indexes = np.flatnonzero(threadNames == threadName)
+            self._frameThreadIndexes[indexes] = np.arange(len(indexes))
+            self._threads[threadName.decode("ascii")] = FrameAccessor(self.log, indexes.tolist())
+
     def evalFrameAndMessageInstances(self, sutil: StreamUtil, offset: int = 0):
         """
         Norma eval function
@@ -176,23 +216,35 @@ class UncompressedChunk(Chunk):
         messageStartByte = offset + (sutil.tell() - startPos)
         byteIndex = 0
         frameIndex = []
+        messageCnt = 0
+        frameMessageIndexStarts = []
+        frameThreadIndexes = []
         while byteIndex < min(usedSize, remainingSize):
             frame = FrameInstance(self)
             try:
                 frame.eval(sutil, byteIndex + messageStartByte)
             except EOFError:
                 break  # TODO: check this, should not be EOFError in UncompressedChunk
+            frame._absIndex = len(self.frames)
             self.frames.append(frame)
 
             if frame.threadName not in self._threads:
                 self._threads[frame.threadName] = []
                 self._timers[frame.threadName] = Timer()
 
+            # indexes are recorded here, so they are never computed by scanning the frames
+            frameMessageIndexStarts.append(messageCnt)
+            frameThreadIndexes.append(len(self._threads[frame.threadName]))
+            messageCnt = self.recordMessageIndexes(frame, messageCnt)
+
             self._threads[frame.threadName].append(frame)  # type: ignore
 
             frameIndex.append(frame.startByte - messageStartByte)
             byteIndex += frame.size
 
+        self._frameMessageIndexStarts = np.array(frameMessageIndexStarts, dtype=np.int64)
+        self._frameThreadIndexes = np.array(frameThreadIndexes, dtype=np.int64)
+
         for threadName, threadFrames in self._threads.items():
             self._timers[threadName].initStorage(
                 [frame.index for frame in threadFrames]
@@ -201,14 +253,860 @@ class UncompressedChunk(Chunk):
         self._startByte = offset
         self._endByte = sutil.tell() - startPos + offset
 
-    def eval(self, sutil: StreamUtil, offset: int = 0, evalAccessor: bool = False):
+    @staticmethod
+    def recordMessageIndexes(frame: FrameInstance, absMessageIndexStart: Optional[int] = None) -> int:
+        """
+        Record index and absIndex of the messages of an instance frame, returns the absIndex after its last message
+        Dummy messages come first, they only get an absIndex
+        """
+        cnt = frame.absMessageIndexStart if absMessageIndexStart is None else absMessageIndexStart
+        for dummy in frame.dummyMessages:
+            dummy._absIndex = cnt
+            cnt += 1
+        for index, message in enumerate(frame.messages):
+            message._index = index
+            message._absIndex = cnt
+            cnt += 1
+        return cnt
+
+    def evalFrameArrays(self, sutil: StreamUtil, offset: int = 0):
+        """
+        Array backed instance mode
+        Frames and messages are rows of ChunkArrays (raw column files in the cache dir) instead of one object each,
+        UncompressedChunk.frames/threads/messages are ViewSequences that create FrameView/MessageView on access
+        """
+        startPos: SutilCursor = sutil.tell()
+        chunkMagicBit: UChar = sutil.readUChar()
+        if chunkMagicBit != ChunkEnum.UncompressedChunk.value:
+            raise Exception(
+                f"Expect magic number {ChunkEnum.UncompressedChunk.value}, but get:{chunkMagicBit}"
+            )
+
+        header = sutil.readQueueHeader()
+
+        usedSize = int(header[0]) << 32 | int(header[2])
+        logSize = os.path.getsize(self.parent.logFilePath)
+        remainingSize = logSize - offset
+
+        messageStartByte = offset + (sutil.tell() - startPos)
+        byteIndex = 0
+        columns = ChunkArrays.builder()
+        threadNames: List[str] = []
+        while byteIndex < min(usedSize, remainingSize):
+            frame = FrameInstance(self)  # only used to locate the messages, dropped after the frame is recorded
+            try:
+                frame.eval(sutil, byteIndex + messageStartByte)
+            except EOFError:
+                break  # TODO: check this, should not be EOFError in UncompressedChunk
+
+            self.appendFrameColumns(columns, threadNames, frame)
+            byteIndex += frame.size
+
+        self._arrays = ChunkArrays(self.log.cacheDir, threadNames)
+        self._arrays.write(columns)
+        self.buildArrayViews()
+
+        self._startByte = offset
+        self._endByte = sutil.tell() - startPos + offset
+
+    @staticmethod
+    def appendFrameColumns(columns: Dict[str, Any], threadNames: List[str], frame: FrameBase):
+        """Append an evaluated frame and its messages to the ChunkArrays.builder() columns"""
+        if frame.threadName not in threadNames:
+            threadNames.append(frame.threadName)
+        frameCnt = len(columns["frameStartBytes"])
+        columns["frameStartBytes"].append(frame.startByte)
+        columns["frameEndBytes"].append(frame.endByte)
+        columns["frameMessageStarts"].append(len(columns["messageStartBytes"]))
+        for message in frame.messages:
+            columns["messageStartBytes"].append(message.startByte)
+            columns["messageEndBytes"].append(message.endByte)
+            columns["messageLogIds"].append(message.logId)
+            columns["messageFrameIndexes"].append(frameCnt)
+        columns["frameMessageEnds"].append(len(columns["messageStartBytes"]))
+        columns["frameThreadIds"].append(threadNames.index(frame.threadName))
+
+    def buildArrayViews(self):
+        """Create the frame and thread sequences (and the thread timers) of an array backed chunk"""
+        arrays = self.arrays
+        self.frames = ViewSequence(self, FrameView, range(arrays.numFrames))
+        self._threads = {}
+        self._frameThreadIndexes = np.zeros(arrays.numFrames, dtype=np.int64)
+        for threadName in arrays.threadNames:
+            threadFrameIndexes = arrays.threadFrameIndexes(threadName)
+            self._frameThreadIndexes[threadFrameIndexes] = np.arange(len(threadFrameIndexes))
+            self._threads[threadName] = ViewSequence(self, FrameView, threadFrameIndexes)
+            if threadName not in self._timers:
+                self._timers[threadName] = Timer()
+                self._timers[threadName].initStorage(threadFrameIndexes.tolist())
+
+    @property
+    def arrays(self) -> ChunkArrays:
+        """DEPENDENCY: Log.eval(isArrayBacked=True)"""
+        return self._arrays
+
+    @property
+    def isArrayBacked(self) -> bool:
+        return hasattr(self, "_arrays")
+
+    # Manifest (see Log.dumpManifest)
+    def manifestState(self) -> Dict[str, Any]:
+        """
+        Small state of the chunk stored in the Log manifest, frame/message data stay in the cache dir files
+        Only accessor and array backed chunks have one, plain instance mode is pickled as a whole (see Log.eval)
+        """
+        state: Dict[str, Any] = {"startByte": self._startByte, "endByte": self._endByte}
+        if isinstance(self.frames, LogInterfaceAccessorClass):
+            state["mode"] = "accessor"
+        elif self.isArrayBacked:
+            state["mode"] = "arrays"
+            state["arrays"] = self.arrays
+        else:
+            raise ValueError("Instance mode chunks have no manifest state")
+        return state
+
+    def manifestFilePaths(self) -> List[Path]:
+        """Cache files the manifest state depends on"""
+        if isinstance(self.frames, LogInterfaceAccessorClass):
+            return [
+                self.log.cacheDir / MessageAccessor.messageIdxFileName,
+                self.log.cacheDir / FrameAccessor.frameIdxFileName,
+            ]
+        return [self.arrays.columnFilePath(name) for name in ChunkArrays.columnTypes]
+
+    def attachManifestState(self, state: Dict[str, Any]):
+        """Attach the frames and messages of a manifest state, nothing is read until they are accessed"""
+        self._startByte = state["startByte"]
+        self._endByte = state["endByte"]
+        if state["mode"] == "accessor":
+            self.attachFrameAccessor()
+        else:
+            self._arrays = state["arrays"]
+            self.buildArrayViews()
+
+    # Repr cache
+    @property
+    def reprCache(self) -> ReprCache:
+        if not hasattr(self, "_reprCache_cached") or self._reprCache_cached is None:
+            self._reprCache_cached = ReprCache(self)
+        return self._reprCache_cached
+
+    def dumpReprCache(self) -> int:
+        """
+        Append the parsed representations to the repr cache, returns the number of appended representations
+        Only array backed chunks use it: accessor mode keeps parsed representations in the bounded Log cache only
+        and plain instance mode pickles them with the frames (see Log.parseBytes)
+        """
+        if not self.isArrayBacked:
+            return 0
+        return self.reprCache.dump(self.arrays.reprObjs)
+
+    def eval(
+        self,
+        sutil: StreamUtil,
+        offset: int = 0,
+        evalAccessor: bool = False,
+        evalArrays: bool = False,
+    ):
         """
         Consistent interface for eval
         """
+        if evalAccessor and evalArrays:
+            raise ValueError("evalAccessor and evalArrays cannot be used together")
         if evalAccessor:
             self.evalFrameAccessor(sutil, offset)
+        elif evalArrays:
+            self.evalFrameArrays(sutil, offset)
         else:
             self.evalFrameAndMessageInstances(sutil, offset)
+        self.evalTimestamps()
+
+    def messageLocations(
+        self,
+    ) -> Tuple[NDArray[np.int64], NDArray[np.int64], NDArray[np.int64]]:
+        """
+        DEPENDENCY: eval()
+        (frameIndexes, startBytes, endBytes) of every message, read from the message index file in accessor mode
+        """
+        if isinstance(self.frames, LogInterfaceAccessorClass):
+            messageIdxFilePath = self.log.cacheDir / MessageAccessor.idxFileName()
+            if messageIdxFilePath.stat().st_size == 0:
+                frameIndexes = np.zeros(0, dtype=np.int64)
+                startBytes = np.zeros(0, dtype=np.int64)
+                endBytes = np.zeros(0, dtype=np.int64)
+            else:
+                messageIndex = np.memmap(
+                    messageIdxFilePath, dtype=np.uint64, mode="r"
+                ).reshape(-1, 4)
+                frameIndexes = messageIndex[:, 1].astype(np.int64)
+                startBytes = messageIndex[:, 2].astype(np.int64)
+                endBytes = messageIndex[:, 3].astype(np.int64)
+        elif self.isArrayBacked:
+            frameIndexes = np.asarray(self.arrays.messageFrameIndexes)
+            startBytes = np.asarray(self.arrays.messageStartBytes)
+            endBytes = np.asarray(self.arrays.messageEndBytes)
+        else:
+            frameIndexes, startBytes, endBytes = [], [], []
+            for frameIndex, frame in enumerate(self.frames):
+                for message in frame.messages:
+                    frameIndexes.append(frameIndex)
+                    startBytes.append(message.startByte)
+                    endBytes.append(message.endByte)
+            frameIndexes = np.array(frameIndexes, dtype=np.int64)
+            startBytes = np.array(startBytes, dtype=np.int64)
+            endBytes = np.array(endBytes, dtype=np.int64)
+        return frameIndexes, startBytes, endBytes
+
+    # Timestamps
+    @property
+    def timestampFilePath(self) -> Path:
+        return self.log.cacheDir / FrameBase.frameTimestampFileName
+
+    def evalTimestamps(self):
+        """
+        DEPENDENCY: eval()
+        Compute the timestamp of every frame and persist it as a uint32 array in the cache dir
+        The time is read directly from the FrameInfo message bytes (no parsing), frames without FrameInfo are interpolated
+        """
+        numFrames = len(self.frames)
+        frameIndexes, startBytes, endBytes = self.messageLocations()
+
+        timestamps = np.zeros(numFrames, dtype=np.int64)
+        valid = np.zeros(numFrames, dtype=np.bool_)
+
+        MessageIDChunk = self.log.MessageIDChunk
+        TypeInfoChunk = self.log.TypeInfoChunk
+        frameInfoId = MessageIDChunk.mapNameToID.get("idFrameInfo", None)
+        if (
+            len(startBytes) != 0
+            and frameInfoId in MessageIDChunk.mapIDToLog
+            and "FrameInfo" in TypeInfoChunk.dataClassDescriptions
+        ):
+            timeOffset = TypeInfoChunk.fieldOffset("FrameInfo", "time")
+            bodySize = TypeInfoChunk.typeSize("FrameInfo")
+            logBytes = np.memmap(self.logFilePath, dtype=np.uint8, mode="r")
+
+            isFrameInfo = logBytes[startBytes] == MessageIDChunk.mapIDToLog[frameInfoId]
+            if timeOffset is not None and bodySize is not None:
+                isFrameInfo &= endBytes - startBytes - 4 == bodySize
+                timeBytes = logBytes[
+                    (startBytes[isFrameInfo] + 4 + timeOffset)[:, None] + np.arange(4)
+                ]
+                timestamps[frameIndexes[isFrameInfo]] = timeBytes.view("<u4")[:, 0]
+                valid[frameIndexes[isFrameInfo]] = True
+            del logBytes
+
+        timestamps = self.interpolateTimestamps(timestamps, valid)
+        os.makedirs(self.log.cacheDir, exist_ok=True)
+        timestamps.tofile(self.timestampFilePath)
+        self._timestamps_cached = timestamps
+        self._threadTimestamps_cached = {}
+        self._timestampOrder_cached = None
+
+    @staticmethod
+    def interpolateTimestamps(timestamps: NDArray, valid: NDArray[np.bool_]) -> NDArray[np.uint32]:
+        """
+        Fill the timestamps of frames that are not valid
+        Frames between two valid frames are linearly interpolated, frames before the first (after the last) valid frame
+        are one millisecond apart from it
+        """
+        frameIndexes = np.arange(len(timestamps))
+        if len(timestamps) == 0:
+            return np.zeros(0, dtype=np.uint32)
+        if not valid.any():
+            print("Warning: No frame has valid timestamp, frame index is used instead")
+            return frameIndexes.astype(np.uint32)
+
+        validIndexes = frameIndexes[valid]
+        validTimestamps = timestamps[valid].astype(np.float64)
+        result = np.interp(frameIndexes, validIndexes, validTimestamps)
+
+        first, last = validIndexes[0], validIndexes[-1]
+        result[:first] = validTimestamps[0] - (first - frameIndexes[:first])
+        result[last + 1 :] = validTimestamps[-1] + (frameIndexes[last + 1 :] - last)
+        return np.clip(result, 0, np.iinfo(np.uint32).max).astype(np.uint32)
+
+    @property
+    def timestamps(self) -> NDArray[np.uint32]:
+        """Timestamp of every frame, indexed by absolute frame index"""
+        if hasattr(self, "_timestamps_cached") and self._timestamps_cached is not None:
+            return self._timestamps_cached
+        if (
+            not self.timestampFilePath.exists()
+            or self.timestampFilePath.stat().st_size != len(self.frames) * 4
+        ):
+            self.evalTimestamps()
+        elif len(self.frames) == 0:
+            self._timestamps_cached = np.zeros(0, dtype=np.uint32)
+        else:
+            self._timestamps_cached = np.memmap(
+                self.timestampFilePath, dtype=np.uint32, mode="r"
+            )
+        return self._timestamps_cached
+
+    def threadFrameIndexes(self, name: str) -> NDArray[np.int64]:
+        """Absolute frame indexes of all frames in the thread"""
+        if not hasattr(self, "_threadFrameIndexes_cached") or self._threadFrameIndexes_cached is None:
+            self._threadFrameIndexes_cached = {}
+        if name not in self._threadFrameIndexes_cached:
+            thread = self.thread(name)
+            if isinstance(thread, LogInterfaceAccessorClass):
+                indexes = np.asarray(thread.indexMap, dtype=np.int64)
+            elif isinstance(thread, ViewSequence):
+                indexes = np.asarray(thread.absIndexes, dtype=np.int64)
+            else:
+                indexes = np.array([frame.absIndex for frame in thread], dtype=np.int64)
+            self._threadFrameIndexes_cached[name] = indexes
+        return self._threadFrameIndexes_cached[name]
+
+    @property
+    def frameThreadIndexes(self) -> NDArray[np.int64]:
+        """Index of every frame in its thread, indexed by absolute frame index (recorded during eval)"""
+        if not hasattr(self, "_frameThreadIndexes") or self._frameThreadIndexes is None:
+            self._frameThreadIndexes = np.zeros(len(self.frames), dtype=np.int64)
+            for name in self.threadNames:
+                indexes = self.threadFrameIndexes(name)
+                self._frameThreadIndexes[indexes] = np.arange(len(indexes))
+        return self._frameThreadIndexes
+
+    @property
+    def frameMessageIndexStarts(self) -> NDArray[np.int64]:
+        """
+        Absolute index of the first message of every frame, indexed by absolute frame index
+        In instance mode the dummy messages of a frame are counted (they come first)
+        """
+        if not hasattr(self, "_frameMessageIndexStarts") or self._frameMessageIndexStarts is None:
+            if isinstance(self.frames, LogInterfaceAccessorClass):
+                frameIdxFilePath = self.log.cacheDir / FrameAccessor.frameIdxFileName
+                starts = np.fromfile(frameIdxFilePath, dtype=np.uint64).reshape(-1, 4)[:, 2]
+            elif self.isArrayBacked:
+                starts = self.arrays.frameMessageStarts
+            else:  # frames unpickled from caches written before it was recorded
+                counts = [len(frame.messages) + len(frame.dummyMessages) for frame in self.frames]
+                starts = np.concatenate([[0], np.cumsum(counts)[:-1]]) if counts else []
+            self._frameMessageIndexStarts = np.asarray(starts, dtype=np.int64)
+        return self._frameMessageIndexStarts
+
+    def threadGet(
+        self,
+        name: str,
+        keys: Sequence[Union[str, Enum]],
+        default: Any = None,
+        parse: bool = True,
+    ) -> List[Tuple[Optional[MessageBase], ...]]:
+        """
+        FrameBase.get() of every frame of the thread, a tuple of messages per frame in thread order
+        The first message of every key in each frame is located from the message index arrays in one pass
+        (locateFirstMessages), with parse the found messages are parsed in log order with one stream
+        """
+        MessageIDChunk = self.log.MessageIDChunk
+        keyLogIds: List[Optional[int]] = []
+        for key in keys:
+            if key == "Annotation" or key == self.log.MessageID["idAnnotation"]:
+                raise Exception(
+                    "There might be multiple Annotations in a frame, please use frame.Annotations to get them"
+                )
+            keyLogIds.append(MessageIDChunk.logIdOfKey(key))
+        rows = np.asarray(self.threadFrameIndexes(name), dtype=np.int64)
+        columns = [[default] * len(rows) for _ in keyLogIds]
+        wanted = sorted(set(logId for logId in keyLogIds if logId is not None))
+        if len(wanted) == 0 or len(rows) == 0:
+            return [tuple(column[row] for column in columns) for row in range(len(rows))]
+
+        frameIndexes, startBytes, endBytes = self.messageLocations()
+        logBytes = np.memmap(self.logFilePath, dtype=np.uint8, mode="r")
+        logIds = logBytes[startBytes] if len(startBytes) else np.zeros(0, dtype=np.uint8)
+        del logBytes
+        messages = self.messages
+        found: Dict[int, Dict[int, MessageBase]] = {}  # {logId: {row: message}}
+        for logId in wanted:
+            rowIndexes, messageIndexes = self.locateFirstMessages(logId, frameIndexes, logIds, rows)
+            found[logId] = {
+                row: messages[messageIndex]
+                for row, messageIndex in zip(rowIndexes.tolist(), messageIndexes.tolist())
+            }
+            if parse:
+                self.parseMessages(logId, found[logId].values(), startBytes, endBytes, messageIndexes)
+        for column, logId in zip(columns, keyLogIds):
+            if logId is not None:
+                for row, message in found[logId].items():
+                    column[row] = message
+        return [tuple(column[row] for column in columns) for row in range(len(rows))]
+
+    @staticmethod
+    def locateFirstMessages(
+        logId: int, frameIndexes: NDArray[np.int64], logIds: NDArray[np.uint8], rows: NDArray[np.int64]
+    ) -> Tuple[NDArray[np.int64], NDArray[np.int64]]:
+        """
+        (rowIndexes, messageIndexes) of the first message with the logId in every frame of rows (sorted absFrameIndexes)
+        frameIndexes and logIds are the per message arrays (messageLocations), messageIndexes index into them
+        """
+        if len(rows) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        messageIndexes = np.flatnonzero(logIds == logId)
+        messageFrames = frameIndexes[messageIndexes]
+        _, first = np.unique(messageFrames, return_index=True)
+        messageIndexes, messageFrames = messageIndexes[first], messageFrames[first]
+        positions = np.searchsorted(rows, messageFrames)
+        inRows = rows[np.minimum(positions, len(rows) - 1)] == messageFrames
+        return positions[inRows], messageIndexes[inRows]
+
+    def parseMessages(
+        self,
+        logId: int,
+        messages: Any,
+        startBytes: NDArray[np.int64],
+        endBytes: NDArray[np.int64],
+        messageIndexes: NDArray[np.int64],
+    ):
+        """Parse the messages (all of the logId, at messageIndexes of the byte arrays) that are not parsed or cached yet"""
+        classType = self.log.TypeInfoChunk.logIdToClassType[logId]
+        if classType is None:
+            raise KeyError(f"No data class for message {self.log.MessageIDChunk.logIdToIDName[logId]}")
+        sutil = StreamUtil(self.logBytes)
+        for message, messageIndex in zip(messages, messageIndexes.tolist()):
+            if isinstance(message, AccessorHandle):
+                message = message.cursor  # a handle is immutable, the repr is stored through the cursor
+            if message.isParsed or message.loadRepr():
+                continue
+            sutil.seek(int(startBytes[messageIndex]) + 4, io.SEEK_SET)
+            message.reprObj = classType.read(sutil, int(endBytes[messageIndex]))
+
+    def threadTimestamps(self, name: str) -> NDArray[np.uint32]:
+        """Timestamps of all frames in the thread, indexed by the frame's index in its thread"""
+        if not hasattr(self, "_threadTimestamps_cached") or self._threadTimestamps_cached is None:
+            self._threadTimestamps_cached = {}
+        if name not in self._threadTimestamps_cached:
+            self._threadTimestamps_cached[name] = np.asarray(
+                self.timestamps[self.threadFrameIndexes(name)]
+            )
+        return self._threadTimestamps_cached[name]
+
+    def threadIndexAt(self, time: int, name: str) -> int:
+        """
+        Index (in its thread) of the latest frame of the thread whose timestamp <= time
+        If time is before the first frame of the thread, the first frame is returned
+        """
+        threadTimestamps = self.threadTimestamps(name)
+        if len(threadTimestamps) == 0:
+            raise KeyError(f"Thread {name} has no frames")
+        index = int(np.searchsorted(threadTimestamps, time, side="right")) - 1
+        return max(index, 0)
+
+    def frameIndexAt(self, time: int, name: Optional[str] = None) -> int:
+        """
+        Absolute index of the latest frame whose timestamp <= time
+        If name is given, only frames of that thread are considered
+        """
+        if name is not None:
+            return int(self.threadFrameIndexes(name)[self.threadIndexAt(time, name)])
+        if len(self.timestamps) == 0:
+            raise KeyError("Log has no frames")
+        # Frames of different threads interleave, so the whole log is not strictly sorted by time
+        if not hasattr(self, "_timestampOrder_cached") or self._timestampOrder_cached is None:
+            order = np.argsort(self.timestamps, kind="stable")
+            self._timestampOrder_cached = (order, np.asarray(self.timestamps[order]))
+        order, sortedTimestamps = self._timestampOrder_cached
+        index = int(np.searchsorted(sortedTimestamps, time, side="right")) - 1
+        return int(order[max(index, 0)])
+
+    def asofJoin(
+        self,
+        left: str,
+        right: str,
+        tolerance: Optional[int] = None,
+        direction: str = "backward",
+    ) -> Tuple[NDArray[np.int64], NDArray[np.int64]]:
+        """
+        Match every frame of the left thread with a frame of the right thread by timestamp
+        direction:
+            - backward: the latest right frame whose timestamp <= the left frame's timestamp
+            - forward: the earliest right frame whose timestamp >= the left frame's timestamp
+            - nearest: the right frame with the closest timestamp (backward wins ties)
+        tolerance: maximum time difference (ms) of a match
+        Returns (leftFrameIndexes, rightFrameIndexes) as absolute frame indexes, -1 where there is no match
+        """
+        if direction not in ["backward", "forward", "nearest"]:
+            raise ValueError(f"Invalid direction: {direction}")
+
+        leftFrameIndexes = self.threadFrameIndexes(left)
+        leftTimestamps = self.threadTimestamps(left).astype(np.int64)
+
+        # Interpolated timestamps are not guaranteed to be monotonic inside a thread
+        order = np.argsort(self.threadTimestamps(right), kind="stable")
+        rightFrameIndexes = self.threadFrameIndexes(right)[order]
+        rightTimestamps = self.threadTimestamps(right)[order].astype(np.int64)
+        numRight = len(rightTimestamps)
+
+        if numRight == 0:
+            return leftFrameIndexes, np.full(len(leftFrameIndexes), -1, dtype=np.int64)
+
+        backward = np.searchsorted(rightTimestamps, leftTimestamps, side="right") - 1
+        forward = np.searchsorted(rightTimestamps, leftTimestamps, side="left")
+        backwardDiff = np.where(
+            backward >= 0,
+            leftTimestamps - rightTimestamps[np.clip(backward, 0, numRight - 1)],
+            np.iinfo(np.int64).max,
+        )
+        forwardDiff = np.where(
+            forward < numRight,
+            rightTimestamps[np.clip(forward, 0, numRight - 1)] - leftTimestamps,
+            np.iinfo(np.int64).max,
+        )
+
+        if direction == "backward":
+            position, diff = backward, backwardDiff
+        elif direction == "forward":
+            position, diff = forward, forwardDiff
+        else:
+            useForward = forwardDiff < backwardDiff
+            position = np.where(useForward, forward, backward)
+            diff = np.where(useForward, forwardDiff, backwardDiff)
+
+        matched = diff != np.iinfo(np.int64).max
+        if tolerance is not None:
+            matched &= diff <= tolerance
+
+        result = np.full(len(leftFrameIndexes), -1, dtype=np.int64)
+        result[matched] = rightFrameIndexes[position[matched]]
+        return leftFrameIndexes, result
+
+    # Image export
+    imageMetaDataNames = ["CameraInfo", "CameraMatrix", "ImageCoordinateSystem"]
+    imageSidecarKeys = [
+        "width",
+        "height",
+        "timestamp",
+        "size",
+        "frameIndex",
+        "messageIndex",
+        "threadName",
+    ]
+
+    def logIdOf(self, idName: str) -> Optional[int]:
+        """The id used in the log file bytes for a message id name, None if the log doesn't have it"""
+        MessageIDChunk = self.log.MessageIDChunk
+        return MessageIDChunk.mapIDToLog.get(MessageIDChunk.mapNameToID.get(idName, None), None)
+
+    def metaDataReads(self, names: List[str]) -> Dict[str, Any]:
+        """{name: DataClass.read} of the representations, what ImageExportPipeline.readMetaData needs (picklable)"""
+        dataClasses = self.log.TypeInfoChunk.dataClasses
+        return {name: dataClasses[name].read for name in names if name in dataClasses}
+
+    def iterImageMessages(
+        self,
+        classNames: Optional[List[str]] = None,
+        threads: Optional[List[str]] = None,
+        withMetaData: bool = True,
+        metaDataNames: Optional[List[str]] = None,
+        parseMetaData: bool = True,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        DEPENDENCY: eval()
+        Yield every image message (JPEGImage/CameraImage) as a dict without parsing the image itself
+            imgName: FrameBase.imageName without suffix
+            className, width, height, timestamp (of the image), size, frameIndex, threadName
+            messageIndex: absIndex of the image message (MessageBase.absIndex, the same in every mode)
+            frameTimestamp: timestamp of the frame (from FrameInfo)
+            payload: JPEG bytes or raw YUYV bytes, sliced from a memmap of the log file
+            metaDataPayloads: message bodies of the frame's representations in metaDataNames (default: imageMetaDataNames)
+            metaData: their reprDicts, {} unless parseMetaData (pipelines parse the payloads in their workers, see ImageExportPipeline.readMetaData)
+        The decoded image of both classes has shape (height, width * 2, 2)
+        """
+        if classNames is None:
+            classNames = ["JPEGImage", "CameraImage"]
+        if metaDataNames is None:
+            metaDataNames = self.imageMetaDataNames
+        frameIndexes, startBytes, endBytes = self.messageLocations()
+        imageLogIds = {}
+        for className in classNames:
+            logId = self.logIdOf(f"id{className}")
+            if logId is not None:
+                imageLogIds[logId] = className
+        if len(imageLogIds) == 0 or len(startBytes) == 0:
+            return
+
+        logBytes = np.memmap(self.logFilePath, dtype=np.uint8, mode="r")
+        logIds = logBytes[startBytes]
+        isImage = np.isin(logIds, list(imageLogIds.keys()))
+        if threads is not None:
+            isImage &= np.isin(
+                frameIndexes,
+                np.concatenate(
+                    [self.threadFrameIndexes(name) for name in threads]
+                    + [np.zeros(0, dtype=np.int64)]
+                ),
+            )
+        imageIndexes = np.flatnonzero(isImage)
+
+        # Both image bodies start with width, height, timestamp (JPEGImage also has the payload size)
+        header = logBytes[(startBytes[imageIndexes] + 4)[:, None] + np.arange(16)]
+        header = header.view("<u4").astype(np.int64)
+
+        # Frame level information used by the file name (same as FrameBase.imageName)
+        frameStarts = np.searchsorted(frameIndexes, np.arange(len(self.frames)), side="left")
+        frameEnds = np.searchsorted(frameIndexes, np.arange(len(self.frames)), side="right")
+        threadNames = np.empty(len(self.frames), dtype=object)
+        threadIndexes = np.zeros(len(self.frames), dtype=np.int64)
+        for name in self.threadNames:
+            indexes = self.threadFrameIndexes(name)
+            threadNames[indexes] = name
+            threadIndexes[indexes] = np.arange(len(indexes))
+        stem = Path(self.logFilePath).stem
+        playerNumber = self.log["SettingsChunk"].playerNumber
+        # absIndex of a message and byte range of a frame as in FrameBase.imageName: instance mode counts
+        # the dummy messages (they come first in a frame) and instance/array frames start before them
+        absIndexOffsets = self.frameMessageIndexStarts - frameStarts
+        frameStartBytes = startBytes[np.minimum(frameStarts, len(startBytes) - 1)]
+        frameEndBytes = endBytes[np.maximum(frameEnds - 1, 0)]
+        if self.isArrayBacked:
+            frameStartBytes, frameEndBytes = self.arrays.frameStartBytes, self.arrays.frameEndBytes
+        elif not isinstance(self.frames, LogInterfaceAccessorClass):
+            absIndexOffsets = absIndexOffsets + np.array(
+                [len(frame.dummyMessages) for frame in self.frames], dtype=np.int64
+            )
+            frameStartBytes = np.array([frame.startByte for frame in self.frames], dtype=np.int64)
+            frameEndBytes = np.array([frame.endByte for frame in self.frames], dtype=np.int64)
+
+        metaDataLogIds = {}
+        if withMetaData:
+            for name in metaDataNames:
+                logId = self.logIdOf(f"id{name}")
+                if logId is not None and name in self.log.TypeInfoChunk.dataClasses:
+                    metaDataLogIds[name] = logId
+        metaDataReads = self.metaDataReads(list(metaDataLogIds.keys()))
+
+        for i, messageIndex in enumerate(imageIndexes):
+            frameIndex = frameIndexes[messageIndex]
+            frameStart, frameEnd = frameStarts[frameIndex], frameEnds[frameIndex]
+            className = imageLogIds[logIds[messageIndex]]
+            width, height, timestamp, size = header[i]
+            if className == "JPEGImage":
+                height *= 2
+                payloadStart = startBytes[messageIndex] + 4 + 16
+            else:
+                if timestamp & (1 << 31):
+                    height *= 2
+                size = width * height * YUYVPixel.size
+                payloadStart = startBytes[messageIndex] + 4 + 12
+
+            metaDataPayloads = {}
+            for name, logId in metaDataLogIds.items():
+                found = np.flatnonzero(logIds[frameStart:frameEnd] == logId)
+                if len(found) == 0:
+                    continue
+                metaDataIndex = frameStart + found[0]
+                metaDataPayloads[name] = logBytes[startBytes[metaDataIndex] + 4 : endBytes[metaDataIndex]]
+            metaData = ImageExportPipeline.readMetaData(metaDataReads, metaDataPayloads) if parseMetaData else {}
+            absMessageIndex = int(absIndexOffsets[frameIndex] + messageIndex)
+
+            yield {
+                "imgName": f"{stem}_R{playerNumber}_T{self.timestamps[frameIndex]}_{threadNames[frameIndex]}"
+                f"_{threadIndexes[frameIndex]}_M{absMessageIndex}"
+                f"_Bf{frameStartBytes[frameIndex]}_Bt{frameEndBytes[frameIndex]}",
+                "className": className,
+                "width": int(width),
+                "height": int(height),
+                "timestamp": int(timestamp & ~(1 << 31)),
+                "size": int(size),
+                "frameIndex": int(frameIndex),
+                "messageIndex": absMessageIndex,
+                "threadName": threadNames[frameIndex],
+                "frameTimestamp": int(self.timestamps[frameIndex]),
+                "payload": logBytes[payloadStart : payloadStart + size],
+                "metaDataPayloads": metaDataPayloads,
+                "metaData": metaData,
+            }
+        del logBytes
+
+    def exportJPEGs(
+        self,
+        dir: Optional[Path] = None,
+        threads: Optional[List[str]] = None,
+        withMetaData: bool = True,
+        showProgress: bool = True,
+    ) -> int:
+        """
+        DEPENDENCY: eval()
+        Write the original payload of every JPEGImage message as a .jpg file, without decoding or re-encoding
+        Each image gets a .json sidecar with width/height/timestamp and the CameraInfo/CameraMatrix/ImageCoordinateSystem of its frame
+        Payloads are sliced straight from the log file using the message index
+        Returns the number of exported images
+        """
+        if dir is None:
+            dir = self.log.imageDir
+        os.makedirs(dir, exist_ok=True)
+
+        numImages = 0
+        for image in tqdm(
+            self.iterImageMessages(["JPEGImage"], threads, withMetaData),
+            desc="Exporting JPEG Images",
+            disable=not showProgress,
+        ):
+            with open(Path(dir) / f"{image['imgName']}.jpg", "wb") as f:
+                f.write(image["payload"])
+            sidecar = {key: image[key] for key in self.imageSidecarKeys}
+            sidecar.update(image["metaData"])
+            with open(Path(dir) / f"{image['imgName']}.json", "w") as f:
+                f.write(dumpJson(sidecar))
+            numImages += 1
+        return numImages
+
+    def exportImages(
+        self,
+        dir: Optional[Path] = None,
+        encoder: Optional[ImageEncoder] = None,
+        threads: Optional[List[str]] = None,
+        numWorkers: Optional[int] = None,
+        numWriters: int = 2,
+        maxInFlight: Optional[int] = None,
+        showProgress: bool = True,
+    ) -> Dict[str, float]:
+        """
+        DEPENDENCY: eval()
+        Decode, convert to RGB and encode every image message with all cores, see ImageExportPipeline
+        Returns the throughput statistics of the export
+        """
+        if dir is None:
+            dir = self.log.imageDir
+        pipeline = ImageExportPipeline(
+            self, dir, encoder, numWorkers, numWriters, maxInFlight
+        )
+        return pipeline.run(threads, showProgress)
+
+    def exportVideo(
+        self,
+        thread: str = "Upper",
+        path: Optional[Path] = None,
+        fps: float = 30,
+        fourcc: str = "mp4v",
+        overlayFields: Optional[List[str]] = None,
+        useTimestamps: bool = True,
+        numWorkers: Optional[int] = None,
+        maxInFlight: Optional[int] = None,
+        showProgress: bool = True,
+    ) -> Dict[str, float]:
+        """
+        DEPENDENCY: eval()
+        Write the camera stream of a thread into a video, see VideoExportPipeline
+        Returns the throughput statistics of the export
+        """
+        if path is None:
+            path = self.log.outputDir / f"{Path(self.logFilePath).stem}_{thread}.mp4"
+        pipeline = VideoExportPipeline(
+            self, path, fps, fourcc, overlayFields, useTimestamps, numWorkers, maxInFlight
+        )
+        return pipeline.run(thread, showProgress)
+
+    def exportDataset(
+        self,
+        fields: List[str],
+        dir: Optional[Path] = None,
+        threads: Optional[List[str]] = None,
+        shardSize: int = 1000,
+        format: str = "tar",
+        encoder: Optional[ImageEncoder] = None,
+        numWorkers: Optional[int] = None,
+        showProgress: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        DEPENDENCY: eval()
+        Write images and representation fields of the same frame into shards, see DatasetExportPipeline
+        Returns the manifest
+        """
+        if dir is None:
+            dir = self.log.outputDir / f"{Path(self.logFilePath).stem}_dataset"
+        pipeline = DatasetExportPipeline(
+            self, dir, fields, shardSize, format, encoder, numWorkers
+        )
+        return pipeline.run(threads, showProgress)
+
+    def exportFrames(
+        self,
+        dir: Optional[Path] = None,
+        threads: Optional[List[str]] = None,
+        compress: bool = False,
+        framesPerPart: int = 1000,
+        numWorkers: Optional[int] = None,
+        showProgress: bool = True,
+    ) -> Dict[str, Path]:
+        """
+        DEPENDENCY: eval()
+        Write every frame (asDict) as a json line into one ndjson file per thread, see FrameExportPipeline
+        Returns {threadName: path of the ndjson file}
+        """
+        if dir is None:
+            dir = self.log.frameDir
+        pipeline = FrameExportPipeline(self, dir, compress, framesPerPart, numWorkers)
+        return pipeline.run(threads, showProgress)
+
+    def exportTables(
+        self,
+        dir: Optional[Path] = None,
+        classNames: Optional[List[str]] = None,
+        format: str = "npz",
+        rowGroupSize: int = 10000,
+        numWorkers: Optional[int] = None,
+        showProgress: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        DEPENDENCY: eval()
+        Write every representation (all non-image representations by default) as a table with one row per message
+        and one column per flattened field, see ColumnarExportPipeline
+        Returns the schema
+        """
+        if dir is None:
+            dir = self.log.outputDir / f"{Path(self.logFilePath).stem}_tables"
+        pipeline = ColumnarExportPipeline(self, dir, format, rowGroupSize, numWorkers)
+        return pipeline.run(classNames, showProgress)
+
+    def extractFeatures(
+        self,
+        spec: Dict[str, Feature],
+        thread: str = "Cognition",
+        dir: Optional[Path] = None,
+        dropIncomplete: bool = False,
+        rowsPerPart: int = 100000,
+        rowGroupSize: int = 10000,
+        numWorkers: Optional[int] = None,
+        showProgress: bool = True,
+        frameRange: Optional[Tuple[int, int]] = None,
+    ) -> Dict[str, Any]:
+        """
+        DEPENDENCY: eval()
+        Aligned columns of the declared features (fields and NumPy expressions) of every frame of the thread
+        (only the frames in frameRange, (first, last) absFrameIndex, if given), see FeaturePipeline
+        Returns the columns, or the schema if they are written to dir
+        """
+        pipeline = FeaturePipeline(self, spec, thread, rowGroupSize, numWorkers, frameRange)
+        if dir is None:
+            return pipeline.run(dropIncomplete, showProgress)
+        return pipeline.write(dir, rowsPerPart, dropIncomplete, showProgress)
+
+    def episodes(
+        self,
+        thread: str = "Cognition",
+        playingStates: Optional[List[str]] = None,
+        numWorkers: Optional[int] = None,
+        showProgress: bool = True,
+    ) -> Dict[str, NDArray]:
+        """
+        DEPENDENCY: eval()
+        Episodes of the thread (runs of frames in a playing GameState) with their frame ranges and outcome,
+        see EpisodeSegmenter
+        """
+        return EpisodeSegmenter(self, thread, playingStates, numWorkers).run(showProgress)
+
+    def thumbnails(self, size: Tuple[int, int] = (160, 120)) -> ThumbnailCache:
+        """
+        DEPENDENCY: eval()
+        Thumbnail cache (width, height) of all image messages, generated on first access, see ThumbnailCache
+        """
+        if not hasattr(self, "_thumbnails_cached") or self._thumbnails_cached is None:
+            self._thumbnails_cached = {}
+        if size not in self._thumbnails_cached:
+            self._thumbnails_cached[size] = ThumbnailCache(self, size)
+        return self._thumbnails_cached[size]
 
     def parseBytes(self, showProgress: bool = True, cacheReprs: bool = False):
         """
@@ -566,8 +1464,17 @@ class UncompressedChunk(Chunk):
                     ]
                 )
 
+    def __getstate__(self):
+        state = super().__getstate__()
+        if "_arrays" in state:  # the views are rebuilt from the arrays
+            state.pop("_children", None)
+            state.pop("_threads", None)
+        return state
+
     def __setstate__(self, state):
         super().__setstate__(state)
+        if self.isArrayBacked:
+            self.buildArrayViews()
 
     @property
     def providedAttributes(self) -> List[str]:
@@ -578,16 +1485,20 @@ class UncompressedChunk(Chunk):
         return self.frames
 
     @property
-    def messages(self) -> Messages:
+    def messages(self) -> Union[Messages, MessageSequence]:
+        """
+        All messages of the log, in accessor mode a lazy MessageSequence of AccessorHandles
+        backed by the message index file (O(1) len, indexing and slicing), in array backed mode a ViewSequence
+        """
         if hasattr(self, "_messages_cached"):
             return self._messages_cached
-        self._messages_cached = []
-
-        for frame in self.frames:
-            if isinstance(frame.children, LogInterfaceAccessorClass):
-                for message in frame.children:
-                    self._messages_cached.append(message.copy().freeze())
-            else:  # Instance class
+        if isinstance(self.frames, LogInterfaceAccessorClass):
+            self._messages_cached = MessageSequence(self.log)
+        elif self.isArrayBacked:
+            self._messages_cached = ViewSequence(self, MessageView, range(self.arrays.numMessages))
+        else:  # Instance class
+            self._messages_cached = []
+            for frame in self.frames:
                 self._messages_cached.extend(frame.messages)
         return self._messages_cached
 
@@ -5,8 +5,9 @@ import json
 import mmap
 import os
 import re
-from typing import List, Optional, Tuple, Union
+from typing import IO, List, Optional, Tuple, Union
 
+import numpy as np
 from numpy.typing import NDArray
 
 from Primitive import *
@@ -42,6 +43,12 @@ def dumpJson(obj, indent=2) -> str:
     return json.dumps(obj, indent=indent, cls=SpecialEncoder)
 
 
+def dumpJsonTo(obj, fp: IO[str], indent=2) -> None:
+    """Same output as dumpJson, but streamed into a file object chunk by chunk"""
+    for chunk in SpecialEncoder(indent=indent).iterencode(obj):
+        fp.write(chunk)
+
+
 def bytes2ShortStr(b: bytes):
     return f"Bytes[{len(b)}]: {b[:4] if len(b) >= 4 else b''} ..."
 
@@ -188,3 +195,45 @@ def extractTrajNumbers(folderPath):
             numbers.append(int(match.group(1)))
 
     return sorted(numbers)
+
+
+def episodePositions(numRows: int, episodeStarts: Optional[NDArray] = None) -> NDArray[np.int64]:
+    """
+    Index of every row in its episode
+    episodeStarts: bool (N,) mask of the rows that start an episode, row 0 always starts one (None: a single episode)
+    """
+    rows = np.arange(numRows, dtype=np.int64)
+    if episodeStarts is None:
+        return rows
+    starts = np.asarray(episodeStarts, dtype=bool).copy()
+    if numRows > 0:
+        starts[0] = True
+    return rows - np.maximum.accumulate(np.where(starts, rows, 0))
+
+
+def historyWindows(
+    values: NDArray,
+    length: int,
+    episodeStarts: Optional[NDArray] = None,
+    alignFront: bool = False,
+) -> Tuple[NDArray, NDArray[np.bool_]]:
+    """
+    The rows before every row: ((N, length, k) windows, (N, length) mask of the valid entries)
+    Entry i of row t is row t - length + i (oldest first), entries before the episode start are zeros
+    alignFront: while the episode is shorter than length, its rows fill the first entries instead of the last ones
+    """
+    values = np.asarray(values)
+    numRows = len(values)
+    positions = np.minimum(episodePositions(numRows, episodeStarts), length)
+    entries = np.arange(length)
+    if alignFront:
+        mask = entries[None, :] < positions[:, None]
+        sources = (np.arange(numRows) - positions)[:, None] + entries[None, :]
+        windows = values[np.clip(sources, 0, max(numRows - 1, 0))]
+    else:
+        mask = entries[None, :] >= length - positions[:, None]
+        padded = np.concatenate([np.zeros((length,) + values.shape[1:], dtype=values.dtype), values])
+        # strided view, row t covers padded[t : t + length] = values[t - length : t]
+        windows = np.moveaxis(np.lib.stride_tricks.sliding_window_view(padded, length, axis=0), -1, 1)[:numRows]
+    mask = mask.reshape(mask.shape + (1,) * (values.ndim - 1))
+    return np.where(mask, windows, 0), mask.reshape(numRows, length)
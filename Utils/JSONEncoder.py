@@ -1,5 +1,4 @@
 import json
-import re
 from abc import ABCMeta
 from enum import EnumMeta
 
@@ -26,16 +25,18 @@ class NumpyEncoder(json.JSONEncoder):
 
 
 class SpecialEncoder(json.JSONEncoder):
-    """Handle some special object that might be presented in Representation Object and TypeInfoChunk"""
+    """
+    Handle some special object that might be presented in Representation Object and TypeInfoChunk
+    ndarray and NoIndent values are written compactly on a single line, everything else follows indent
 
-    FORMAT_SPEC = "@@{}@@"
-    regex = re.compile(FORMAT_SPEC.format(r"(\d+)"))
+    The output is produced in a single pass (iterencode yields chunks),
+    so it can be streamed to a file with dumpJsonTo() without building the whole string
+    """
 
     def __init__(self, **kwargs):
         # Save copy of any keyword argument values needed for use here.
         self.__sort_keys = kwargs.get("sort_keys", None)
         super(SpecialEncoder, self).__init__(**kwargs)
-        self.cache = {}
 
     def default(self, obj):
         if isinstance(obj, np.integer):
@@ -43,41 +44,168 @@ class SpecialEncoder(json.JSONEncoder):
         elif isinstance(obj, np.floating):
             return float(obj)
         elif isinstance(obj, np.ndarray):
-            self.cache[id(obj)] = obj.tolist()
-            return self.FORMAT_SPEC.format(id(obj))
+            return obj.tolist()
         elif isinstance(obj, NoIndent):
-            self.cache[id(obj)] = obj.value
-            return self.FORMAT_SPEC.format(id(obj))
+            return obj.value
         elif isinstance(obj, ABCMeta):
             return f"Class Type: {obj.__name__}"
         elif isinstance(obj, EnumMeta):
             return f"Enum Type: {obj.__name__}"
         else:
-            return str(obj)
+            return str(obj)  # Enum members, DataClass objects, numpy bool, ...
 
     def encode(self, obj):
-        format_spec = self.FORMAT_SPEC  # Local var to expedite access.
-        json_repr = super(SpecialEncoder, self).encode(obj)  # Default JSON.
-
-        # Replace any marked-up object ids in the JSON repr with the
-        # value returned from the json.dumps() of the corresponding
-        # wrapped Python object.
-        for match in self.regex.finditer(json_repr):
-            # see https://stackoverflow.com/a/15012814/355230
-            id = int(match.group(1))
-            no_indent = self.cache[id]
-            self.cache[id] = None  # Remove the reference from cache
-            json_obj_repr = json.dumps(
-                no_indent, sort_keys=self.__sort_keys, cls=NumpyEncoder
-            )
-
-            # Replace the matched id string with json formatted representation
-            # of the corresponding Python object.
-            json_repr = json_repr.replace(
-                '"{}"'.format(format_spec.format(id)), json_obj_repr
-            )
-
-        return json_repr
+        return "".join(self.iterencode(obj))
+
+    def iterencode(self, obj, _one_shot=False):
+        if self.check_circular:
+            markers = {}
+        else:
+            markers = None
+        if self.ensure_ascii:
+            encodeStr = json.encoder.encode_basestring_ascii
+        else:
+            encodeStr = json.encoder.encode_basestring
+        indent = self.indent
+        if indent is not None and not isinstance(indent, str):
+            indent = " " * indent
+        return self._iterencode(obj, 0, indent, encodeStr, markers)
+
+    def _floatstr(self, o: float) -> str:
+        if o != o:
+            text = "NaN"
+        elif o == float("inf"):
+            text = "Infinity"
+        elif o == -float("inf"):
+            text = "-Infinity"
+        else:
+            return float.__repr__(o)
+        if not self.allow_nan:
+            raise ValueError("Out of range float values are not JSON compliant: " + repr(o))
+        return text
+
+    def _inline(self, value) -> str:
+        """Compact single line json of an ndarray / NoIndent value"""
+        return json.dumps(value, sort_keys=self.__sort_keys, cls=NumpyEncoder)
+
+    def _iterencode(self, o, level, indent, encodeStr, markers):
+        # Same order of checks as json.encoder, so subclasses of str/int/float are handled identically
+        if isinstance(o, str):
+            yield encodeStr(o)
+        elif o is None:
+            yield "null"
+        elif o is True:
+            yield "true"
+        elif o is False:
+            yield "false"
+        elif isinstance(o, int):
+            yield int.__repr__(o)
+        elif isinstance(o, float):
+            yield self._floatstr(o)
+        elif isinstance(o, (list, tuple)):
+            yield from self._iterencodeList(o, level, indent, encodeStr, markers)
+        elif isinstance(o, dict):
+            yield from self._iterencodeDict(o, level, indent, encodeStr, markers)
+        elif isinstance(o, np.ndarray):
+            yield self._inline(o.tolist())
+        elif isinstance(o, NoIndent):
+            yield self._inline(o.value)
+        elif isinstance(o, np.integer):
+            yield int.__repr__(int(o))
+        elif isinstance(o, np.floating):
+            yield self._floatstr(float(o))
+        else:
+            if markers is not None:
+                markerId = id(o)
+                if markerId in markers:
+                    raise ValueError("Circular reference detected")
+                markers[markerId] = o
+            yield from self._iterencode(self.default(o), level, indent, encodeStr, markers)
+            if markers is not None:
+                del markers[markerId]
+
+    def _iterencodeList(self, lst, level, indent, encodeStr, markers):
+        if not lst:
+            yield "[]"
+            return
+        if markers is not None:
+            markerId = id(lst)
+            if markerId in markers:
+                raise ValueError("Circular reference detected")
+            markers[markerId] = lst
+        if indent is not None:
+            level += 1
+            newlineIndent = "\n" + indent * level
+            separator = self.item_separator + newlineIndent
+            yield "[" + newlineIndent
+        else:
+            separator = self.item_separator
+            yield "["
+        first = True
+        for value in lst:
+            if first:
+                first = False
+            else:
+                yield separator
+            yield from self._iterencode(value, level, indent, encodeStr, markers)
+        if indent is not None:
+            level -= 1
+            yield "\n" + indent * level
+        yield "]"
+        if markers is not None:
+            del markers[markerId]
+
+    def _iterencodeDict(self, dct, level, indent, encodeStr, markers):
+        if not dct:
+            yield "{}"
+            return
+        if markers is not None:
+            markerId = id(dct)
+            if markerId in markers:
+                raise ValueError("Circular reference detected")
+            markers[markerId] = dct
+        if indent is not None:
+            level += 1
+            newlineIndent = "\n" + indent * level
+            separator = self.item_separator + newlineIndent
+            yield "{" + newlineIndent
+        else:
+            separator = self.item_separator
+            yield "{"
+        items = sorted(dct.items()) if self.sort_keys else dct.items()
+        first = True
+        for key, value in items:
+            if isinstance(key, str):
+                pass
+            elif isinstance(key, float):
+                key = self._floatstr(key)
+            elif key is True:
+                key = "true"
+            elif key is False:
+                key = "false"
+            elif key is None:
+                key = "null"
+            elif isinstance(key, int):
+                key = int.__repr__(key)
+            elif self.skipkeys:
+                continue
+            else:
+                raise TypeError(
+                    f"keys must be str, int, float, bool or None, not {key.__class__.__name__}"
+                )
+            if first:
+                first = False
+            else:
+                yield separator
+            yield encodeStr(key)
+            yield self.key_separator
+            yield from self._iterencode(value, level, indent, encodeStr, markers)
+        if indent is not None:
+            level -= 1
+            yield "\n" + indent * level
+        yield "}"
+        if markers is not None:
+            del markers[markerId]
 
 
 if __name__ == "__main__":
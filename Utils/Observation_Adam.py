@@ -11,6 +11,8 @@ import math
 
 import numpy as np
 
+from .GeneralUtils import historyWindows
+
 
 class Observation:
     def __init__(self, policy_type):
@@ -169,6 +171,89 @@ class Observation:
 
         return np.array(observation)
 
+    # Batch variants: one row per frame, agent_locs is (N, 3) [x, y, rotation], object/ball locs are (N, 2) or (2,)
+    def get_relative_observation_batch(self, agent_locs, object_locs):
+        """(N, 4) get_relative_observation of every row"""
+        agent_locs = np.asarray(agent_locs, dtype=np.float64).reshape(-1, 3)
+        object_locs = np.broadcast_to(
+            np.asarray(object_locs, dtype=np.float64), (len(agent_locs), 2)
+        )
+        x = object_locs[:, 0] - agent_locs[:, 0]
+        y = object_locs[:, 1] - agent_locs[:, 1]
+        angle = np.arctan2(y, x) - agent_locs[:, 2]
+        cos, sin = np.cos(-agent_locs[:, 2]), np.sin(-agent_locs[:, 2])
+        xprime = x * cos - y * sin
+        yprime = x * sin + y * cos
+        return np.stack(
+            [xprime / 10000, yprime / 10000, np.sin(angle), np.cos(angle)], axis=1
+        )
+
+    def checkFacingBallBatch(self, agent_locs, ball_locs, req_angle=18):
+        """bool (N,) checkFacingBall of every row"""
+        agent_locs = np.asarray(agent_locs, dtype=np.float64).reshape(-1, 3)
+        ball_locs = np.broadcast_to(
+            np.asarray(ball_locs, dtype=np.float64), (len(agent_locs), 2)
+        )
+        robot_angle = np.mod(np.degrees(agent_locs[:, 2]), 360)
+        angle_to_ball = np.degrees(
+            np.arctan2(
+                ball_locs[:, 1] - agent_locs[:, 1], ball_locs[:, 0] - agent_locs[:, 0]
+            )
+        )
+        angle = np.mod(robot_angle - angle_to_ball + 360, 360)
+        return (angle < req_angle) | (angle > 360 - req_angle)
+
+    def canKickBatch(self, agent_locs, ball_locs):
+        """bool (N,) canKick of every row"""
+        agent_locs = np.asarray(agent_locs, dtype=np.float64).reshape(-1, 3)
+        ball_locs = np.broadcast_to(
+            np.asarray(ball_locs, dtype=np.float64), (len(agent_locs), 2)
+        )
+        distance = np.hypot(
+            ball_locs[:, 0] - agent_locs[:, 0], ball_locs[:, 1] - agent_locs[:, 1]
+        )
+        return (distance < 300) & self.checkFacingBallBatch(agent_locs, ball_locs)
+
+    def getSoccerObservationBatch(
+        self, agent_locs, ball_locs, teammate_locs=None, episode_starts=None
+    ):
+        """
+        (N, k) getSoccerObservation of a sequence of frames of one robot
+        teammate_locs: (N, num_teammates, 2), NaN rows are missing teammates (placed at [-4800, 3500] as in getSoccerObservation)
+        The history is the relative ball observation of the previous history_length frames of the same episode,
+        zeros before the episode start (see historyWindows), episode_starts is a bool (N,) mask
+        """
+        agent_locs = np.asarray(agent_locs, dtype=np.float64).reshape(-1, 3)
+        numRows = len(agent_locs)
+        ball_observation = self.get_relative_observation_batch(agent_locs, ball_locs)
+        observation = [
+            ball_observation,
+            self.canKickBatch(agent_locs, ball_locs)[:, None].astype(np.float64),
+        ]
+
+        num_teammates = self.policyVars["num_teammates"]
+        if teammate_locs is None:
+            teammate_locs = np.full((numRows, num_teammates, 2), np.nan)
+        teammate_locs = np.asarray(teammate_locs, dtype=np.float64)
+        for i in range(num_teammates):
+            if i < teammate_locs.shape[1]:
+                locs = teammate_locs[:, i]
+                locs = np.where(np.isnan(locs).any(axis=1)[:, None], [-4800, 3500], locs)
+            else:
+                locs = [-4800, 3500]
+            observation.append(self.get_relative_observation_batch(agent_locs, locs))
+
+        goal_posts = [[4500, 250], [4500, -250], [-4500, 250], [-4500, -250]]
+        sides = [[0, 3000], [0, -3000]]
+        for point in goal_posts + sides:
+            observation.append(self.get_relative_observation_batch(agent_locs, point))
+
+        history, _ = historyWindows(
+            ball_observation, self.history_length, episode_starts
+        )
+        observation.append(history.reshape(numRows, -1))
+        return np.concatenate(observation, axis=1)
+
     def getStaticDefObservation(
         self, agent_loc, ball_loc, teammate_loc, opponent_loc, robotNum
     ):
@@ -9,6 +9,10 @@ Description: This script reconstruct observations of BadgerRL res-josh-random-sc
 
 import math
 
+import numpy as np
+
+from .GeneralUtils import historyWindows
+
 
 class Observation:
     def __init__(self, policy_type):
@@ -60,6 +64,46 @@ class Observation:
 
         return observation
 
+    # Batch variants: one row per frame, agent_locs is (N, 3) [x, y, rotation], object/ball locs are (N, 2) or (2,)
+    def getRelativeObservationBatch(self, agent_locs, object_locs):
+        """(N, 4) getRelativeObservation of every row"""
+        agent_locs = np.asarray(agent_locs, dtype=np.float64).reshape(-1, 3)
+        object_locs = np.broadcast_to(
+            np.asarray(object_locs, dtype=np.float64), (len(agent_locs), 2)
+        )
+        x = object_locs[:, 0] - agent_locs[:, 0]
+        y = object_locs[:, 1] - agent_locs[:, 1]
+        angle = np.arctan2(y, x) - agent_locs[:, 2]
+        cos, sin = np.cos(-agent_locs[:, 2]), np.sin(-agent_locs[:, 2])
+        xprime = x * cos - y * sin
+        yprime = x * sin + y * cos
+        return np.stack(
+            [xprime / 10000, yprime / 10000, np.sin(angle), np.cos(angle)], axis=1
+        )
+
+    def getObservationBatch(self, agent_locs, ball_locs, episode_starts=None):
+        """
+        (N, 12 * (1 + history_length)) observations of a sequence of frames
+        The history is the first 12 values of the previous history_length observations of the same episode
+        (see historyWindows, alignFront as in getObservation), episode_starts is a bool (N,) mask
+        """
+        observation = np.concatenate(
+            [
+                self.getRelativeObservationBatch(agent_locs, ball_locs),
+                self.getRelativeObservationBatch(agent_locs, [4500, -800]),
+                self.getRelativeObservationBatch(agent_locs, [4500, 800]),
+            ],
+            axis=1,
+        )
+        if self.history_length == 0:
+            return observation
+        history, _ = historyWindows(
+            observation, self.history_length, episode_starts, alignFront=True
+        )
+        return np.concatenate(
+            [observation, history.reshape(len(observation), -1)], axis=1
+        )
+
     def stepObservationHistory(self, observation):
         # Add the new observation at the end
         self.history.append(observation)